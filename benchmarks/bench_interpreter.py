@@ -0,0 +1,131 @@
+"""
+@file bench_interpreter.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file benchmarks the interpreter with and without the optimisation passes
+@version 0.1
+@date 18-10-2026
+"""
+import sys
+import os
+import io
+import time
+import contextlib
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Callable
+from lexer_module.lexer import tokenize
+from parser_module.parser import parse_program
+from interpreter_module.interpreter import interpret, interpret_methods, get_attribute, no_interpret_method
+from interpreter_module.compiler import interpret_compiled
+from interpreter_module.transpiler import transpile_program, interpret_transpiled
+from optimizer_module.optimizer import fold_constants, eliminate_dead_code
+from misc.node_types import Node, Program, node_child_names
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A recursive function which computes the same constant expression in every call
+constant_expressions = """ƒ compute | α n ––>
+    ? n ▼ 1 ––>
+        ⮐ 0 ⮐ ¿
+    ⮐ <60 * 60 * 24 - -1 * 2 ⚡ 3 + 10 / 5> + ✆ compute n-1 ✆ ⮐
+––
+
+📁 test = ✆ compute 300 ✆
+"""
+
+# A library of functions of which only one is called
+library = "\n".join(f"""ƒ function{index} | α n ––>
+    ? n ▼ 1 ––>
+        ⮐ 0 ⮐ ¿
+    ⮐ n + ✆ function{index} n-1 ✆ ⮐
+    ✆ 🖨 n ✆
+––
+""" for index in range(200)) + "\n📁 test = ✆ function0 100 ✆\n"
+
+
+def count_nodes(node: Node) -> int:
+    """Function returns the amount of nodes in a tree of nodes"""
+    values = [getattr(node, name) for name in node_child_names(type(node))]
+    return 1 + sum(count_nodes(value) if isinstance(value, Node) else
+                   sum(count_nodes(item) for item in value if isinstance(item, Node)) if isinstance(value, list) else 0 for value in values)
+
+
+def benchmark(name: str, code: str, optimize: Callable[[Program], Program], rounds: int, engine: Callable=interpret):
+    """Function interprets the provided code a number of times and prints the time it takes per run
+
+    Args:
+        name            : Name of the benchmark which is printed
+        code            : The code that needs to be interpreted
+        optimize        : A function which optimizes the parsed program before it is interpreted
+        rounds          : The amount of times the program is interpreted
+        engine          : The function which runs the program, interpret or interpret_compiled, default=interpret
+    """
+    program     = optimize(parse_program(code, tokenize(code)))
+    time_start  = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(rounds):
+            engine(code, program)
+    time_stop   = time.perf_counter()
+    print(f"{name:<25}{count_nodes(program):>10} nodes{(time_stop-time_start) / rounds * 1000:>15,.2f} ms/run")
+
+def benchmark_dispatch(name: str, code: str, rounds: int):
+    """Function resolves the interpret method of every node of the provided code, once by building the name of the
+    method and looking it up in the globals of the interpreter and once with interpret_methods, and prints the time
+    it takes per node
+
+    Args:
+        name            : Name of the benchmark which is printed
+        code            : The code of which the nodes are used
+        rounds          : The amount of times the method of every node is resolved
+    """
+    nodes, index = [parse_program(code, tokenize(code))], 0
+    while index < len(nodes):
+        nodes += [child for child in (getattr(nodes[index], name) for name in node_child_names(type(nodes[index])))
+                  for child in (child if isinstance(child, list) else [child]) if isinstance(child, Node)]
+        index += 1
+
+    time_start  = time.perf_counter()
+    for _ in range(rounds):
+        for node in nodes:
+            get_attribute(f"interpret_{type(node).__name__}", no_interpret_method)
+    time_names  = time.perf_counter() - time_start
+    time_start  = time.perf_counter()
+    for _ in range(rounds):
+        for node in nodes:
+            interpret_methods.get(type(node), no_interpret_method)
+    time_table  = time.perf_counter() - time_start
+    for method, duration in [("names", time_names), ("table", time_table)]:
+        print(f"{name + ' ' + method:<25}{len(nodes):>10} nodes{duration / (rounds * len(nodes)) * 1e9:>15,.1f} ns/node")
+
+def python_fibonachi(n: int) -> int:
+    """Function computes the same as fibonachi.txt in python, as a reference for the transpiled program"""
+    if n < 2:
+        return n
+    return python_fibonachi(n-1) + python_fibonachi(n-2)
+
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(100000)
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with open(root_dir + "/fibonachi.txt", 'rb') as f:
+        fibonachi = f.read().decode("utf-8")
+    with open(root_dir + "/double_recursive.txt", 'rb') as f:
+        tail_calls = f.read().decode("utf-8").replace("even 15", "even 10000")
+
+    for name, code in [("fibonachi", fibonachi), ("constants", constant_expressions), ("library", library), ("tail calls", tail_calls)]:
+        benchmark(name, code, lambda program: program, rounds)
+        benchmark(f"{name} folded", code, fold_constants, rounds)
+        benchmark(f"{name} eliminated", code, lambda program: eliminate_dead_code(fold_constants(program)), rounds)
+        benchmark(f"{name} compiled", code, fold_constants, rounds, interpret_compiled)
+    benchmark_dispatch("fibonachi dispatch", fibonachi, rounds * 10000)
+
+    fibonachi_25    = fibonachi.replace("fibonachi 15", "fibonachi 25")
+    transpiled      = transpile_program(parse_program(fibonachi_25, tokenize(fibonachi_25)))
+    benchmark("fibonachi 25 compiled", fibonachi_25, lambda program: program, rounds, interpret_compiled)
+    benchmark("fibonachi 25 transpiled", fibonachi_25, lambda program: program, rounds, lambda code, program: interpret_transpiled(code, transpiled))
+    time_start = time.perf_counter()
+    for _ in range(rounds):
+        python_fibonachi(25)
+    print(f"{'fibonachi 25 python':<25}{'':>16}{(time.perf_counter()-time_start) / rounds * 1000:>15,.2f} ms/run")
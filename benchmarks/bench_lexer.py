@@ -0,0 +1,107 @@
+"""
+@file bench_lexer.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file benchmarks the different search match functions and token representations of the lexer
+@version 0.1
+@date 18-10-2026
+"""
+import sys
+import os
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Callable
+from lexer_module.lexer import lex, tokenize, lex_stream, lex_parallel, relex, search_match, search_match_compiled
+from lexer_module.scanner import search_match_dispatch
+from misc.token_types import *
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def benchmark(name: str, code: str, search_match_f: Callable, rounds: int):
+    """Function lexes the provided code a number of times and prints the amount of tokens per second
+
+    Args:
+        name            : Name of the benchmark which is printed
+        code            : The code that needs to be lexed
+        search_match_f  : The search match function that the lexer should use
+        rounds          : The amount of times the code is lexed
+    """
+    time_start = time.perf_counter()
+    for _ in range(rounds):
+        tokens = lex(code, search_match_f, TokenExpressions)
+    time_stop = time.perf_counter()
+    print(f"{name:<25}{len(tokens)*rounds / (time_stop-time_start):>15,.0f} tokens/s")
+
+
+def benchmark_tokenize(name: str, code: str, tokenize_f: Callable, rounds: int):
+    """Function tokenizes the provided code a number of times and prints the amount of tokens per second
+
+    Args:
+        name            : Name of the benchmark which is printed
+        code            : The code that needs to be tokenized
+        tokenize_f      : A function which converts code into a collection of tokens
+        rounds          : The amount of times the code is tokenized
+    """
+    time_start = time.perf_counter()
+    for _ in range(rounds):
+        tokens = tokenize_f(code)
+    time_stop = time.perf_counter()
+    print(f"{name:<25}{len(tokens)*rounds / (time_stop-time_start):>15,.0f} tokens/s")
+
+
+def benchmark_memory(name: str, code: str, tokenize_f: Callable):
+    """Function tokenizes the provided code and prints the amount of memory that is used per token
+
+    Args:
+        name            : Name of the benchmark which is printed
+        code            : The code that needs to be tokenized
+        tokenize_f      : A function which converts code into a collection of tokens
+    """
+    tracemalloc.start()
+    tokens = tokenize_f(code)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<25}{memory / len(tokens):>15,.1f} bytes/token")
+
+
+def benchmark_relex(name: str, line: str, lines: int, edits: int):
+    """Function relexes a one character edit in the middle of a source file a number of times and prints the time
+    every edit takes. The first edit, which splits the columns of the TokenStream into chunks, is not timed
+
+    Args:
+        name            : Name of the benchmark which is printed
+        line            : The line the source file is made of
+        lines           : The amount of lines in the source file
+        edits           : The amount of edits that are relexed
+    """
+    code            = line * lines
+    token_stream    = relex(lex_stream(code), 0, 0, "")
+    index           = len(code) // 2 + line.index("1")
+    time_start      = time.perf_counter()
+    for edit in range(edits):
+        token_stream = relex(token_stream, index, index + edit % 2, "" if edit % 2 else "1")
+    time_stop = time.perf_counter()
+    print(f"{name:<25}{(time_stop-time_start) / edits * 1000:>15,.3f} ms/edit")
+
+
+if __name__ == "__main__":
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rounds      = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    with open(root_dir + "/fibonachi.txt", 'rb') as f:
+        code = "\n".join([f.read().decode("utf-8")] * repetitions)
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), len(code) + 1000))
+    benchmark("search_match", code, search_match, rounds)
+    benchmark("search_match_compiled", code, search_match_compiled, rounds)
+    benchmark("search_match_dispatch", code, search_match_dispatch, rounds)
+    benchmark_tokenize("lex_stream", code, lex_stream, rounds)
+    for workers in [2, 4, os.cpu_count()]:
+        benchmark_tokenize(f"lex_parallel({workers})", code, lambda code: lex_parallel(code, workers=workers), rounds)
+    benchmark_memory("list(tokenize)", code, lambda code: list(tokenize(code)))
+    benchmark_memory("lex_stream", code, lex_stream)
+    for lines in [2000, 20000, 200000]:
+        benchmark_relex(f"relex({lines} lines)", "📁 var1 = 1 + 2\n", lines, rounds * 10)
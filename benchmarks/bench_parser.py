@@ -0,0 +1,148 @@
+"""
+@file bench_parser.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file benchmarks the parser on growing amounts of code
+@version 0.1
+@date 18-10-2026
+"""
+import sys
+import os
+import time
+import tracemalloc
+import io
+import pickle
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Callable
+from lexer_module.lexer import tokenize, lex_stream
+from parser_module.parser import parse, parse_program
+from parser_module.incremental_parser import parse_incremental, reparse
+from misc.token_types import *
+from misc.node_types import Node, Identifier, node_release, node_child_names
+from misc.flat_program import flat_program_from_program, program_from_flat_program, flat_program_dump, flat_program_load, node_kind_indexes
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def benchmark(name: str, code: str, parse_f: Callable, rounds: int):
+    """Function parses the provided code a number of times and prints the amount of tokens parsed per second
+
+    Args:
+        name            : Name of the benchmark which is printed
+        code            : The code that needs to be parsed
+        parse_f         : A function which parses code and a list of tokens
+        rounds          : The amount of times the code is parsed
+    """
+    tokens      = list(tokenize(code))
+    time_start  = time.perf_counter()
+    for _ in range(rounds):
+        parse_f(code, tokens)
+    time_stop   = time.perf_counter()
+    print(f"{name:<25}{len(tokens):>10} tokens{len(tokens)*rounds / (time_stop-time_start):>15,.0f} tokens/s")
+
+
+def benchmark_reparse(name: str, code: str, start: int, end: int, replacement: str, rounds: int):
+    """Function edits the provided code a number of times with reparse and prints the time per edit
+
+    Args:
+        name            : Name of the benchmark which is printed
+        code            : The code that is edited
+        start           : The index of the first character that is replaced
+        end             : The index after the last character that is replaced
+        replacement     : The characters that are placed between start and end
+        rounds          : The amount of times the code is edited
+    """
+    incremental_program = parse_incremental(lex_stream(code))
+    time_start  = time.perf_counter()
+    for _ in range(rounds):
+        reparse(incremental_program, start, end, replacement)
+    time_stop   = time.perf_counter()
+    print(f"{name:<25}{len(incremental_program.token_stream):>10} tokens{(time_stop-time_start) / rounds * 1000:>15,.2f} ms/edit")
+
+
+def count_nodes(node: Node) -> int:
+    """Function returns the amount of nodes in a tree of nodes"""
+    values = [getattr(node, name) for name in node_child_names(type(node))]
+    return 1 + sum(count_nodes(value) if isinstance(value, Node) else 
+                   sum(count_nodes(item) for item in value if isinstance(item, Node)) if isinstance(value, list) else 0 for value in values)
+
+
+def benchmark_memory(name: str, code: str, release: bool):
+    """Function parses the provided code and prints the amount of memory the nodes of the program use
+
+    Args:
+        name            : Name of the benchmark which is printed
+        code            : The code that needs to be parsed
+        release         : Whether the program is released with node_release before it is measured
+    """
+    tokens      = list(tokenize(code))
+    tracemalloc.start()
+    program     = parse_program(code, tokens)
+    if release:
+        program = node_release(program)
+    memory, _   = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes       = count_nodes(program)
+    print(f"{name:<25}{nodes:>10} nodes{memory / nodes:>16,.1f} bytes/node")
+
+
+def benchmark_flat_program(name: str, code: str, rounds: int):
+    """Function compares a FlatProgram with a tree of nodes. It prints the time it takes to load a program from bytes
+    with pickle and with flat_program_load, and the time it takes to count the identifiers of the program
+
+    Args:
+        name            : Name of the benchmark which is printed
+        code            : The code that needs to be parsed
+        rounds          : The amount of times every step is done
+    """
+    def count_identifiers(node: Node) -> int:
+        return (type(node) is Identifier) + sum(count_identifiers(value) if isinstance(value, Node) else 
+            sum(count_identifiers(item) for item in value if isinstance(item, Node)) if isinstance(value, list) else 0 
+            for value in (getattr(node, name) for name in node_child_names(type(node))))
+
+    program     = parse_program(code, tokenize(code))
+    pickled     = pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL)
+    f           = io.BytesIO()
+    flat_program_dump(flat_program_from_program(program), f)
+    flat        = f.getvalue()
+    loaded      = flat_program_load(flat)
+    identifier  = node_kind_indexes[Identifier]
+
+    steps = [
+        ("pickle load", lambda: pickle.loads(pickled)),
+        ("flat load", lambda: flat_program_load(flat)),
+        ("flat to nodes", lambda: program_from_flat_program(loaded)),
+        ("count tree", lambda: count_identifiers(program)),
+        ("count flat", lambda: loaded.kinds.tobytes().count(identifier))
+    ]
+    for step, function in steps:
+        time_start  = time.perf_counter()
+        for _ in range(rounds):
+            function()
+        time_stop   = time.perf_counter()
+        print(f"{name + ' ' + step:<25}{len(loaded):>10} nodes{(time_stop-time_start) / rounds * 1000:>15,.3f} ms")
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with open(root_dir + "/fibonachi.txt", 'rb') as f:
+        fibonachi = f.read().decode("utf-8")
+
+    for repetitions in [1, 10, 100]:
+        benchmark(f"fibonachi x{repetitions}", "\n".join([fibonachi] * repetitions), parse, rounds)
+    for repetitions in [1, 10, 100]:
+        benchmark(f"fibonachi x{repetitions} lazy", "\n".join([fibonachi] * repetitions), lambda code, tokens: parse(code, tokens, lazy_function_bodies=True), rounds)
+    for terms in [10, 100, 1000]:
+        benchmark(f"expression x{terms}", "📁 var1 = " + " + ".join(["2 * var1"] * terms), parse, rounds)
+    for repetitions in [300, 3000, 15000]:
+        code    = "\n".join([fibonachi] * repetitions)
+        middle  = code.index("15", len(code) // 2)
+        benchmark_reparse(f"reparse x{repetitions}", code, middle, middle + 2, "16", rounds)
+        benchmark_reparse(f"reparse x{repetitions} moved", code, middle, middle + 2, "160", rounds)
+
+    for repetitions in [10, 100]:
+        benchmark_memory(f"memory x{repetitions}", "\n".join([fibonachi] * repetitions), False)
+        benchmark_memory(f"memory x{repetitions} release", "\n".join([fibonachi] * repetitions), True)
+    benchmark_flat_program("flat x100", "\n".join([fibonachi] * 100), rounds)
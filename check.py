@@ -0,0 +1,195 @@
+"""
+@file check.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file is used to check the syntax of many files containing the alt-f4 programming language in parallel
+@version 0.1
+@date 18-10-2026
+"""
+
+import sys
+import os
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Iterable, Optional
+from lexer_module.lexer import tokenize
+from parser_module.parser import statement_parsers
+from misc.token_types import *
+from misc.token_cursor import TokenCursor, cursor_at_end, cursor_peek, cursor_next
+from misc.error_message import Diagnostic, DiagnosticError, generate_error_message
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """
+    CheckResult class
+        The result of checking the syntax of one source file
+    ...
+
+    Attributes
+    ----------
+    path : str
+        The path of the source file
+    diagnostics : List[Diagnostic]
+        The errors found in the source file, an empty list when the syntax is valid
+    tokens : int
+        The amount of tokens of the source file, 0 when it could not be lexed
+    lex_time : float
+        The amount of seconds it took to lex the source file
+    parse_time : float
+        The amount of seconds it took to parse the source file
+    """
+    path        : str
+    diagnostics : List[Diagnostic]
+    tokens      : int
+    lex_time    : float = field(compare=False)
+    parse_time  : float = field(compare=False)
+
+
+def find_source_files(paths: Iterable[str], extension: str=".txt") -> List[str]:
+    """Function finds the source files that need to be checked. Files are used as they are, directories are
+    searched recursively for files ending with extension
+
+    Args:
+        paths               : Paths of source files and directories
+        extension           : The extension of the source files in a directory, default=".txt"
+
+    Returns:
+        A list containing the paths of the source files
+    """
+    source_files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            source_files.append(path)
+            continue
+        for directory, directory_names, file_names in os.walk(path):
+            directory_names.sort()
+            source_files.extend(os.path.join(directory, name) for name in sorted(file_names) if name.endswith(extension))
+    return source_files
+
+
+def parse_diagnostics(characters: str, tokens: List[Token]) -> List[Diagnostic]:
+    """Function parses all tokens and collects the syntax errors instead of stopping at the first one. After an error,
+    parsing continues at the next top level statement, which is a statement at the start of a line after the error
+
+    Args:
+        characters          : Characters that are being lexed and parsed
+        tokens              : Tokens of the characters, ending with an EOF token
+
+    Returns:
+        A list containing a Diagnostic for every syntax error that was found
+    """
+    cursor, diagnostics = TokenCursor(tokens), []
+    while True:
+        head = cursor_peek(cursor)
+        if head.tokentype_ == TokenTypes.EOF or cursor_at_end(cursor):
+            return diagnostics
+        if head.tokentype_ in (TokenTypes.NEW_LINE, TokenTypes.TAB):
+            cursor_next(cursor)
+            continue
+
+        statement_start = cursor.index
+        try:
+            parse_statement = statement_parsers.get(head.tokentype_)
+            if parse_statement is None:
+                generate_error_message(head, characters, "Invalid Syntax", True)
+            parse_statement(characters, cursor)
+        except DiagnosticError as error:
+            diagnostics.append(error.diagnostic)
+            cursor.index = next_statement_index(tokens, min(max(cursor.index, statement_start + 1), len(tokens) - 1), error.diagnostic.line)
+
+
+def next_statement_index(tokens: List[Token], index: int, line: int) -> int:
+    """Function returns the index of the first token from index onwards that starts a top level statement after line.
+    A top level statement starts directly after a TokenTypes.NEW_LINE token, without indentation. Returns the index of
+    the EOF token when there is no such statement"""
+    while index < len(tokens) - 1 and tokens[index].tokentype_ != TokenTypes.EOF:
+        token = tokens[index]
+        if token.tokentype_ in statement_parsers and token.loc_["start"]["line"] > line \
+        and tokens[index-1].tokentype_ == TokenTypes.NEW_LINE:
+            return index
+        index += 1
+    return index
+
+
+def check_file(path: str) -> CheckResult:
+    """Function lexes and parses a source file and collects its syntax errors
+
+    Args:
+        path                : The path of the source file
+
+    Returns:
+        A CheckResult containing the syntax errors and timings of the source file. A file that could not be read, 
+        or that made the lexer or parser fail with another error than a syntax error, gets one Diagnostic describing that error
+    """
+    tokens, diagnostics, lex_time, parse_time = [], [], 0.0, 0.0
+    try:
+        with open(path, 'rb') as f:
+            code = f.read().decode("utf-8")
+        time_start  = time.perf_counter()
+        tokens      = list(tokenize(code))
+        lex_time    = time.perf_counter() - time_start
+        diagnostics = parse_diagnostics(code, tokens)
+        parse_time  = time.perf_counter() - time_start - lex_time
+    except DiagnosticError as error:
+        diagnostics.append(error.diagnostic)
+    except (OSError, UnicodeDecodeError, RecursionError) as error:
+        diagnostics.append(Diagnostic(f"{type(error).__name__}: {error}", 0, 0, 0, ""))
+    except Exception as error:
+        diagnostics.append(Diagnostic(f"Internal error: {type(error).__name__}: {error}", 0, 0, 0, ""))
+    return CheckResult(path, diagnostics, len(tokens), lex_time, parse_time)
+
+
+def check_files(paths: List[str], workers: Optional[int]=None) -> List[CheckResult]:
+    """Function checks the syntax of source files in a pool of processes
+
+    Args:
+        paths               : The paths of the source files
+        workers             : The amount of processes that check files, default=None which uses every cpu.
+                              When workers is 1, the files are checked in the current process
+
+    Returns:
+        A list containing the CheckResult of every source file, in the order of paths
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        return list(map(check_file, paths))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(check_file, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+
+def format_diagnostic(path: str, diagnostic: Diagnostic) -> str:
+    """Function formats a diagnostic like the error messages of generate_error_message, prefixed by the path of the file"""
+    error_message = f"{path}:{diagnostic.line}:{diagnostic.column + 1}: {diagnostic.message}"
+    if diagnostic.source_line:
+        error_message += f"\n\t{diagnostic.source_line}\n\t{' ' * diagnostic.column + '^' * max(diagnostic.width, 1)}"
+    return error_message
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Check the syntax of files containing the alt-f4 programming language")
+    argument_parser.add_argument("paths", nargs="+", help="Source files, or directories which are searched for source files")
+    argument_parser.add_argument("--workers", type=int, default=None, help="The amount of processes that check files, default is the amount of cpus")
+    argument_parser.add_argument("--extension", default=".txt", help="The extension of the source files in a directory, default is .txt")
+    arguments = argument_parser.parse_args()
+
+    paths       = find_source_files(arguments.paths, arguments.extension)
+    time_start  = time.perf_counter()
+    results     = check_files(paths, arguments.workers)
+    time_stop   = time.perf_counter()
+
+    for result in results:
+        status = "ok" if not result.diagnostics else f"{len(result.diagnostics)} error(s)"
+        print(f"{result.path:<60} {status:<12} {result.tokens:>8} tokens   lex {result.lex_time*1000:>8.2f} ms   parse {result.parse_time*1000:>8.2f} ms")
+        for diagnostic in result.diagnostics:
+            print(format_diagnostic(result.path, diagnostic))
+
+    invalid_files = sum(1 for result in results if result.diagnostics)
+    print(f"\nChecked {len(results)} files in {time_stop-time_start:.3f} s with {arguments.workers or os.cpu_count()} workers: "
+          f"{invalid_files} invalid, {sum(len(result.diagnostics) for result in results)} errors, {sum(result.tokens for result in results)} tokens, "
+          f"lex {sum(result.lex_time for result in results):.3f} s, parse {sum(result.parse_time for result in results):.3f} s")
+    exit(1 if invalid_files else 0)
@@ -0,0 +1,299 @@
+"""
+@file compiler.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains a second execution engine, which compiles a parsed program into python closures once and
+       runs the program by calling them
+@version 0.1
+@date 18-10-2026
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from parser_module.parser import parse_lazy_block_statement
+from misc.token_types import *
+from misc.node_types import *
+from misc.error_message import generate_error_message
+from misc.symbol_table import *
+
+# An expression closure returns the value of the expression, or None for a call of 🖨 which has no value. A statement
+# closure returns None when the statements after it need to be interpreted, or a tuple with the values of the return
+# statement that was interpreted
+Expression  = Callable[[SymbolTable], Any]
+Statement   = Callable[[SymbolTable], Optional[Tuple[Any, ...]]]
+
+# The node types which compile into an expression closure
+expression_types = (Identifier, Literal, CallExpression, UnaryExpression, BinaryExpression)
+
+
+@dataclass(frozen=True)
+class CompiledFunction:
+    """
+    CompiledFunction class
+        The compiled body of a function declaration
+    ...
+
+    Attributes
+    ----------
+    declaration : FunctionDeclaration
+        The function declaration that was compiled
+    parameter_names : List[str]
+        The names of the parameters of the function
+    body : Statement
+        The closure of the statements of the function body
+    """
+    declaration     : FunctionDeclaration
+    parameter_names : List[str]
+    body            : Statement
+
+
+@dataclass(frozen=True)
+class CompileContext:
+    """
+    CompileContext class
+        The state that is shared by the closures of one program
+    ...
+
+    Attributes
+    ----------
+    code : str
+        The code of the program, used by error messages and to parse lazy function bodies
+    functions : Dict[int, CompiledFunction]
+        The compiled function of every function declaration, by the id of the declaration
+    """
+    code        : str
+    functions   : Dict[int, CompiledFunction] = field(default_factory=dict)
+
+
+def compile_program(code: str, program: Program) -> Callable[[SymbolTable], SymbolTable]:
+    """Function compiles a program into a closure. Calling the closure with a global symbol table interprets the
+    program in the same way as interpret_loop
+
+    Args:
+        code                : The code of the program
+        program             : The program that needs to be compiled
+
+    Returns:
+        A closure which interprets the program with the provided symbol table, and returns the symbol table
+    """
+    context = CompileContext(code)
+    body    = compile_statements(context, program.body_, False)
+    def run(symbol_table: SymbolTable) -> SymbolTable:
+        body(symbol_table)
+        return symbol_table
+    return run
+
+def interpret_compiled(code: str, program: Program) -> SymbolTable:
+    """Function compiles a program and runs it, like interpret
+
+    Args:
+        code                : The code of the program
+        program             : The program that needs to be run
+
+    Returns:
+        The global symbol table after the program has been run, which is the same as the result of interpret
+    """
+    symbol_table = SymbolTable(symbols={}, parent=None, return_symbols=[], return_stop=False)
+    symbol_table = symbol_table_set(symbol_table, "🖨", print)
+    return compile_program(code, program)(symbol_table)
+
+
+def compile_statements(context: CompileContext, nodes: List[Node], in_function: bool) -> Statement:
+    """Function compiles the statements of a body into one closure, which stops after a return statement"""
+    statements = [compile_statement(context, node, in_function) for node in nodes]
+    def block(symbol_table: SymbolTable) -> Optional[Tuple[Any, ...]]:
+        for statement in statements:
+            returned = statement(symbol_table)
+            if returned is not None:
+                return returned
+    return block
+
+def compile_statement(context: CompileContext, node: Node, in_function: bool) -> Statement:
+    """Function compiles a node of a body into a statement closure. The value of an expression that is used as a
+    statement is added to the return symbols of the symbol table, like interpret_loop does"""
+    if isinstance(node, expression_types):
+        expression = compile_expression(context, node)
+        def expression_statement(symbol_table: SymbolTable) -> None:
+            value = expression(symbol_table)
+            if value is not None:
+                symbol_table.return_symbols.append(value)
+        return expression_statement
+    return compile_methods.get(type(node), no_compile_method)(context, node, in_function)
+
+def compile_expression(context: CompileContext, node: Node) -> Expression:
+    """Function compiles an expression node into an expression closure"""
+    return compile_methods.get(type(node), no_compile_method)(context, node, False)
+
+
+def compile_Identifier(context: CompileContext, node: Identifier, in_function: bool) -> Expression:
+    name, code = node.name_, context.code
+    def identifier(symbol_table: SymbolTable) -> Any:
+        while symbol_table is not None:
+            value = symbol_table.symbols.get(name)
+            if value is not None:
+                return value
+            symbol_table = symbol_table.parent
+        generate_error_message(node, code, f"{name} is not defined", True)
+    return identifier
+
+def compile_Literal(context: CompileContext, node: Literal, in_function: bool) -> Expression:
+    value = node.value_
+    return lambda symbol_table: value
+
+def compile_UnaryExpression(context: CompileContext, node: UnaryExpression, in_function: bool) -> Expression:
+    argument = compile_expression(context, node.argument_)
+    if node.operator_ == TokenTypes.MINUS:
+        return lambda symbol_table: argument(symbol_table) * -1
+    return argument
+
+def compile_BinaryExpression(context: CompileContext, node: BinaryExpression, in_function: bool) -> Expression:
+    operator    = node.operator_
+    left, right = compile_expression(context, node.left_), compile_expression(context, node.right_)
+
+    if   operator == TokenTypes.PLUS          : return lambda symbol_table: left(symbol_table) + right(symbol_table)
+    elif operator == TokenTypes.MINUS         : return lambda symbol_table: left(symbol_table) - right(symbol_table)
+    elif operator == TokenTypes.DIVIDE        : return lambda symbol_table: left(symbol_table) / right(symbol_table)
+    elif operator == TokenTypes.MULTIPLY      : return lambda symbol_table: left(symbol_table) * right(symbol_table)
+    elif operator == TokenTypes.POWER         : return lambda symbol_table: left(symbol_table) ** right(symbol_table)
+    elif operator == TokenTypes.IS_EQUAL      : return lambda symbol_table: left(symbol_table) == right(symbol_table)
+    elif operator == TokenTypes.GREATER_THAN  : return lambda symbol_table: left(symbol_table) > right(symbol_table)
+    elif operator == TokenTypes.SMALLER_THAN  : return lambda symbol_table: left(symbol_table) < right(symbol_table)
+    elif operator in (TokenTypes.AND, TokenTypes.OR):
+        # Both operands are always interpreted, like interpret_BinaryExpression does
+        is_and = operator == TokenTypes.AND
+        def logical_expression(symbol_table: SymbolTable) -> Any:
+            left_value, right_value = left(symbol_table), right(symbol_table)
+            return (left_value and right_value) if is_and else (left_value or right_value)
+        return logical_expression
+    return no_compile_method(context, node, in_function)
+
+def compile_CallExpression(context: CompileContext, node: CallExpression, in_function: bool) -> Expression:
+    callee, arguments = compile_callee_and_arguments(context, node)
+    def call(symbol_table: SymbolTable) -> Any:
+        function = callee(symbol_table)
+        values   = [argument(symbol_table) for argument in arguments]
+        if function is print: print(*values); return None
+        return call_function(context, function, values, symbol_table)
+    return call
+
+def compile_callee_and_arguments(context: CompileContext, node: CallExpression) -> Tuple[Expression, List[Expression]]:
+    return compile_expression(context, node.callee_), [compile_expression(context, argument) for argument in node.arguments_]
+
+def call_function(context: CompileContext, function: FunctionDeclaration, arguments: List[Any], symbol_table: SymbolTable) -> Any:
+    """Function calls a compiled function, in the same way as interpret_function_call. A TailCall returned by the
+    function is called by the same loop, with the scopes of the functions that made a tail call merged into one
+
+    Args:
+        context             : The context of the program
+        function            : The FunctionDeclaration that needs to be called
+        arguments           : The values of the arguments of the call
+        symbol_table        : The symbol table of the caller
+
+    Returns:
+        The value the function returned. Raises a TypeError when the function did not return exactly one value
+    """
+    scope = symbol_table
+    while True:
+        compiled                = compiled_function(context, function)
+        function_symbol_table   = SymbolTable(symbols=dict(zip(compiled.parameter_names, arguments)), parent=scope, return_symbols=[], return_stop=False)
+        returned                = compiled.body(function_symbol_table)
+
+        if function_symbol_table.return_symbols:
+            returned = (*function_symbol_table.return_symbols, *(returned or ()))
+        if returned is None or len(returned) != 1:
+            raise TypeError(f"function {function.id_} returned {0 if returned is None else len(returned)} values instead of 1")
+        if type(returned[0]) is not TailCall:
+            return returned[0]
+        function, arguments = returned[0].function, returned[0].arguments
+        if scope is symbol_table:
+            scope = SymbolTable(symbols=function_symbol_table.symbols, parent=symbol_table, return_symbols=[], return_stop=False)
+        else:
+            scope.symbols.update(function_symbol_table.symbols)
+
+def compiled_function(context: CompileContext, function: FunctionDeclaration) -> CompiledFunction:
+    """Function returns the compiled function of a function declaration. The body is compiled the first time the
+    function is called, so the functions of a program which are never called are never compiled. A lazy function
+    body is parsed first"""
+    compiled = context.functions.get(id(function))
+    if compiled is None or compiled.declaration is not function:
+        body     = function.body_
+        if type(body) is LazyBlockStatement:
+            body = parse_lazy_block_statement(context.code, body)
+        compiled = CompiledFunction(function, [parameter.name_ for parameter in function.params_], compile_statements(context, body.body_, True))
+        context.functions[id(function)] = compiled
+    return compiled
+
+
+def compile_VariableDeclaration(context: CompileContext, node: VariableDeclaration, in_function: bool) -> Statement:
+    name, init = node.id_, compile_expression(context, node.init_)
+    def variable_declaration(symbol_table: SymbolTable) -> None:
+        value = init(symbol_table)
+        if value is None:
+            raise TypeError(f"{name} can not be set to the result of a call without a value")
+        symbol_table.symbols[name] = value
+    return variable_declaration
+
+def compile_FunctionDeclaration(context: CompileContext, node: FunctionDeclaration, in_function: bool) -> Statement:
+    name, code = node.id_, context.code
+    def function_declaration(symbol_table: SymbolTable) -> None:
+        if symbol_table_symbol_exists(symbol_table, name):
+            generate_error_message(node, symbol_table.symbols[name], code, "Runtime Error, found duplicate function identifier", True)
+        symbol_table.symbols[name] = node
+    return function_declaration
+
+def compile_IfStatement(context: CompileContext, node: IfStatement, in_function: bool) -> Statement:
+    test        = compile_expression(context, node.test_)
+    consequent  = compile_statement(context, node.consequent_, in_function)
+    alternate   = compile_statement(context, node.alternate_, in_function) if node.alternate_ else (lambda symbol_table: None)
+    def if_statement(symbol_table: SymbolTable) -> Optional[Tuple[Any, ...]]:
+        if test(symbol_table):
+            return consequent(symbol_table)
+        return alternate(symbol_table)
+    return if_statement
+
+def compile_ReturnStatement(context: CompileContext, node: ReturnStatement, in_function: bool) -> Statement:
+    if in_function and type(node.argument_) is CallExpression:
+        callee, arguments = compile_callee_and_arguments(context, node.argument_)
+        def tail_call(symbol_table: SymbolTable) -> Tuple[Any, ...]:
+            function = callee(symbol_table)
+            values   = [argument(symbol_table) for argument in arguments]
+            if function is print: print(*values); return ()
+            return (TailCall(function, values),)
+        return tail_call
+
+    argument = compile_expression(context, node.argument_)
+    if in_function:
+        def return_statement(symbol_table: SymbolTable) -> Tuple[Any, ...]:
+            value = argument(symbol_table)
+            return () if value is None else (value,)
+        return return_statement
+
+    # A return statement outside of a function stops the program and leaves its value in the return symbols
+    def program_return_statement(symbol_table: SymbolTable) -> Tuple[Any, ...]:
+        value = argument(symbol_table)
+        if value is not None:
+            symbol_table.return_symbols.append(value)
+        symbol_table.return_stop = True
+        return ()
+    return program_return_statement
+
+def compile_BlockStatement(context: CompileContext, node: BlockStatement, in_function: bool) -> Statement:
+    return compile_statements(context, node.body_, in_function)
+
+def compile_LazyBlockStatement(context: CompileContext, node: LazyBlockStatement, in_function: bool) -> Statement:
+    return compile_statements(context, parse_lazy_block_statement(context.code, node).body_, in_function)
+
+def no_compile_method(context: CompileContext, node: Node, in_function: bool) -> Statement:
+    def no_method(symbol_table: SymbolTable) -> None:
+        print("no interpret method for node type", type(node))
+    return no_method
+
+
+# The compile method of every node type, like interpret_methods
+compile_methods: Dict[type, Callable[[CompileContext, Node, bool], Callable[[SymbolTable], Any]]] = {
+    node_type: globals().get(f"compile_{node_type.__name__}", no_compile_method) for node_type in Node.__subclasses__()
+}
@@ -4,29 +4,54 @@ import time
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Tuple, Callable, Optional, Dict, List
-from lexer_module.lexer import lex, search_match
-from parser_module.parser import parse
+from typing import Any, Tuple, Callable, Optional, Dict, List, Iterable
+from lexer_module.lexer import tokenize
+from parser_module.parser import parse, parse_program, parse_lazy_block_statement
 from misc.token_types import *
 from misc.node_types import *
+from misc.node_json import program_json_dump
 from misc.error_message import generate_error_message
 from misc.symbol_table import *
 
 def interpret_CallExpression(code: str, node: CallExpression, symbol_table: SymbolTable):
-    callee, symbol_table = symbol_table_get_and_del_return_symbol(interpret_Identifier(code, node.callee_, symbol_table))
-    result, symbol_table = symbol_table_get_and_del_return_symbol(interpret_loop(code, node.arguments_, symbol_table))
-
-    if callee[0] == print: print(*result); return symbol_table
-    argument_names  = [argument.name_ for argument in callee[0].params_]
-    arguments       = list(zip(argument_names, result))
-
-    function_symbol_table = SymbolTable(symbols={}, parent=symbol_table, return_symbols=[], return_stop=False)
-    function_symbol_table = symbol_table_set_list_of_arguments(function_symbol_table, arguments)
-    function_symbol_table = interpret_loop(code, [callee[0].body_], function_symbol_table)
-    
-    result, function_symbol_table = symbol_table_get_and_del_return_symbol(function_symbol_table)
-    symbol_table = symbol_table_add_return_symbol(symbol_table, *result)
-    return symbol_table
+    callee, arguments, symbol_table = interpret_callee_and_arguments(code, node, symbol_table)
+    if callee == print: print(*arguments); return symbol_table
+    return interpret_function_call(code, callee, arguments, symbol_table)
+
+def interpret_callee_and_arguments(code: str, node: CallExpression, symbol_table: SymbolTable) -> Tuple[Any, List[Any], SymbolTable]:
+    callee, symbol_table    = symbol_table_get_and_del_return_symbol(interpret_Identifier(code, node.callee_, symbol_table))
+    result, symbol_table    = symbol_table_get_and_del_return_symbol(interpret_loop(code, node.arguments_, symbol_table))
+    return callee[0], result, symbol_table
+
+def interpret_function_call(code: str, function: FunctionDeclaration, arguments: List[Any], symbol_table: SymbolTable) -> SymbolTable:
+    """Function interprets the body of a function and adds its result to the return symbols of symbol_table. When 
+    the function returns a TailCall, the called function is interpreted by the same loop, so a chain of tail calls
+    runs in constant stack space. The scope of a function that returned a TailCall is never changed again, so it is
+    merged into a single scope below the next function. Names are found in the same scopes as with a normal call
+
+    Args:
+        function            : The FunctionDeclaration that needs to be called
+        arguments           : The values of the arguments of the call
+        symbol_table        : The symbol table of the caller
+
+    Returns:
+        The symbol table of the caller, with the result of the function in its return symbols
+    """
+    scope = symbol_table
+    while True:
+        argument_names          = [argument.name_ for argument in function.params_]
+        function_symbol_table   = SymbolTable(symbols={}, parent=scope, return_symbols=[], return_stop=False)
+        function_symbol_table   = symbol_table_set_list_of_arguments(function_symbol_table, list(zip(argument_names, arguments)))
+        function_symbol_table   = interpret_loop(code, [function.body_], function_symbol_table)
+
+        result, function_symbol_table = symbol_table_get_and_del_return_symbol(function_symbol_table)
+        if len(result) != 1 or type(result[0]) is not TailCall:
+            return symbol_table_add_return_symbol(symbol_table, *result)
+        function, arguments = result[0].function, result[0].arguments
+        if scope is symbol_table:
+            scope = SymbolTable(symbols=function_symbol_table.symbols, parent=symbol_table, return_symbols=[], return_stop=False)
+        else:
+            scope.symbols.update(function_symbol_table.symbols)
     
 
 def interpret_Identifier(code: str, node: Identifier, symbol_table: SymbolTable):
@@ -50,6 +75,7 @@ def interpret_BinaryExpression(code: str, node: BinaryExpression, symbol_table:
     elif operator == TokenTypes.MINUS         : result = left - right
     elif operator == TokenTypes.DIVIDE        : result = left / right
     elif operator == TokenTypes.MULTIPLY      : result = left * right
+    elif operator == TokenTypes.POWER         : result = left ** right
     elif operator == TokenTypes.IS_EQUAL      : result = left == right
     elif operator == TokenTypes.GREATER_THAN  : result = left > right
     elif operator == TokenTypes.SMALLER_THAN  : result = left < right
@@ -92,25 +118,31 @@ def interpret_UnaryExpression(code: str, node: Node, symbol_table: SymbolTable):
     return symbol_table_add_return_symbol(symbol_table, number)
 
 def interpret_ReturnStatement(code: str, node: ReturnStatement, symbol_table: SymbolTable):
-    symbol_table = interpret_loop(code, [node.argument_], symbol_table)
+    if type(node.argument_) is CallExpression and symbol_table.parent is not None:
+        callee, arguments, symbol_table = interpret_callee_and_arguments(code, node.argument_, symbol_table)
+        if callee == print: print(*arguments)
+        else: symbol_table = symbol_table_add_return_symbol(symbol_table, TailCall(callee, arguments))
+    else:
+        symbol_table = interpret_loop(code, [node.argument_], symbol_table)
     symbol_table = symbol_table_set_return_stop(symbol_table)
     return symbol_table
 
 def interpret_BlockStatement(code: str, node: BlockStatement, symbol_table: SymbolTable):
     return interpret_loop(code, node.body_, symbol_table)
 
+def interpret_LazyBlockStatement(code: str, node: LazyBlockStatement, symbol_table: SymbolTable):
+    return interpret_loop(code, parse_lazy_block_statement(code, node).body_, symbol_table)
+
 def interpret_loop(code, program_nodes: List[Node], symbol_table: SymbolTable) -> SymbolTable:
-    if len(program_nodes) == 0 or symbol_table.return_stop == True:
-        return symbol_table
-    
-    node, *tail = program_nodes
-    node_type = type(node)
-    
-    method_name  = f"interpret_{type(node).__name__}"
-    method       = get_attribute(method_name, no_interpret_method)
-    symbol_table = method(code, node, symbol_table)
-    
-    return interpret_loop(code, tail, symbol_table)
+    for node in program_nodes:
+        if symbol_table.return_stop: break
+        symbol_table = interpret_methods.get(type(node), no_interpret_method)(code, node, symbol_table)
+    return symbol_table
+
+# The interpret method of every node type, resolved once instead of every time a node is interpreted
+interpret_methods: Dict[type, Callable[[str, Node, SymbolTable], SymbolTable]] = {
+    node_type: get_attribute(f"interpret_{node_type.__name__}", no_interpret_method) for node_type in Node.__subclasses__()
+}
 
 
 def interpret(code, program: Program):
@@ -118,6 +150,16 @@ def interpret(code, program: Program):
     symbol_table = symbol_table_set(symbol_table, "🖨", print)
     return interpret_loop(code, program.body_, symbol_table)
 
+def interpret_statements(code, statements: Iterable[Node]) -> SymbolTable:
+    """Function interprets top level statements as soon as they are produced, like the statements of parse_iter.
+    Every statement is interpreted with the same global symbol table and is not kept after it has been interpreted"""
+    symbol_table = SymbolTable(symbols={}, parent=None, return_symbols=[], return_stop=False)
+    symbol_table = symbol_table_set(symbol_table, "🖨", print)
+    for statement in statements:
+        symbol_table = interpret_loop(code, [statement], symbol_table)
+        if symbol_table.return_stop: break
+    return symbol_table
+
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
@@ -127,14 +169,12 @@ if __name__ == '__main__':
     with open(sys.argv[1], "rb") as f:
         code = f.read().decode("utf-8")  
 
-    lexed = lex(code, search_match, TokenExpressions)
-    tokens = list(filter(lambda token: token.tokentype_ != TokenTypes.NONE, lexed))
+    tokens = tokenize(code)
 
-    parsed, eof_token = parse(code, tokens)
-    program = Program(loc_={'start': {'line': 1, 'index': 0}, "end":{"line":tokens[-1].loc_["start"]["line"], "index":tokens[-1].loc_["start"]["index"]}}, range_=[0, len(code)], body_=parsed)
+    program = parse_program(code, tokens)
     
-    with open("ast_to_interpret.json", "wb") as f:
-        f.write(program.jsonify().encode("utf-8"))
+    with open("ast_to_interpret.json", "w", encoding="utf-8", newline="") as f:
+        program_json_dump(program, f)
     
     time_start = time.time()
     result = interpret(code, program)
@@ -0,0 +1,517 @@
+"""
+@file transpiler.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains a backend which transpiles a parsed program to python source, compiles it with compile()
+       and runs the python code
+@version 0.1
+@date 18-10-2026
+"""
+
+import sys
+import os
+import marshal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass, field
+from types import CodeType
+from typing import Any, Dict, List, Optional, Set, Tuple
+from misc.token_types import *
+from misc.node_types import *
+from misc.error_message import generate_error_message, DiagnosticError
+from misc.source_file import get_source_file, source_file_location, source_file_line
+from misc.symbol_table import *
+
+# The file name of the python code, used to find the frames of the transpiled program in a traceback
+transpiled_file_name    = "<alt-f4>"
+transpiled_magic        = "ALTUPY1"
+
+# The python operators of binary expressions. And and or are transpiled to calls of logical_and and logical_or,
+# because interpret_BinaryExpression interprets both operands
+python_operators = {
+    TokenTypes.PLUS         : "+",
+    TokenTypes.MINUS        : "-",
+    TokenTypes.DIVIDE       : "/",
+    TokenTypes.MULTIPLY     : "*",
+    TokenTypes.POWER        : "**",
+    TokenTypes.IS_EQUAL     : "==",
+    TokenTypes.GREATER_THAN : ">",
+    TokenTypes.SMALLER_THAN : "<",
+    TokenTypes.AND          : "_and",
+    TokenTypes.OR           : "_or"
+}
+
+
+@dataclass(frozen=True)
+class TranspiledProgram:
+    """
+    TranspiledProgram class
+        A program that has been transpiled to python
+    ...
+
+    Attributes
+    ----------
+    source : str
+        The python source of the program
+    code : CodeType
+        The code object compiled from source
+    line_ranges : Tuple[Tuple[int, int], ...]
+        The range_ of the statement every line of source was created from
+    line_identifiers : Tuple[Tuple[Tuple[str, int, int], ...], ...]
+        The python name and range_ of every identifier that is read by every line of source, in the order they are read
+    """
+    source              : str
+    code                : CodeType
+    line_ranges         : Tuple[Tuple[int, int], ...]
+    line_identifiers    : Tuple[Tuple[Tuple[str, int, int], ...], ...]
+
+
+@dataclass
+class FunctionScope:
+    """
+    FunctionScope class
+        The names of the function that is being transpiled
+    ...
+
+    Attributes
+    ----------
+    name : str
+        The name of the function
+    bound : Set[str]
+        All names that are declared by the function and its parameters
+    assigned : Set[str]
+        The names that are always declared at the statement that is being transpiled
+    possibly_assigned : Set[str]
+        The names that might be declared at the statement that is being transpiled
+    tail_calls : bool
+        True when the function contains a tail call
+    """
+    name                : str
+    bound               : Set[str]
+    assigned            : Set[str]
+    possibly_assigned   : Set[str]
+    tail_calls          : bool = False
+
+
+@dataclass
+class TranspileState:
+    """
+    TranspileState class
+        The python source that has been created while a program is transpiled
+    ...
+
+    Attributes
+    ----------
+    lines : List[str]
+        The lines of python source
+    line_ranges : List[Tuple[int, int]]
+        The range_ of the statement of every line
+    line_identifiers : List[Tuple[Tuple[str, int, int], ...]]
+        The identifiers read by every line
+    function_bound : Set[str]
+        The names that are declared by any function or parameter of the program
+    global_bound : Set[str]
+        The names that might be declared in the global scope at the statement that is being transpiled
+    function_parameters : Dict[str, int]
+        The largest amount of parameters of the functions a name can refer to, for names that are only declared by
+        function declarations
+    most_parameters : int
+        The largest amount of parameters of any function of the program
+    """
+    lines               : List[str] = field(default_factory=list)
+    line_ranges         : List[Tuple[int, int]] = field(default_factory=list)
+    line_identifiers    : List[Tuple[Tuple[str, int, int], ...]] = field(default_factory=list)
+    function_bound      : Set[str] = field(default_factory=set)
+    global_bound        : Set[str] = field(default_factory=set)
+    function_parameters : Dict[str, int] = field(default_factory=dict)
+    most_parameters     : int = 0
+
+
+class ProgramReturn(Exception):
+    """Exception raised by a transpiled return statement outside of a function, which stops the program"""
+
+
+def transpile_program(program: Program) -> TranspiledProgram:
+    """Function transpiles a program to python source and compiles it. Variables become python variables and
+    functions python functions, so the program runs at the speed of python code. Like interpret_function_call, a
+    call ignores the arguments after the last parameter. Python has no dynamic scoping, so programs in which a
+    function reads a variable that is declared by another function, might read a variable before it is declared,
+    or might be called with fewer arguments than it has parameters can not be transpiled. Tail calls are run by a
+    trampoline, like interpret_function_call does
+
+    Args:
+        program             : The program that needs to be transpiled
+
+    Returns:
+        If python can run the program in the same way as interpret:
+            The TranspiledProgram
+        Otherwise, or if a function body has not been parsed by a lazy parser:
+            Raises a ValueError which tells why the program can not be transpiled
+    """
+    state = TranspileState(function_bound=function_bound_names(program))
+    state.function_parameters, state.most_parameters = function_parameter_counts(program)
+    transpile_statements(state, program.body_, None, 0, program)
+    source = "\n".join(state.lines) + "\n"
+    try:
+        code = compile(source, transpiled_file_name, "exec")
+    except (SyntaxError, RecursionError, MemoryError) as error:
+        raise ValueError(f"python can not compile the transpiled program: {error}") from error
+    return TranspiledProgram(source, code, tuple(state.line_ranges), tuple(state.line_identifiers))
+
+def function_bound_names(program: Program) -> Set[str]:
+    """Function returns the names that are declared inside function bodies or as parameters"""
+    names, pending = set(), [(program, False)]
+    while pending:
+        node, in_function = pending.pop()
+        if type(node) is LazyBlockStatement:
+            if not node.parsed_:
+                raise ValueError("a function body has not been parsed")
+            node = node.parsed_[0]
+        if type(node) is FunctionDeclaration:
+            if in_function: names.add(node.id_)
+            names.update(parameter.name_ for parameter in node.params_)
+            pending.append((node.body_, True))
+            continue
+        if type(node) is VariableDeclaration and in_function:
+            names.add(node.id_)
+        for name in node_child_names(type(node)):
+            value = getattr(node, name)
+            pending += [(child, in_function) for child in (value if isinstance(value, list) else [value]) if isinstance(child, Node)]
+    return names
+
+def function_parameter_counts(program: Program) -> Tuple[Dict[str, int], int]:
+    """Function returns the largest amount of parameters of the functions every name can refer to, for the names
+    that are only declared by function declarations, and the largest amount of parameters of any function"""
+    counts, variables, pending = {}, set(), [program]
+    while pending:
+        node = pending.pop()
+        if type(node) is LazyBlockStatement and node.parsed_:
+            node = node.parsed_[0]
+        if type(node) is FunctionDeclaration:
+            counts[node.id_] = max(counts.get(node.id_, 0), len(node.params_))
+            variables.update(parameter.name_ for parameter in node.params_)
+        elif type(node) is VariableDeclaration:
+            variables.add(node.id_)
+        for name in node_child_names(type(node)):
+            value = getattr(node, name)
+            pending += [child for child in (value if isinstance(value, list) else [value]) if isinstance(child, Node)]
+    return {name: count for name, count in counts.items() if name not in variables}, max(counts.values(), default=0)
+
+
+def emit(state: TranspileState, indent: int, text: str, node: Node, identifiers: List[Tuple[str, int, int]]=()) -> int:
+    """Function adds a line of python source for a node and returns its index"""
+    state.lines.append("    " * indent + text)
+    state.line_ranges.append((node.range_start, node.range_end))
+    state.line_identifiers.append(tuple(identifiers))
+    return len(state.lines) - 1
+
+def transpile_statements(state: TranspileState, nodes: List[Node], scope: Optional[FunctionScope], indent: int, parent: Node) -> None:
+    """Function adds the python source of the statements of a body, or pass when the body is empty"""
+    if not nodes:
+        emit(state, indent, "pass", parent)
+    for node in nodes:
+        transpile_statement(state, node, scope, indent)
+
+def transpile_statement(state: TranspileState, node: Node, scope: Optional[FunctionScope], indent: int) -> None:
+    """Function adds the python source of a statement
+
+    Args:
+        state               : The state of the transpiler
+        node                : The statement that needs to be transpiled
+        scope               : The scope of the function the statement is part of, None for statements outside of functions
+        indent              : The indentation level of the python source
+    """
+    identifiers = []
+    if type(node) is VariableDeclaration:
+        value = transpile_expression(state, node.init_, scope, identifiers)
+        emit(state, indent, f"v_{node.id_} = {value}", node, identifiers)
+        declare(state, scope, node.id_)
+    elif type(node) is FunctionDeclaration:
+        transpile_function(state, node, scope, indent)
+    elif type(node) is IfStatement:
+        transpile_if_statement(state, node, scope, indent)
+    elif type(node) is ReturnStatement:
+        transpile_return_statement(state, node, scope, indent)
+    elif type(node) is BlockStatement:
+        transpile_statements(state, node.body_, scope, indent, node)
+    elif type(node) is LazyBlockStatement and node.parsed_:
+        transpile_statements(state, node.parsed_[0].body_, scope, indent, node)
+    elif is_print_call(node):
+        emit(state, indent, transpile_print_call(state, node, scope, identifiers), node, identifiers)
+    elif type(node) in (Identifier, Literal, CallExpression, UnaryExpression, BinaryExpression) and scope is None:
+        # The value of an expression outside of a function is added to the return symbols of the global symbol table
+        emit(state, indent, f"_return_symbols.append({transpile_expression(state, node, scope, identifiers)})", node, identifiers)
+    elif type(node) in (Identifier, Literal, CallExpression, UnaryExpression, BinaryExpression):
+        raise ValueError(f"function {scope.name} does not use the value of an expression, which interpret adds to its result")
+    else:
+        raise ValueError(f"a {type(node).__name__} can not be transpiled")
+
+def transpile_function(state: TranspileState, node: FunctionDeclaration, scope: Optional[FunctionScope], indent: int) -> None:
+    """Function adds the python source of a function declaration. A function which contains a tail call is
+    transpiled to a function which returns TailCalls, and a function which calls it with trampoline"""
+    name    = f"v_{node.id_}"
+    body    = node.body_.parsed_[0] if type(node.body_) is LazyBlockStatement else node.body_
+    if scope is None and node.id_ in state.global_bound:
+        emit(state, indent, f"if globals().get(\"{name}\"): _duplicate_function({name}, {node.range_start}, {node.range_end})", node)
+    elif scope is not None and node.id_ in scope.assigned:
+        emit(state, indent, f"if {name}: _duplicate_function({name}, {node.range_start}, {node.range_end})", node)
+    elif scope is not None and node.id_ in scope.possibly_assigned:
+        raise ValueError(f"function {scope.name} might declare {node.id_} twice")
+
+    parameters      = [parameter.name_ for parameter in node.params_]
+    bound           = set(parameters) | {statement.id_ for statement in declarations(body) if type(statement) in (VariableDeclaration, FunctionDeclaration)}
+    function_scope  = FunctionScope(node.id_, bound, set(parameters), set(parameters))
+    definition      = emit(state, indent, "", node)
+    transpile_statements(state, body.body_, function_scope, indent+1, body)
+    if not body.body_ or type(body.body_[-1]) is not ReturnStatement:
+        emit(state, indent+1, f"_no_value(\"{node.id_}\")", body)
+
+    # Like interpret_function_call, the arguments after the last parameter are ignored
+    arguments = ", ".join([f"v_{parameter}" for parameter in parameters] + ["*_"])
+    if function_scope.tail_calls:
+        state.lines[definition] = "    " * indent + f"def _tail_{name}({arguments}):"
+        emit(state, indent, f"def {name}(*arguments): return _trampoline(_tail_{name}(*arguments))", node)
+        emit(state, indent, f"{name}._tail = _tail_{name}", node)
+    else:
+        state.lines[definition] = "    " * indent + f"def {name}({arguments}):"
+    emit(state, indent, f"{name}._range = ({node.range_start}, {node.range_end})", node)
+    declare(state, scope, node.id_)
+
+def declarations(node: Node) -> List[Node]:
+    """Function returns the variable and function declarations of a body, including the ones inside if statements
+    but not the ones inside other functions"""
+    found, pending = [], list(node.body_)
+    while pending:
+        statement = pending.pop()
+        if type(statement) in (VariableDeclaration, FunctionDeclaration):
+            found.append(statement)
+        elif type(statement) is IfStatement:
+            pending += [branch for branch in (statement.consequent_, statement.alternate_) if branch]
+        elif type(statement) is BlockStatement:
+            pending += statement.body_
+    return found
+
+def transpile_if_statement(state: TranspileState, node: IfStatement, scope: Optional[FunctionScope], indent: int) -> None:
+    """Function adds the python source of an if statement and its elif and else branches. A name is always declared
+    after the if statement when it is declared by every branch"""
+    assigned, possibly_assigned = (scope.assigned, scope.possibly_assigned) if scope else (set(), state.global_bound)
+    branches, keyword = [], "if"
+    while True:
+        if scope:
+            scope.assigned = set(assigned)
+        identifiers = []
+        test = transpile_expression(state, node.test_, scope, identifiers)
+        emit(state, indent, f"{keyword} {test}:", node, identifiers)
+        branches.append(transpile_branch(state, node.consequent_, scope, indent+1, assigned, possibly_assigned))
+        if type(node.alternate_) is not IfStatement:
+            break
+        node, keyword = node.alternate_, "elif"
+
+    if node.alternate_:
+        emit(state, indent, "else:", node)
+        branches.append(transpile_branch(state, node.alternate_, scope, indent+1, assigned, possibly_assigned))
+    else:
+        branches.append(set(assigned))
+    if scope:
+        scope.assigned = set.intersection(*branches)
+
+def transpile_branch(state: TranspileState, node: Node, scope: Optional[FunctionScope], indent: int, assigned: Set[str], possibly_assigned: Set[str]) -> Set[str]:
+    """Function adds the python source of a branch of an if statement and returns the names that are always declared
+    after it"""
+    if scope:
+        scope.assigned = set(assigned)
+    transpile_statement(state, node, scope, indent)
+    return scope.assigned if scope else set()
+
+def transpile_return_statement(state: TranspileState, node: ReturnStatement, scope: Optional[FunctionScope], indent: int) -> None:
+    """Function adds the python source of a return statement. Outside of a function it stops the program, inside a
+    function a call in the return statement becomes a tail call"""
+    identifiers, argument = [], node.argument_
+    if is_print_call(argument):
+        emit(state, indent, transpile_print_call(state, argument, scope, identifiers), node, identifiers)
+        emit(state, indent, "raise _ProgramReturn" if scope is None else f"_no_value(\"{scope.name}\")", node)
+    elif scope is None:
+        emit(state, indent, f"_return_symbols.append({transpile_expression(state, argument, scope, identifiers)})", node, identifiers)
+        emit(state, indent, "raise _ProgramReturn", node)
+    elif type(argument) is CallExpression:
+        callee      = transpile_expression(state, argument.callee_, scope, identifiers)
+        arguments   = [transpile_expression(state, value, scope, identifiers) for value in argument.arguments_]
+        check_arguments(state, argument)
+        emit(state, indent, f"return _TailCall({callee}, [{', '.join(arguments)}])", node, identifiers)
+        scope.tail_calls = True
+    else:
+        emit(state, indent, f"return {transpile_expression(state, argument, scope, identifiers)}", node, identifiers)
+
+def declare(state: TranspileState, scope: Optional[FunctionScope], name: str) -> None:
+    """Function marks a name as declared in the scope of a function, or in the global scope"""
+    if scope is None:
+        state.global_bound.add(name)
+    else:
+        scope.assigned.add(name)
+        scope.possibly_assigned.add(name)
+
+
+def transpile_expression(state: TranspileState, node: Node, scope: Optional[FunctionScope], identifiers: List[Tuple[str, int, int]]) -> str:
+    """Function returns the python source of an expression
+
+    Args:
+        state               : The state of the transpiler
+        node                : The expression that needs to be transpiled
+        scope               : The scope of the function the expression is part of, None outside of functions
+        identifiers         : The list the identifiers read by the expression are added to
+
+    Returns:
+        A python expression
+    """
+    if type(node) is Literal:
+        return repr(node.value_)
+    if type(node) is Identifier:
+        check_read(state, scope, node.name_)
+        identifiers.append((f"v_{node.name_}", node.range_start, node.range_end))
+        return f"v_{node.name_}"
+    if type(node) is UnaryExpression:
+        argument = transpile_expression(state, node.argument_, scope, identifiers)
+        return f"({argument} * -1)" if node.operator_ == TokenTypes.MINUS else argument
+    if type(node) is BinaryExpression and node.operator_ in python_operators:
+        left    = transpile_expression(state, node.left_, scope, identifiers)
+        right   = transpile_expression(state, node.right_, scope, identifiers)
+        if node.operator_ in (TokenTypes.AND, TokenTypes.OR):
+            return f"{python_operators[node.operator_]}({left}, {right})"
+        return f"({left} {python_operators[node.operator_]} {right})"
+    if type(node) is CallExpression and not is_print_call(node):
+        callee      = transpile_expression(state, node.callee_, scope, identifiers)
+        arguments   = [transpile_expression(state, argument, scope, identifiers) for argument in node.arguments_]
+        check_arguments(state, node)
+        return f"{callee}({', '.join(arguments)})"
+    if type(node) is CallExpression:
+        raise ValueError("the result of 🖨 is used as a value")
+    raise ValueError(f"a {type(node).__name__} can not be transpiled")
+
+def check_read(state: TranspileState, scope: Optional[FunctionScope], name: str) -> None:
+    """Function raises a ValueError when a function reads a name which python would find in another scope than
+    interpret does"""
+    if scope is None or name in scope.assigned:
+        return
+    if name in scope.bound:
+        raise ValueError(f"function {scope.name} might read {name} before it is declared")
+    if name in state.function_bound:
+        raise ValueError(f"function {scope.name} reads {name}, which is declared by another function")
+
+def check_arguments(state: TranspileState, node: CallExpression) -> None:
+    """Function raises a ValueError when a call might pass fewer arguments than the function has parameters.
+    interpret finds a missing parameter in the scope of the caller, which python can not do"""
+    callee  = node.callee_.name_ if type(node.callee_) is Identifier else None
+    count   = state.function_parameters.get(callee, state.most_parameters)
+    if len(node.arguments_) < count:
+        raise ValueError(f"a call of {callee} might pass fewer arguments than the function has parameters")
+
+def is_print_call(node: Node) -> bool:
+    return type(node) is CallExpression and type(node.callee_) is Identifier and node.callee_.name_ == "🖨"
+
+def transpile_print_call(state: TranspileState, node: CallExpression, scope: Optional[FunctionScope], identifiers: List[Tuple[str, int, int]]) -> str:
+    return f"print({', '.join(transpile_expression(state, argument, scope, identifiers) for argument in node.arguments_)})"
+
+
+def trampoline(result: Any) -> Any:
+    """Function calls the TailCalls returned by transpiled functions until a function returns a value"""
+    while type(result) is TailCall:
+        function    = result.function
+        result      = getattr(function, "_tail", function)(*result.arguments)
+    return result
+
+def logical_and(left: Any, right: Any) -> Any:
+    return left and right
+
+def logical_or(left: Any, right: Any) -> Any:
+    return left or right
+
+def no_value(name: str) -> None:
+    raise TypeError(f"function {name} returned 0 values instead of 1")
+
+
+def interpret_transpiled(code: str, transpiled: TranspiledProgram) -> SymbolTable:
+    """Function runs a transpiled program. Runtime errors point at the statement of the alt-f4 source they were
+    raised by: an undefined name raises the same error message as interpret, other errors get a note with the line
+    of the statement
+
+    Args:
+        code                : The code the program was transpiled from
+        transpiled          : The transpiled program
+
+    Returns:
+        The global symbol table after the program has been run. Functions are python functions instead of
+        FunctionDeclarations
+    """
+    def duplicate_function(function: Any, start: int, end: int) -> None:
+        declaration = lambda range_: FunctionDeclaration(loc_=None, range_=list(range_), id_="", params_=[], body_=BlockStatement(loc_=None, range_=list(range_), body_=[]))
+        existing    = declaration(function._range) if hasattr(function, "_range") else function
+        generate_error_message(declaration((start, end)), existing, code, "Runtime Error, found duplicate function identifier", True)
+
+    return_symbols  = []
+    namespace       = {"_return_symbols": return_symbols, "_ProgramReturn": ProgramReturn, "_TailCall": TailCall, "_trampoline": trampoline,
+                       "_and": logical_and, "_or": logical_or, "_no_value": no_value, "_duplicate_function": duplicate_function}
+    return_stop     = False
+    try:
+        exec(transpiled.code, namespace)
+    except ProgramReturn:
+        return_stop = True
+    except Exception as error:
+        transpiled_error(code, transpiled, error)
+        raise
+
+    symbols = {"🖨": print}
+    symbols.update({name[2:]: value for name, value in namespace.items() if name.startswith("v_")})
+    return SymbolTable(symbols=symbols, parent=None, return_symbols=return_symbols, return_stop=return_stop)
+
+def transpiled_error(code: str, transpiled: TranspiledProgram, error: Exception) -> None:
+    """Function raises the error message of interpret for an undefined name, or adds the line of the alt-f4
+    statement that raised an error to its notes"""
+    traceback, line = error.__traceback__, None
+    while traceback:
+        if traceback.tb_frame.f_code.co_filename == transpiled_file_name:
+            line = traceback.tb_lineno
+        traceback = traceback.tb_next
+    if line is None or not 0 < line <= len(transpiled.line_ranges):
+        return
+
+    name = getattr(error, "name", None)
+    if isinstance(error, NameError) and name:
+        for identifier, start, end in transpiled.line_identifiers[line-1]:
+            if identifier == name:
+                # The error message replaces the NameError, which is not shown as the context of the DiagnosticError
+                try:
+                    generate_error_message(Identifier(loc_=None, range_=[start, end], name_=name[2:]), code, f"{name[2:]} is not defined", True)
+                except DiagnosticError as diagnostic:
+                    raise diagnostic from None
+
+    source_file     = get_source_file(code)
+    line_no, _      = source_file_location(source_file, transpiled.line_ranges[line-1][0])
+    # Exceptions have notes since python 3.11, on python 3.10 the error is raised without the line
+    if hasattr(error, "add_note"):
+        error.add_note(f"File <placeholder>, line {line_no}\n\t{source_file_line(source_file, line_no)}")
+
+
+def transpiled_program_dumps(transpiled: TranspiledProgram) -> bytes:
+    """Function stores a transpiled program in bytes with marshal. The bytes can only be loaded by the same version
+    of python"""
+    return marshal.dumps((transpiled_magic, transpiled.source, transpiled.code, transpiled.line_ranges, transpiled.line_identifiers))
+
+def transpiled_program_loads(data: bytes) -> TranspiledProgram:
+    """Function loads a transpiled program from the bytes created by transpiled_program_dumps
+
+    Args:
+        data                : The bytes created by transpiled_program_dumps
+
+    Returns:
+        If data contains a transpiled program:
+            The TranspiledProgram
+        Otherwise:
+            Raises a ValueError
+    """
+    try:
+        magic, *values = marshal.loads(data)
+    except (EOFError, TypeError, ValueError) as error:
+        raise ValueError("The data does not contain a transpiled program") from error
+    if magic != transpiled_magic or len(values) != 4:
+        raise ValueError("The data does not contain a transpiled program")
+    return TranspiledProgram(*values)
@@ -11,9 +11,18 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import re
+import mmap
 
-from typing import Tuple, Callable, Optional
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from typing import Tuple, Callable, Optional, Dict, Iterator, Union
 from misc.token_types import *
+from misc.token_stream import TokenStream, token_stream_append, token_stream_chunked, token_stream_find
+from misc.source_file import source_file_from_characters, source_file_location, source_file_replace, source_file_text
+from misc.chunked_sequence import chunked_sequence_replace, sequence_bisect_right
 from misc.error_message import generate_error_message
 
 
@@ -45,6 +54,161 @@ def search_match(
     return (match, tag) if match else search_match(characters, tail, total_index)
 
 
+def compile_token_expressions(
+    token_expressions: List[Tuple[str, TokenTypes]]
+) -> Tuple['re.Pattern', Dict[str, TokenTypes]]:
+    """Function compiles a list of token expressions into one master regex. Every token expression 
+    becomes a named group in one big alternation. Python tries the alternatives from left to right, 
+    so the priority order of the token expressions is kept.
+
+    Args:
+        token_expressions   : A list of tuples each containing a regex string and identifier.
+
+    Returns:
+        - The compiled master regex
+        - A dictionary which maps the name of every group in the master regex to its identifier
+    """
+    is_bytes        = any(isinstance(pattern, bytes) for pattern, _ in token_expressions)
+    patterns        = [pattern.decode("utf-8") if is_bytes else pattern for pattern, _ in token_expressions]
+    group_names     = [f"T{i}" for i in range(len(token_expressions))]
+    master_pattern  = "|".join(f"(?P<{name}>{pattern})" for name, pattern in zip(group_names, patterns))
+    tags            = {name: tag for name, (_, tag) in zip(group_names, token_expressions)}
+    return re.compile(master_pattern.encode("utf-8") if is_bytes else master_pattern), tags
+
+
+def bytes_token_expressions(
+    token_expressions: List[Tuple[str, TokenTypes]], 
+    word_characters: str="ƒα"
+) -> List[Tuple[bytes, TokenTypes]]:
+    """Function converts a list of token expressions into token expressions which match utf-8 encoded bytes. 
+    In a bytes regex \\b and \\B only know the ascii word characters, while some multi byte symbols of the 
+    language (ƒ and α) are word characters when a string is lexed. Both are therefore replaced with lookarounds 
+    which also treat the provided word characters as word characters. Other non ascii characters are not part of 
+    the language. Code containing them can not be lexed either way, only the reported error location can differ
+
+    Args:
+        token_expressions   : A list of tuples each containing a regex string and identifier.
+        word_characters     : The non ascii characters that are word characters in the language, default="ƒα"
+
+    Returns:
+        A list of tuples each containing a bytes regex and identifier
+    """
+    previous_word       = "(?:" + "|".join(f"(?<={c})" for c in ["[A-Za-z0-9_]", *word_characters]) + ")"
+    previous_not_word   = "".join(f"(?<!{c})" for c in ["[A-Za-z0-9_]", *word_characters])
+    next_word           = "(?=" + "|".join(["[A-Za-z0-9_]", *word_characters]) + ")"
+    next_not_word       = "(?!" + "|".join(["[A-Za-z0-9_]", *word_characters]) + ")"
+    boundaries          = {
+        r"\b": f"(?:{previous_word}{next_not_word}|{previous_not_word}{next_word})",
+        r"\B": f"(?:{previous_word}{next_word}|{previous_not_word}{next_not_word})"
+    }
+    return [
+        (re.sub(r"\\[bB]", lambda boundary: boundaries[boundary.group(0)], pattern).encode("utf-8"), tag) 
+        for pattern, tag in token_expressions
+    ]
+
+BytesTokenExpressions = bytes_token_expressions(TokenExpressions)
+
+
+@lru_cache(maxsize=32)
+def compiled_token_expressions(
+    token_expressions: Tuple[Tuple[str, TokenTypes], ...]
+) -> Tuple['re.Pattern', Dict[str, TokenTypes]]:
+    """Function returns the master regex and group names of compile_token_expressions for a tuple of token expressions.
+    The results are cached by the contents of the token expressions, so an equal list of token expressions (like a list 
+    that has been sent to another process by lex_parallel) is not compiled again. Only the last 32 are kept"""
+    return compile_token_expressions(list(token_expressions))
+
+# The default token expressions are compiled once, when the lexer is imported
+compiled_default_expressions    = compile_token_expressions(TokenExpressions)
+compiled_bytes_expressions      = compile_token_expressions(BytesTokenExpressions)
+
+
+def search_match_compiled(
+    characters: str, 
+    token_expressions: List[Tuple[str, TokenTypes]], 
+    total_index=0
+) -> Optional[Tuple[re.match, str]]:
+    """Function searches for a matching token expression using one precompiled master regex. 
+    Can be used as a drop in replacement for search_match. The master regexes of the default token expressions 
+    are compiled once. Other token expressions are compiled the first time they are used and are cached by their contents.
+
+    Args:
+        characters          : The characters that need to be matched.
+        token_expressions   : A list of tuples each containing a regex string and identifier.
+        total_index         : Try to find a match from this index in characters. Can be seen as characters[total_index:].
+
+    Returns:
+        If a match is found:
+            A tuple containing a match that has been found and a tag saying what token it has found
+        If no match was found:
+            A tuple containing (None, None)
+    """
+    if token_expressions is TokenExpressions:
+        master_regex, tags = compiled_default_expressions
+    elif token_expressions is BytesTokenExpressions:
+        master_regex, tags = compiled_bytes_expressions
+    else:
+        master_regex, tags = compiled_token_expressions(tuple(token_expressions))
+
+    match = master_regex.match(characters, total_index)
+    return (match, tags[match.lastgroup]) if match else (None, None)
+
+
+def lex_iter(
+    characters: str, 
+    search_match_f: Callable[[str, List[Tuple[str, TokenTypes]], int], Optional[Tuple[re.match, str]]], 
+    token_expressions: List[Tuple[str, TokenTypes]], 
+    line_no: int=1, 
+    index: int=0, 
+    total_index: int=0,
+    skip_none: bool=False
+) -> Iterator[Token]:
+    """Function converts the provided characters into tokens. Uses a provided function to search for matches in characters.
+    The tokens are yielded one by one, so the lexed tokens never have to be kept in memory all at once
+
+    Args:
+        characters          : The characters that need to be lexed.
+        search_match_f      : A function to match the provided characters with the provided tokens
+        token_expressions   : A list of tuples each containing a regex string and identifier.
+        line_no             : The line number to start lexing at, default=1.
+        index               : The line index to start lexing at, default=0.
+        total_index         : The total index in characters to start lexing at, default=0
+        skip_none           : Skip TokenTypes.NONE matches (spaces and comments) without creating tokens for them, default=False
+
+    Yields:
+        If no errors occured:
+            The lexed tokens, ending with an EOF token
+        If no match was found:
+            Raises a Syntax Error with a message of where the error occured
+    """
+    while len(characters) != total_index:
+        match, tokentype = search_match_f(characters, token_expressions, total_index)
+        if not match:
+            generate_error_message(line_no, index, characters, "Invalid Syntax", True)
+
+        offset          = match.end(0) - match.start(0)
+        if skip_none and tokentype == TokenTypes.NONE:
+            index += offset
+            total_index = match.end(0)
+            continue
+
+        token_location  = {"start":{"line": line_no, "index":index}, "end":{"line": line_no, "index": index+offset}}
+        token_range     = [match.start(0), match.end(0)]
+
+        yield Token(loc_=token_location, range_=token_range, value_=match.group(0), tokentype_=tokentype)
+
+        if tokentype == TokenTypes.NEW_LINE: line_no +=1; index =0
+        else                               : index += offset
+        total_index = match.end(0)
+
+    yield Token(
+        loc_={"start":{"line": line_no, "index":index}, "end":{"line": line_no, "index": index+3}}, 
+        range_=[total_index,total_index+3] , 
+        value_="\00", 
+        tokentype_=TokenTypes.EOF
+    )
+
+
 def lex(
     characters: str, 
     search_match_f: Callable[[str, List[Tuple[str, TokenTypes]], int], Optional[Tuple[re.match, str]]], 
@@ -58,7 +222,7 @@ def lex(
     Args:
         characters          : The characters that need to be lexed.
         search_match_f      : A function to match the provided characters with the provided tokens
-        token_expressions   : Try to find a match from this index in characters. Can be seen as characters[total_index:].
+        token_expressions   : A list of tuples each containing a regex string and identifier.
         line_no             : The current line number that is being lexed, default=1.
         index               : The current line index that is being lexed, default=0.
         total_index         : The total index in characters that is being lexed, default=0
@@ -69,27 +233,228 @@ def lex(
         If no match was found:
             Raises a Syntax Error with a message of where the error occured
     """
-    if len(characters) == total_index: # If the end characters has been reached return an EOF token
-        return [Token(
-            loc_={"start":{"line": line_no, "index":index}, "end":{"line": line_no, "index": index+3}}, 
-            range_=[total_index,total_index+3] , 
-            value_="\00", 
-            tokentype_=TokenTypes.EOF
-        )]
-    
-    match, tokentype = search_match_f(characters, token_expressions, total_index)
-    if not match:
-        generate_error_message(line_no, index, characters, "Invalid Syntax", True)
+    return list(lex_iter(characters, search_match_f, token_expressions, line_no, index, total_index))
+
 
-    matched_text    = match.group(0)
-    offset          = match.end(0) - match.start(0)
-    token_location  = {"start":{"line": line_no, "index":index}, "end":{"line": line_no, "index": index+offset}}
-    token_range     = [match.start(0), match.end(0)]
+def lex_chunk(
+    characters: Union[str, bytes, mmap.mmap], 
+    offset: int=0,
+    search_match_f: Callable[[str, List[Tuple[str, TokenTypes]], int], Optional[Tuple[re.match, str]]]=search_match_compiled, 
+    token_expressions: List[Tuple[str, TokenTypes]]=TokenExpressions, 
+    skip_none: bool=True
+) -> Tuple[array, array, array, Optional[int]]:
+    """Function converts the provided characters into the columns of a TokenStream, without an EOF token. Instead of
+    raising an error, the index of the invalid syntax is returned. This way a chunk of a source file can be lexed in 
+    another process, while the error message is still generated with the line and line index of the whole source file
 
-    token   = Token(loc_=token_location, range_=token_range, value_=matched_text, tokentype_=tokentype)
+    Args:
+        characters          : The characters that need to be lexed.
+        offset              : The index of the first character in the whole source file. Is added to every start and end, default=0
+        search_match_f      : A function to match the provided characters with the provided tokens, default=search_match_compiled
+        token_expressions   : A list of tuples each containing a regex string and identifier, default=TokenExpressions
+        skip_none           : Skip TokenTypes.NONE matches (spaces and comments), default=True
+
+    Returns:
+        - The value of the TokenTypes of every token
+        - The index in the whole source file where every token starts
+        - The index in the whole source file where every token ends
+        - The index in the whole source file of the invalid syntax. None if no errors occured
+    """
+    tokentypes, starts, ends = array('B'), array('q'), array('q')
+    total_index = 0
+    while len(characters) != total_index:
+        match, tokentype = search_match_f(characters, token_expressions, total_index)
+        if not match:
+            return tokentypes, starts, ends, offset + total_index
+
+        if not (skip_none and tokentype == TokenTypes.NONE):
+            tokentypes.append(tokentype.value)
+            starts.append(offset + total_index)
+            ends.append(offset + match.end(0))
+        total_index = match.end(0)
+    return tokentypes, starts, ends, None
+
+
+def lex_stream(
+    characters: Union[str, bytes, mmap.mmap], 
+    search_match_f: Callable[[str, List[Tuple[str, TokenTypes]], int], Optional[Tuple[re.match, str]]]=search_match_compiled, 
+    token_expressions: List[Tuple[str, TokenTypes]]=TokenExpressions, 
+    skip_none: bool=True
+) -> TokenStream:
+    """Function converts the provided characters into a TokenStream. No Token objects are created while lexing,
+    every token is stored as a couple of integers in the columns of the TokenStream. The line and line index of 
+    a token are not tracked, they are looked up in the SourceFile of the stream when they are needed
+
+    Args:
+        characters          : The characters that need to be lexed. Bytes need to be lexed with bytes token expressions
+        search_match_f      : A function to match the provided characters with the provided tokens, default=search_match_compiled
+        token_expressions   : A list of tuples each containing a regex string and identifier, default=TokenExpressions
+        skip_none           : Skip TokenTypes.NONE matches (spaces and comments), default=True
+
+    Returns:
+        If no errors occured:
+            Returns a TokenStream containing the lexed tokens, ending with an EOF token
+        If no match was found:
+            Raises a Syntax Error with a message of where the error occured
+    """
+    source_file = source_file_from_characters(characters)
+    tokentypes, starts, ends, error_index = lex_chunk(characters, 0, search_match_f, token_expressions, skip_none)
+    if error_index is not None:
+        generate_error_message(*source_file_location(source_file, error_index), source_file, "Invalid Syntax", True)
+
+    token_stream = TokenStream(source_file, tokentypes, starts, ends)
+    return token_stream_append(token_stream, TokenTypes.EOF, len(characters), len(characters)+3)
 
-    if tokentype == TokenTypes.NEW_LINE: line_no +=1; index =0; offset = 0
-    return [token] + lex(characters, search_match_f, token_expressions, line_no, index + offset, match.end(0))
+
+def mmap_file(file_path: str) -> Union[mmap.mmap, bytes]:
+    """Function memory maps the provided file for reading. An empty file can not be mapped, its bytes are returned instead"""
+    with open(file_path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+
+def lex_mmap(
+    file_path: str, 
+    token_expressions: List[Tuple[bytes, TokenTypes]]=BytesTokenExpressions, 
+    skip_none: bool=True
+) -> TokenStream:
+    """Function memory maps the provided file and lexes its bytes directly into a TokenStream. The file is never 
+    read or decoded as a whole, so the memory that is used stays close to the size of the file. The range_ of the 
+    tokens are byte offsets, token values and locations are decoded from the bytes when they are requested
+
+    Args:
+        file_path           : Path to the utf-8 encoded file that needs to be lexed.
+        token_expressions   : A list of tuples each containing a bytes regex and identifier, default=BytesTokenExpressions
+        skip_none           : Skip TokenTypes.NONE matches (spaces and comments), default=True
+
+    Returns:
+        If no errors occured:
+            Returns a TokenStream containing the lexed tokens, ending with an EOF token. Its SourceFile holds the mapped file
+        If no match was found:
+            Raises a Syntax Error with a message of where the error occured
+    """
+    return lex_stream(mmap_file(file_path), search_match_compiled, token_expressions, skip_none)
+
+
+def lex_parallel(
+    characters: Union[str, bytes],
+    workers: Optional[int]=None,
+    token_expressions: List[Tuple[str, TokenTypes]]=TokenExpressions, 
+    skip_none: bool=True,
+    chunks_per_worker: int=4
+) -> TokenStream:
+    """Function converts the provided characters into a TokenStream using multiple processes. No token can continue 
+    past a new line, so the characters are cut into chunks at the start of a line. Every chunk is lexed on its own 
+    by a process of a ProcessPoolExecutor, after which the columns of the chunks are joined together. The result 
+    is the same TokenStream as the one created by lex_stream
+
+    Args:
+        characters          : The characters that need to be lexed.
+        workers             : The amount of processes that are used, default=None (the amount of cpus)
+        token_expressions   : A list of tuples each containing a regex string and identifier, default=TokenExpressions
+        skip_none           : Skip TokenTypes.NONE matches (spaces and comments), default=True
+        chunks_per_worker   : The amount of chunks that are created for every process, default=4
+
+    Returns:
+        If no errors occured:
+            Returns a TokenStream containing the lexed tokens, ending with an EOF token
+        If no match was found:
+            Raises a Syntax Error with a message of where the error occured
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return lex_stream(characters, search_match_compiled, token_expressions, skip_none)
+
+    source_file     = source_file_from_characters(characters)
+    line_starts     = source_file.line_starts
+    chunk_count     = workers * chunks_per_worker
+    chunk_lines     = sorted({bisect_left(line_starts, len(characters) * i // chunk_count) for i in range(chunk_count)})
+    chunk_starts    = [line_starts[line] for line in chunk_lines if line < len(line_starts)]
+    chunk_ends      = chunk_starts[1:] + [len(characters)]
+    chunks          = [characters[start:end] for start, end in zip(chunk_starts, chunk_ends)]
+
+    token_stream = TokenStream(source_file)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            lex_chunk, chunks, chunk_starts, repeat(search_match_compiled), repeat(token_expressions), repeat(skip_none)
+        )
+        for tokentypes, starts, ends, error_index in results:
+            if error_index is not None:
+                generate_error_message(*source_file_location(source_file, error_index), source_file, "Invalid Syntax", True)
+            token_stream.tokentypes.extend(tokentypes)
+            token_stream.starts.extend(starts)
+            token_stream.ends.extend(ends)
+
+    return token_stream_append(token_stream, TokenTypes.EOF, len(characters), len(characters)+3)
+
+
+def relex(
+    token_stream: TokenStream,
+    start: int,
+    end: int,
+    replacement: str,
+    token_expressions: List[Tuple[str, TokenTypes]]=TokenExpressions, 
+    skip_none: bool=True
+) -> TokenStream:
+    """Function lexes an edited source file by only lexing the lines containing the edit again. No token can continue 
+    past a new line, so the tokens of these lines replace the tokens of the same lines of the previous TokenStream. 
+    The tokens before and after them are reused, the tokens after them are moved by the amount of characters that 
+    were added or removed. The columns are stored as ChunkedSequences, so only the chunks containing the edited 
+    lines are copied, all other chunks are shared with the previous TokenStream
+
+    Args:
+        token_stream        : The TokenStream of the source file before the edit, created by lex_stream or relex
+        start               : The index of the first character that is replaced
+        end                 : The index after the last character that is replaced
+        replacement         : The characters that are placed between start and end
+        token_expressions   : The token expressions the previous TokenStream was lexed with, default=TokenExpressions
+        skip_none           : Whether the previous TokenStream was lexed skipping TokenTypes.NONE matches, default=True
+
+    Returns:
+        If no errors occured:
+            Returns a TokenStream of the edited source file, which is the same as the TokenStream lex_stream would create
+        If no match was found:
+            Raises a Syntax Error with a message of where the error occured
+    """
+    token_stream    = token_stream_chunked(token_stream)
+    old_line_starts = token_stream.source_file.line_starts
+    source_file     = source_file_replace(token_stream.source_file, start, end, replacement)
+    delta           = len(replacement) - (end - start)
+
+    # Matching a token looks one character back (\b and \B), so the line after the edit is lexed again as well when
+    # the edit ends at its start. The EOF token does not look at any characters, it is moved like the tokens after the edit
+    next_line   = sequence_bisect_right(old_line_starts, end)
+    lex_start   = old_line_starts[sequence_bisect_right(old_line_starts, start)-1]
+    lex_end     = old_line_starts[next_line] if next_line < len(old_line_starts) else len(token_stream.source_file.characters)
+    first_token = token_stream_find(token_stream, lex_start)
+    stop_token  = token_stream_find(token_stream, lex_end, first_token)
+
+    characters = source_file_text(source_file, lex_start, lex_end + delta)
+    tokentypes, starts, ends, error_index = lex_chunk(characters, lex_start, search_match_compiled, token_expressions, skip_none)
+    if error_index is not None:
+        generate_error_message(*source_file_location(source_file, error_index), source_file, "Invalid Syntax", True)
+
+    return TokenStream(
+        source_file,
+        chunked_sequence_replace(token_stream.tokentypes, first_token, stop_token, tokentypes),
+        chunked_sequence_replace(token_stream.starts, first_token, stop_token, starts, delta),
+        chunked_sequence_replace(token_stream.ends, first_token, stop_token, ends, delta)
+    )
+
+
+def tokenize(characters: str) -> Iterator[Token]:
+    """Function converts the provided characters into the tokens that are used by the parser. Spaces and comments 
+    (TokenTypes.NONE) are skipped by the lexer itself, so no tokens are created for them
+
+    Args:
+        characters          : The characters that need to be lexed.
+
+    Yields:
+        If no errors occured:
+            The lexed tokens without TokenTypes.NONE tokens, ending with an EOF token
+        If no match was found:
+            Raises a Syntax Error with a message of where the error occured
+    """
+    return lex_iter(characters, search_match_compiled, TokenExpressions, skip_none=True)
 
 
 if __name__ == "__main__":
@@ -100,5 +465,5 @@ if __name__ == "__main__":
     with open(sys.argv[1], 'rb') as f:
         code = f.read().decode("utf-8")
     
-    lexed = lex(code, search_match, TokenExpressions)
-    list(map(print, lexed))
\ No newline at end of file
+    for token in lex_iter(code, search_match_compiled, TokenExpressions):
+        print(token)
\ No newline at end of file
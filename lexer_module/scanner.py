@@ -0,0 +1,175 @@
+"""
+@file scanner.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains a hand built scanner which finds tokens based on their first character
+@version 0.1
+@date 18-10-2026
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+
+from typing import Tuple, Callable, Optional, Dict, List, NamedTuple, Any
+from misc.token_types import *
+
+
+class ScannerMatch(NamedTuple):
+    """Match found by the scanner. Supports the part of the re.Match interface that is used by the lexer"""
+    characters  : str
+    start_      : int
+    end_        : int
+
+    def group(self, group: int=0) -> str:
+        return self.characters[self.start_:self.end_]
+
+    def start(self, group: int=0) -> int:
+        return self.start_
+
+    def end(self, group: int=0) -> int:
+        return self.end_
+
+
+def is_word_character(characters: str, index: int) -> bool:
+    """Function checks if the character at index is a word character, like \\w in a regex"""
+    return 0 <= index < len(characters) and (characters[index].isalnum() or characters[index] == "_")
+
+def boundary_matches(characters: str, index: int, boundary: Optional[str]) -> bool:
+    """Function checks if a regex boundary ('b' for \\b, 'B' for \\B or None) matches at index"""
+    if boundary is None:
+        return True
+    is_boundary = is_word_character(characters, index-1) != is_word_character(characters, index)
+    return is_boundary if boundary == "b" else not is_boundary
+
+
+def match_literals(
+    characters: str,
+    total_index: int,
+    literal_rules: List[Tuple[str, TokenTypes, Optional[str], Optional[str]]]
+) -> Optional[Tuple[int, TokenTypes]]:
+    """Function tries to match one of the literal rules at total_index. The rules are tried in order
+
+    Args:
+        characters          : The characters that need to be matched.
+        total_index         : Try to find a match from this index in characters.
+        literal_rules       : A list of tuples containing the literal, identifier, boundary before and boundary after the literal
+
+    Returns:
+        If a match is found:
+            The end index of the match and the identifier of the matched rule
+        If no match was found:
+            None
+    """
+    for literal, tag, boundary_start, boundary_end in literal_rules:
+        end = total_index + len(literal)
+        if characters.startswith(literal, total_index) \
+        and boundary_matches(characters, total_index, boundary_start) \
+        and boundary_matches(characters, end, boundary_end):
+            return end, tag
+    return None
+
+def match_spaces(characters: str, total_index: int, _: Any) -> Optional[Tuple[int, TokenTypes]]:
+    """Function matches four spaces as a TokenTypes.TAB, or a shorter run of spaces as a TokenTypes.NONE"""
+    if characters.startswith("    ", total_index):
+        return total_index + 4, TokenTypes.TAB
+    end = total_index + 1
+    while end < len(characters) and characters[end] == " ":
+        end += 1
+    return end, TokenTypes.NONE
+
+def match_comment(characters: str, total_index: int, _: Any) -> Optional[Tuple[int, TokenTypes]]:
+    """Function matches a comment untill the end of the line as a TokenTypes.NONE"""
+    end = characters.find("\n", total_index)
+    return (end if end != -1 else len(characters)), TokenTypes.NONE
+
+def match_regex(characters: str, total_index: int, regex_rule: Tuple['re.Pattern', TokenTypes]) -> Optional[Tuple[int, TokenTypes]]:
+    """Function matches a precompiled regex, used for tokens which can not be recognised by their first character alone"""
+    regex, tag = regex_rule
+    match = regex.match(characters, total_index)
+    return (match.end(0), tag) if match else None
+
+
+def build_dispatch_table() -> Dict[str, Tuple[Callable, Any]]:
+    """Function builds the first character dispatch table for TokenExpressions. Every entry maps a first character
+    onto a match function and its argument. The literal rules of a character are kept in the order of TokenExpressions
+
+    Returns:
+        A dictionary which maps a character onto a tuple containing a match function and the argument for that function
+    """
+    literal_rules = [
+        ("\n",  TokenTypes.NEW_LINE,                    None, None),
+        ("\r\n",TokenTypes.NEW_LINE,                    None, None),
+        ("ƒ",   TokenTypes.FUNCTION_DECLARATION,        "b",  "b" ),
+        ("––>", TokenTypes.INDENTATION,                 None, "B" ),
+        ("––",  TokenTypes.FUNCTION_DECLARATION_END,    "B",  "B" ),
+        ("📁",  TokenTypes.VARIABLE_DECLARATION,        "B",  "B" ),
+        ("α",   TokenTypes.PARAMETER,                   "b",  "b" ),
+        ("==",  TokenTypes.IS_EQUAL,                    None, None),
+        ("=",   TokenTypes.IS,                          None, None),
+        ("+",   TokenTypes.PLUS,                        None, None),
+        ("-",   TokenTypes.MINUS,                       None, None),
+        ("/",   TokenTypes.DIVIDE,                      None, None),
+        ("∨",   TokenTypes.OR,                          None, None),
+        ("∧",   TokenTypes.AND,                         None, None),
+        ("*",   TokenTypes.MULTIPLY,                    None, None),
+        ("|",   TokenTypes.SEPARATOR,                   None, None),
+        (">",   TokenTypes.RIGHT_PARENTHESIES,          None, None),
+        ("<",   TokenTypes.LEFT_PARENTHESIES,           None, None),
+        ("▲",   TokenTypes.GREATER_THAN,                "B",  "B" ),
+        ("▼",   TokenTypes.SMALLER_THAN,                "B",  "B" ),
+        ("?",   TokenTypes.IF,                          "B",  "B" ),
+        ("⁈",   TokenTypes.ELSE_IF,                     "B",  "B" ),
+        ("⁇",   TokenTypes.ELSE,                        "B",  "B" ),
+        ("¿",   TokenTypes.IF_STATEMENT_END,            "B",  "B" ),
+        ("🖨",  TokenTypes.PRINT,                       "B",  "B" ),
+        ("✆",   TokenTypes.CALL,                        "B",  "B" ),
+        ("⚡",  TokenTypes.POWER,                       "B",  "B" ),
+        ("⮐",   TokenTypes.RETURN,                      "B",  "B" ),
+    ]
+    table = {}
+    for rule in literal_rules:
+        table.setdefault(rule[0][0], (match_literals, []))[1].append(rule)
+
+    table[" "] = (match_spaces, None)
+    table["#"] = (match_comment, None)
+    for character in "0123456789":
+        table[character] = (match_regex, (re.compile(r'[0-9]+\b'), TokenTypes.INT))
+    for character in "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz":
+        table[character] = (match_regex, (re.compile(r'[A-Za-z][A-Za-z0-9_]*\b'), TokenTypes.IDENTIFIER))
+    return table
+
+dispatch_table = build_dispatch_table()
+
+
+def search_match_dispatch(
+    characters: str,
+    token_expressions: List[Tuple[str, TokenTypes]],
+    total_index=0
+) -> Optional[Tuple[ScannerMatch, str]]:
+    """Function searches for a matching token by looking up the first character in a dispatch table. Only the
+    rules that can start with that character are tried. Can be used as a drop in replacement for search_match,
+    but only knows the rules of TokenExpressions. Other token expressions are matched with search_match_compiled
+
+    Args:
+        characters          : The characters that need to be matched.
+        token_expressions   : A list of tuples each containing a regex string and identifier.
+        total_index         : Try to find a match from this index in characters. Can be seen as characters[total_index:].
+
+    Returns:
+        If a match is found:
+            A tuple containing a match that has been found and a tag saying what token it has found
+        If no match was found:
+            A tuple containing (None, None)
+    """
+    if token_expressions is not TokenExpressions:
+        from lexer_module.lexer import search_match_compiled
+        return search_match_compiled(characters, token_expressions, total_index)
+
+    match_function, argument = dispatch_table.get(characters[total_index], (None, None))
+    match = match_function(characters, total_index, argument) if match_function else None
+    if match is None:
+        return None, None
+    end, tag = match
+    return ScannerMatch(characters, total_index, end), tag
@@ -9,30 +9,90 @@
 import sys
 import os
 import time
+import argparse
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from lexer_module.lexer import lex, search_match
-from parser_module.parser import parse
-from interpreter_module.interpreter import interpret
+from lexer_module.lexer import tokenize, lex_stream, mmap_file, search_match_compiled, BytesTokenExpressions
+from parser_module.parser import parse_program, parse_iter
+from interpreter_module.interpreter import interpret, interpret_statements
+from interpreter_module.compiler import interpret_compiled
+from interpreter_module.transpiler import transpile_program, interpret_transpiled, transpiled_program_dumps, transpiled_program_loads
 from misc.token_types import *
-from misc.node_types import Program
+from misc.node_types import Program, node_release
+from misc.source_file import source_file_from_characters
+from optimizer_module.optimizer import fold_constants, eliminate_dead_code, remove_dead_statements
+from misc.program_cache import program_cache_directory, program_cache_key, program_cache_load, program_cache_store
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("No source file provided")
-        exit()
+    argument_parser = argparse.ArgumentParser(description="Lex, parse and interpret a file containing the alt-f4 programming language")
+    argument_parser.add_argument("source_file", help="The source file that needs to be interpreted")
+    argument_parser.add_argument("--mmap", action="store_true", help="Memory map the source file and lex its bytes without decoding the whole file")
+    argument_parser.add_argument("--lazy", action="store_true", help="Parse function bodies when the function is first called. Syntax errors in functions that are never called are not reported")
+    argument_parser.add_argument("--stream", action="store_true", help="Interpret every top level statement as soon as it has been parsed, while the rest of the file is lexed and parsed. Can not be combined with --mmap or --lazy and does not use the cache")
+    argument_parser.add_argument("--release", action="store_true", help="Do not keep the line and index of every node, only its range in the source file. Uses less memory for large programs")
+    argument_parser.add_argument("--fold-constants", action="store_true", help="Replace expressions of which all operands are literals by the literal they result in before the program is interpreted")
+    argument_parser.add_argument("--eliminate-dead-code", action="store_true", help="Remove functions that are never called, statements after a return and branches of if statements with a constant test. With --stream only statements are removed")
+    argument_parser.add_argument("--compile", action="store_true", help="Compile the program into python closures before it is run, instead of interpreting every node when it is reached. Can not be combined with --stream")
+    argument_parser.add_argument("--transpile", action="store_true", help="Transpile the program to python and run the python code. Programs which python can not run in the same way, like functions which read the variables of the function that called them, are run with --compile. Can not be combined with --stream")
+    argument_parser.add_argument("--no-cache", action="store_true", help="Do not load or store the parsed program in the __altucache__ directory")
+    arguments = argument_parser.parse_args()
+    if arguments.stream and (arguments.mmap or arguments.lazy):
+        argument_parser.error("--stream can not be combined with --mmap or --lazy")
+    if arguments.stream and (arguments.compile or arguments.transpile):
+        argument_parser.error("--stream can not be combined with --compile or --transpile")
 
-    with open(sys.argv[1], 'rb') as f:
-        code = f.read().decode("utf-8")
+    if arguments.mmap:
+        characters  = mmap_file(arguments.source_file)
+    else:
+        with open(arguments.source_file, 'rb') as f:
+            characters = f.read()
+        code        = characters.decode("utf-8")
 
-    tokens = lex(code, search_match, TokenExpressions)
-    tokens = list(filter(lambda token: token.tokentype_ != TokenTypes.NONE, tokens))
+    cache_directory = program_cache_directory(arguments.source_file)
+    cache_variant   = "-".join(name for name, enabled in [("mmap", arguments.mmap), ("lazy", arguments.lazy), ("release", arguments.release), ("fold", arguments.fold_constants), ("dce", arguments.eliminate_dead_code), ("transpile", arguments.transpile)] if enabled)
+    cache_key       = program_cache_key(characters, cache_variant)
+    program         = None if arguments.no_cache or arguments.stream else program_cache_load(cache_directory, cache_key)
 
-    parsed, leftover_token = parse(code, tokens)
-    program = Program(loc_={'start': {'line': 1, 'index': 0}, "end":{"line":tokens[-1].loc_["start"]["line"], "index":tokens[-1].loc_["start"]["index"]}}, range_=[0, len(code)], body_=parsed)
+    if program is None and not arguments.stream:
+        if arguments.mmap:
+            tokens  = lex_stream(characters, search_match_compiled, BytesTokenExpressions)
+            code    = tokens.source_file
+        else:
+            tokens  = tokenize(code)
+        program = parse_program(code, tokens, lazy_function_bodies=arguments.lazy)
+        if arguments.fold_constants:
+            program = fold_constants(program)
+        if arguments.eliminate_dead_code:
+            program = eliminate_dead_code(program)
+        if arguments.release:
+            program = node_release(program)
+        if arguments.transpile:
+            # The cache contains the marshalled python code of a transpiled program, or the program when it can not be transpiled
+            try:
+                program = transpiled_program_dumps(transpile_program(program))
+            except ValueError as error:
+                print("program is not transpiled,", error, file=sys.stderr)
+        if not arguments.no_cache:
+            program_cache_store(cache_directory, cache_key, program)
+    elif arguments.mmap:
+        code = source_file_from_characters(characters)
+
+    transpiled = transpiled_program_loads(program) if isinstance(program, bytes) else None
 
     time_start = time.time()
-    result = interpret(code, program)
+    if arguments.stream:
+        statements = parse_iter(code, tokenize(code))
+        if arguments.fold_constants:
+            statements = map(fold_constants, statements)
+        if arguments.eliminate_dead_code:
+            statements = map(remove_dead_statements, statements)
+        result = interpret_statements(code, statements)
+    elif transpiled:
+        result = interpret_transpiled(code, transpiled)
+    elif arguments.compile or arguments.transpile:
+        result = interpret_compiled(code, program)
+    else:
+        result = interpret(code, program)
     time_stop = time.time()
     print("program finished in", round(time_stop-time_start, 5), "s")
\ No newline at end of file
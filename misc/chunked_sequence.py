@@ -0,0 +1,324 @@
+"""
+@file chunked_sequence.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains the ChunkedSequence object, a sequence that is stored in chunks so an edited copy shares every
+       chunk that has not been edited, and functions to search and edit a ChunkedSequence
+@version 0.1
+@date 18-10-2026
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+@dataclass(frozen=True)
+class ChunkedSequence:
+    """
+    ChunkedSequence class
+        A sequence of integers, characters or objects which is stored in chunks. Replacing a range of a ChunkedSequence
+        creates a new ChunkedSequence which only copies the chunks around the range. All other chunks are shared with
+        the previous ChunkedSequence, which does not change
+    ...
+
+    Attributes
+    ----------
+    chunks : List[Union[array, str, list]]
+        The chunks of the sequence
+    lengths : array
+        A fenwick tree of the length of every chunk, which finds the chunk of an index in O(log(chunks))
+    origins : Optional[array]
+        For a sequence of integers that moves: the stored value that corresponds to the base of every chunk. None otherwise
+    widths : Optional[array]
+        For a sequence of integers that moves: a fenwick tree of the distance between the base of every chunk and the
+        base of the next chunk. The base of a chunk is the sum of the widths of the chunks before it. None otherwise
+    length : int
+        The amount of items in the sequence
+    chunk_length : int
+        The length of the chunks a sequence is split into. An edited chunk is split again when it grows past twice this length
+    cache : list
+        The first index, end index, chunk index and value offset of the chunk that was read last
+
+    Notes
+    -----
+    An integer of a sequence that moves (like the start of every token or line) is its stored value minus the origin
+    plus the base of its chunk. Moving every integer after an edit only changes the width of the edited chunk, so the
+    chunks after the edit are shared instead of copied. In a sorted sequence the base of every chunk is at most its
+    first integer and more than the last integer of the chunk before it. The chunk of an integer is then found in the
+    widths in the same way the chunk of an index is found in the lengths.
+    An edit copies the list of chunks and the fenwick trees, which are a couple of bytes per chunk, and the chunks
+    around the edit. The amount of chunks only changes when an edit spans more than one chunk or a chunk grows past
+    twice the chunk length, only then the fenwick trees are built again
+    """
+    chunks          : List[Union[array, str, list]]
+    lengths         : array
+    origins         : Optional[array]
+    widths          : Optional[array]
+    length          : int
+    chunk_length    : int
+    cache           : list = field(default_factory=list, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return chunked_sequence_slice(self, index)
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("ChunkedSequence index out of range")
+        first, _, chunk, offset = chunked_sequence_locate(self, index)
+        value = self.chunks[chunk][index - first]
+        return value + offset if offset else value
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk, offset in zip(self.chunks, chunked_sequence_offsets(self)):
+            yield from (map(offset.__add__, chunk) if offset else chunk)
+
+    def __repr__(self) -> str:
+        return f"ChunkedSequence(length={self.length}, chunks={len(self.chunks)})"
+
+
+def fenwick_build(values: Sequence[int]) -> array:
+    """Function creates a fenwick tree of the provided values in O(values)"""
+    tree = array('q', [0])
+    tree.extend(values)
+    for index in range(1, len(tree)):
+        parent = index + (index & -index)
+        if parent < len(tree):
+            tree[parent] += tree[index]
+    return tree
+
+def fenwick_values(tree: array) -> array:
+    """Function returns the values a fenwick tree was built from in O(values)"""
+    values = array('q', tree)
+    for index in range(len(values) - 1, 0, -1):
+        parent = index + (index & -index)
+        if parent < len(values):
+            values[parent] -= values[index]
+    return values[1:]
+
+def fenwick_prefix(tree: array, count: int) -> int:
+    """Function returns the sum of the first count values of a fenwick tree"""
+    total = 0
+    while count > 0:
+        total += tree[count]
+        count &= count - 1
+    return total
+
+def fenwick_add(tree: array, index: int, amount: int) -> None:
+    """Function adds amount to the value at index of a fenwick tree"""
+    index += 1
+    while index < len(tree):
+        tree[index] += amount
+        index += index & -index
+
+def fenwick_search(tree: array, value: int) -> Tuple[int, int]:
+    """Function returns the largest count for which the sum of the first count values of a fenwick tree of non negative
+    values is at most value, together with that sum"""
+    size = len(tree)
+    count, total, step = 0, 0, 1 << (size - 1).bit_length()
+    while step:
+        if count + step < size and total + tree[count + step] <= value:
+            count += step
+            total += tree[count]
+        step >>= 1
+    return count, total
+
+
+def chunk_join(example: Union[array, memoryview, str, bytes, list], pieces: List[Any]) -> Union[array, str, bytes, list]:
+    """Function joins pieces of chunks, or iterables of their items, into one chunk of the same kind as example"""
+    if isinstance(example, (str, bytes)):
+        return example[:0].join(pieces)
+    if isinstance(example, list):
+        return [item for piece in pieces for item in piece]
+    joined = array(example.typecode if isinstance(example, array) else example.format)
+    for piece in pieces:
+        if isinstance(piece, memoryview):
+            joined.frombytes(piece.cast('B'))
+        else:
+            joined.extend(piece)
+    return joined
+
+
+def chunked_sequence(sequence: Union[Sequence[Any], ChunkedSequence], chunk_length: int=512, moves: bool=False) -> ChunkedSequence:
+    """Function splits a sequence into a ChunkedSequence. A ChunkedSequence is returned as it is
+
+    Args:
+        sequence            : An array, memoryview, str or list that needs to be split into chunks
+        chunk_length        : The amount of items in every chunk, default=512
+        moves               : Whether the sequence contains integers which are moved by chunked_sequence_replace, default=False
+
+    Returns:
+        A ChunkedSequence containing the items of sequence
+    """
+    if isinstance(sequence, ChunkedSequence):
+        return sequence
+    if isinstance(sequence, memoryview):
+        sequence = array(sequence.format, sequence)
+    chunks  = [sequence[start:start + chunk_length] for start in range(0, len(sequence), chunk_length)] or [sequence[:0]]
+    origins = widths = None
+    if moves:
+        # Every chunk is stored as it is, so its origin and base are both its first integer. The first chunk has base 0
+        origins = array('q', [0] + [chunk[0] for chunk in chunks[1:]])
+        widths  = array('q', [origin - previous for previous, origin in zip(origins, origins[1:])])
+        widths.append(chunks[-1][-1] + 1 - origins[-1] if len(chunks[-1]) else 0)
+        widths  = fenwick_build(widths)
+    return ChunkedSequence(chunks, fenwick_build(map(len, chunks)), origins, widths, len(sequence), chunk_length)
+
+
+def chunked_sequence_locate(sequence: ChunkedSequence, index: int) -> List[int]:
+    """Function returns the first index, end index, chunk index and value offset of the chunk that contains index. The
+    chunk is kept in the cache of the sequence, so reading the items of a chunk one by one only searches the chunk once"""
+    cache = sequence.cache
+    if cache and cache[0] <= index < cache[1]:
+        return cache
+    chunk, first    = fenwick_search(sequence.lengths, index)
+    offset          = fenwick_prefix(sequence.widths, chunk) - sequence.origins[chunk] if sequence.widths is not None else 0
+    cache[:]        = first, first + len(sequence.chunks[chunk]), chunk, offset
+    return cache
+
+def chunked_sequence_offsets(sequence: ChunkedSequence) -> Iterator[int]:
+    """Function yields the value offset of every chunk of a sequence, which is 0 for a sequence that does not move"""
+    if sequence.widths is None:
+        yield from (0 for _ in sequence.chunks)
+        return
+    base = 0
+    for origin, width in zip(sequence.origins, fenwick_values(sequence.widths)):
+        yield base - origin
+        base += width
+
+def chunked_sequence_slice(sequence: ChunkedSequence, index: slice) -> Union[array, str, list]:
+    """Function returns the items of a slice of a sequence as one array, str or list"""
+    start, stop, step = index.indices(sequence.length)
+    if step != 1:
+        items = [sequence[item] for item in range(start, stop, step)]
+        return chunk_join(sequence.chunks[0], items if isinstance(sequence.chunks[0], str) else [items])
+    pieces = []
+    while start < stop:
+        first, end, chunk, offset = chunked_sequence_locate(sequence, start)
+        piece   = sequence.chunks[chunk][start - first:min(end, stop) - first]
+        start   = min(end, stop)
+        pieces.append(map(offset.__add__, piece) if offset else piece)
+    return chunk_join(sequence.chunks[0], pieces)
+
+
+def chunked_sequence_chunk(sequence: ChunkedSequence, index: int) -> Tuple[int, int]:
+    """Function returns the chunk index and first index of the chunk that contains index. An index at the end of
+    the sequence belongs to the last chunk"""
+    if index >= sequence.length:
+        return len(sequence.chunks) - 1, sequence.length - len(sequence.chunks[-1])
+    return fenwick_search(sequence.lengths, index)
+
+def chunked_sequence_replace(sequence: ChunkedSequence, start: int, stop: int, values: Sequence[Any], delta: int=0) -> ChunkedSequence:
+    """Function creates a ChunkedSequence in which the items between start and stop are replaced by values. Only the
+    chunks that contain start and stop are copied, all other chunks are shared with sequence, which does not change
+
+    Args:
+        sequence            : The ChunkedSequence in which items are replaced
+        start               : The index of the first item that is replaced
+        stop                : The index after the last item that is replaced
+        values              : The items that are placed between start and stop
+        delta               : For a sequence that moves, the amount that is added to every integer after stop, default=0
+
+    Returns:
+        A new ChunkedSequence containing the replaced items
+    """
+    chunks, lengths, origins, widths = sequence.chunks, sequence.lengths, sequence.origins, sequence.widths
+    first_chunk, first_index    = chunked_sequence_chunk(sequence, start)
+    stop_chunk, stop_index      = chunked_sequence_chunk(sequence, stop - 1) if stop > start else (first_chunk, first_index)
+    prefix, suffix              = chunks[first_chunk][:start - first_index], chunks[stop_chunk][stop - stop_index:]
+
+    if widths is None:
+        content = chunk_join(chunks[first_chunk], [prefix, values, suffix])
+    else:
+        # The new chunk stores its integers like the first chunk it replaces. Integers after stop move by delta
+        base, origin    = fenwick_prefix(widths, first_chunk), origins[first_chunk]
+        old_end_base    = fenwick_prefix(widths, stop_chunk + 1)
+        suffix_offset   = (fenwick_prefix(widths, stop_chunk) - origins[stop_chunk]) - (base - origin) + delta
+        content         = chunk_join(chunks[first_chunk], [
+            prefix,
+            map((origin - base).__add__, values) if origin - base else values,
+            map(suffix_offset.__add__, suffix) if suffix_offset else suffix
+        ])
+
+    # An edited chunk that becomes empty is dropped, unless it is the only chunk of the sequence
+    size    = sequence.chunk_length
+    pieces  = [content[index:index + size] for index in range(0, len(content), size)] if len(content) > 2 * size else [content]
+    if not len(content) and len(chunks) > stop_chunk - first_chunk + 1:
+        pieces = []
+    length  = sequence.length - (stop - start) + len(values)
+    if widths is not None:
+        # The base of every new chunk is its first integer, except for the first chunk of the sequence which has base 0.
+        # The base of the chunk after the new chunks is raised when it would not be more than their last integer
+        end_base        = old_end_base + delta
+        if pieces:
+            end_base    = max(end_base, content[-1] - origin + base + 1) if len(content) else end_base
+            piece_bases = [base if first_chunk == 0 or not len(pieces[0]) else pieces[0][0] - origin + base]
+            piece_bases+= [piece[0] - origin + base for piece in pieces[1:]]
+        else:
+            # Nothing moves after the last chunk, so the chunk before a removed last chunk keeps its width
+            end_base    = end_base if stop_chunk + 1 < len(chunks) else base
+            piece_bases = []
+        piece_origins   = [origin + piece_bases[0] - base] + [piece[0] for piece in pieces[1:]] if pieces else []
+        piece_widths    = [next_base - piece_base for piece_base, next_base in zip(piece_bases, piece_bases[1:] + [end_base])]
+        # The width and origin that are added to the chunks before and after the replaced chunks
+        adjustments     = []
+        if first_chunk:
+            adjustments.append((first_chunk - 1, (piece_bases[0] if pieces else end_base) - base, 0))
+        if stop_chunk + 1 < len(chunks):
+            moved = end_base - (old_end_base + delta) if pieces or first_chunk else -end_base
+            adjustments.append((stop_chunk + 1, -moved, moved))
+
+    if len(pieces) == 1 and first_chunk == stop_chunk:
+        chunks  = chunks[:]
+        chunks[first_chunk] = content
+        lengths = array('q', lengths)
+        fenwick_add(lengths, first_chunk, len(content) - len(sequence.chunks[first_chunk]))
+        if widths is not None:
+            widths, origins = array('q', widths), array('q', origins)
+            origins[first_chunk] = piece_origins[0]
+            fenwick_add(widths, first_chunk, piece_widths[0] - (old_end_base - base))
+            for chunk, width, moved in adjustments:
+                fenwick_add(widths, chunk, width)
+                origins[chunk] += moved
+        return ChunkedSequence(chunks, lengths, origins, widths, length, size)
+
+    chunks  = chunks[:first_chunk] + pieces + chunks[stop_chunk + 1:]
+    lengths = fenwick_values(lengths)
+    lengths[first_chunk:stop_chunk + 1] = array('q', map(len, pieces))
+    if widths is not None:
+        widths, origins = fenwick_values(widths), array('q', origins)
+        for chunk, width, moved in adjustments:
+            widths[chunk]   += width
+            origins[chunk]  += moved
+        widths[first_chunk:stop_chunk + 1]  = array('q', piece_widths)
+        origins[first_chunk:stop_chunk + 1] = array('q', piece_origins)
+        widths                              = fenwick_build(widths)
+    return ChunkedSequence(chunks, fenwick_build(lengths), origins, widths, length, size)
+
+
+def chunked_sequence_bisect(sequence: ChunkedSequence, value: int, low: int=0, right: bool=False) -> int:
+    """Function returns the index where value would be inserted in a sorted sequence of integers that moves, like
+    bisect_left (or bisect_right when right is True) with lo=low"""
+    chunk, base = fenwick_search(sequence.widths, value)
+    if chunk == len(sequence.chunks):
+        chunk   = chunk - 1
+        base    = fenwick_prefix(sequence.widths, chunk)
+    local = value - base + sequence.origins[chunk]
+    index = fenwick_prefix(sequence.lengths, chunk) + (bisect_right if right else bisect_left)(sequence.chunks[chunk], local)
+    return max(index, low)
+
+def sequence_bisect_left(sequence: Union[Sequence[int], ChunkedSequence], value: int, low: int=0) -> int:
+    """Function returns bisect_left(sequence, value, low) for a sorted sequence of integers or ChunkedSequence"""
+    if isinstance(sequence, ChunkedSequence):
+        return chunked_sequence_bisect(sequence, value, low)
+    return bisect_left(sequence, value, low)
+
+def sequence_bisect_right(sequence: Union[Sequence[int], ChunkedSequence], value: int, low: int=0) -> int:
+    """Function returns bisect_right(sequence, value, low) for a sorted sequence of integers or ChunkedSequence"""
+    if isinstance(sequence, ChunkedSequence):
+        return chunked_sequence_bisect(sequence, value, low, right=True)
+    return bisect_right(sequence, value, low)
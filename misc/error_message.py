@@ -6,40 +6,80 @@
 @date 11-05-2021
 """
 
+from dataclasses import dataclass
 from misc.token_types import *
 from misc.overload import overload
+from misc.source_file import SourceFile, get_source_file, source_file_location, source_file_line, source_file_width
 import misc.node_types as node_types
 
-@overload((int, int, str, str, bool))
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """
+    Diagnostic class
+        An error message as structured data, so tools can collect errors instead of printing them
+    ...
+
+    Attributes
+    ----------
+    message : str
+        The message that describes the error, like "Invalid Syntax"
+    line : int
+        The line number of the error, starting at 1
+    column : int
+        The index in the line of the first character of the error
+    width : int
+        The amount of characters of the error
+    source_line : str
+        The line of source code which contains the error
+    """
+    message     : str
+    line        : int
+    column      : int
+    width       : int
+    source_line : str
+
+
+class DiagnosticError(Exception):
+    """Exception raised by generate_error_message. Converting it to a string gives the error message, the
+    diagnostic attribute contains the same error as a Diagnostic"""
+    def __init__(self, error_message: str, diagnostic: Diagnostic):
+        super().__init__(error_message)
+        self.diagnostic = diagnostic
+
+    def __reduce__(self):
+        return DiagnosticError, (str(self), self.diagnostic)
+
+
+@overload((int, int, (str, SourceFile), str, bool))
 def generate_error_message(line_no: int, index: int, characters: str, message: str, raise_error:bool):
-    line                = characters.split("\n")[line_no-1]
+    line                = source_file_line(get_source_file(characters), line_no)
     error_message       = message + "\n" + f"File <placeholder>, line {line_no}\n\t{line}\n\t{' '*(index+1) + '^^^^'}"
     if raise_error:
-        raise Exception(error_message)
+        raise DiagnosticError(error_message, Diagnostic(message, line_no, index, 1, line))
     return error_message
 
 
-@overload((Token, str, str, bool))
+@overload((Token, (str, SourceFile), str, bool))
 def generate_error_message(token: Token, characters: str, message: str, raise_error:bool):
-    line_no_error       = token.loc_["start"]["line"]
-    start_index_error   = token.loc_["start"]["index"]
-    end_index_error     = token.loc_["end"]["index"]
-    invalid_chars       = characters.split("\n")[token.loc_["start"]["line"]-1]
+    source_file         = get_source_file(characters)
+    line_no_error, start_index_error = source_file_location(source_file, token.range_[0])
+    end_index_error     = start_index_error + source_file_width(source_file, *token.range_)
+    invalid_chars       = source_file_line(source_file, line_no_error)
     error_message       = message + "\n" + f"File <placeholder>, line {line_no_error}\n\t{invalid_chars}\n\t{(' '*start_index_error)+ (end_index_error-start_index_error)*'^'}"
     if raise_error:
-        raise Exception(error_message)
+        raise DiagnosticError(error_message, Diagnostic(message, line_no_error, start_index_error, end_index_error-start_index_error, invalid_chars))
     return error_message
 
 
-@overload((node_types.FunctionDeclaration, node_types.FunctionDeclaration, str, str, bool))
+@overload((node_types.FunctionDeclaration, node_types.FunctionDeclaration, (str, SourceFile), str, bool))
 def generate_error_message(func_1: node_types.Node, func_2:node_types.Node, characters: str, message: str, raise_error: bool):
-    func_1_line_no_error       = func_1.loc_["start"]["line"]
-    func_1_start_index_error   = func_1.loc_["start"]["index"]
-    func_1_invalid_chars       = characters.split("\n")[func_1_line_no_error-1]
+    source_file                = get_source_file(characters)
+    func_1_line_no_error, func_1_start_index_error = source_file_location(source_file, func_1.range_start)
+    func_1_invalid_chars       = source_file_line(source_file, func_1_line_no_error)
     
-    func_2_line_no_error       = func_2.loc_["start"]["line"]
-    func_2_start_index_error   = func_2.loc_["start"]["index"]
-    func_2_invalid_chars       = characters.split("\n")[func_2_line_no_error-1]  
+    func_2_line_no_error, func_2_start_index_error = source_file_location(source_file, func_2.range_start)
+    func_2_invalid_chars       = source_file_line(source_file, func_2_line_no_error)
 
     if func_1_line_no_error < func_2_line_no_error:
         error_message       = message + "\n" + f"File <placeholder>, line {func_1_line_no_error}"
@@ -52,30 +92,31 @@ def generate_error_message(func_1: node_types.Node, func_2:node_types.Node, char
         error_message       +="\n" + f"File <placeholder>, line {func_1_line_no_error}"
         error_message       += f"\n\t{func_1_invalid_chars}\n\t{' '*func_1_start_index_error+ len(func_1_invalid_chars)*'^'}\n"
     if raise_error:
-        raise Exception(error_message)
+        line_no_error, start_index_error, invalid_chars = max((func_1_line_no_error, func_1_start_index_error, func_1_invalid_chars), (func_2_line_no_error, func_2_start_index_error, func_2_invalid_chars))
+        raise DiagnosticError(error_message, Diagnostic(message, line_no_error, start_index_error, len(invalid_chars), invalid_chars))
     return error_message
 
-@overload((node_types.Literal, str, str, bool))
+@overload((node_types.Literal, (str, SourceFile), str, bool))
 def generate_error_message(node: node_types.Literal, characters: str, message: str, raise_error: bool):
-    line_no_error       = node.loc_["start"]["line"]
-    start_index_error   = node.loc_["start"]["index"]
-    invalid_chars       = characters.split("\n")[line_no_error-1]
+    source_file         = get_source_file(characters)
+    line_no_error, start_index_error = source_file_location(source_file, node.range_start)
+    invalid_chars       = source_file_line(source_file, line_no_error)
     
     error_message       = message + "\n" + f"File <placeholder>, line {line_no_error}"
     error_message       += f"\n\t{invalid_chars}\n\t{' '*start_index_error+ len(invalid_chars)*'^'}\n"
     
     if raise_error:
-        raise Exception(error_message)
+        raise DiagnosticError(error_message, Diagnostic(message, line_no_error, start_index_error, len(invalid_chars), invalid_chars))
     return error_message
 
-@overload((node_types.Identifier, str, str, bool))
+@overload((node_types.Identifier, (str, SourceFile), str, bool))
 def generate_error_message(node: node_types.Identifier, characters: str, message: str, raise_error: bool):
-    line_no_error       = node.loc_["start"]["line"]
-    start_index_error   = node.loc_["start"]["index"]
-    end_index_error     = node.loc_["end"]["index"]
-    invalid_chars       = characters.split("\n")[line_no_error-1]
+    source_file         = get_source_file(characters)
+    line_no_error, start_index_error = source_file_location(source_file, node.range_start)
+    end_index_error     = start_index_error + source_file_width(source_file, node.range_start, node.range_end)
+    invalid_chars       = source_file_line(source_file, line_no_error)
     
     error_message       = message + "\n" + f"File <placeholder>, line {line_no_error}\n\t{invalid_chars}\n\t{' '*start_index_error+ (end_index_error-start_index_error)*'^'}"
     if raise_error:
-        raise Exception(error_message)
+        raise DiagnosticError(error_message, Diagnostic(message, line_no_error, start_index_error, end_index_error-start_index_error, invalid_chars))
     return error_message
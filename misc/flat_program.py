@@ -0,0 +1,257 @@
+"""
+@file flat_program.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains the FlatProgram object, which stores a parsed program in parallel arrays, and functions to
+       convert, store and load a FlatProgram
+@version 0.1
+@date 18-10-2026
+"""
+
+import json
+import struct
+import sys
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, List, Sequence, Union
+try : from token_types import *
+except : from misc.token_types import *
+try : from node_types import *
+except : from misc.node_types import *
+
+
+# The shapes of the fields of a node. NODE fields hold one child node, NODES fields hold a list of child nodes and
+# OPTIONAL fields hold a child node or an empty list. VALUE fields hold a constant and OPERATOR fields a TokenTypes
+NODE, NODES, OPTIONAL, VALUE, OPERATOR = range(5)
+
+# The fields of every node type in the order their children and constants are stored. A node type has at most one
+# NODES or OPTIONAL field, the amount of nodes it contains follows from the child count of the node
+node_schemas = {
+    Program             : [("body_", NODES)],
+    BlockStatement      : [("body_", NODES)],
+    Identifier          : [("name_", VALUE)],
+    FunctionDeclaration : [("id_", VALUE), ("params_", NODES), ("body_", NODE)],
+    Literal             : [("value_", VALUE), ("raw_", VALUE)],
+    IfStatement         : [("test_", NODE), ("consequent_", NODE), ("alternate_", OPTIONAL)],
+    ReturnStatement     : [("argument_", NODE)],
+    ExpressionStatement : [("expression_", NODE)],
+    CallExpression      : [("callee_", NODE), ("arguments_", NODES)],
+    UnaryExpression     : [("operator_", OPERATOR), ("argument_", NODE)],
+    VariableDeclaration : [("id_", VALUE), ("init_", NODE)],
+    BinaryExpression    : [("operator_", OPERATOR), ("left_", NODE), ("right_", NODE)]
+}
+node_kinds          = list(node_schemas)
+node_kind_indexes   = {node_type: kind for kind, node_type in enumerate(node_kinds)}
+
+# The arrays of a file are stored little endian like its header, whatever the byte order of the machine that wrote it.
+# The magic ends with the version of the layout, so a file with 32 bit arrays written by an older version is not loaded
+flat_program_magic  = b"ALTUFLT2"
+flat_program_arrays = [("kinds", 'b'), ("operators", 'b'), ("first_child", 'q'), ("child_count", 'q'), ("values", 'q'),
+                       ("range_starts", 'q'), ("range_ends", 'q'), ("start_lines", 'q'), ("start_indexes", 'q'),
+                       ("end_lines", 'q'), ("end_indexes", 'q')]
+
+
+@dataclass(frozen=True)
+class FlatProgram:
+    """
+    FlatProgram class
+        A parsed program stored in parallel arrays. Every node has an index, the program has index 0. The children
+        of a node have consecutive indexes which are higher than the index of the node itself
+    ...
+
+    Attributes
+    ----------
+    kinds : Sequence[int]
+        The index of the type of every node in node_kinds
+    operators : Sequence[int]
+        The value of the TokenTypes operator of every node, -1 for nodes without an operator
+    first_child : Sequence[int]
+        The index of the first child of every node
+    child_count : Sequence[int]
+        The amount of children of every node
+    values : Sequence[int]
+        The index in constants of the first constant of every node, like the name of an identifier, -1 for nodes without constants
+    range_starts : Sequence[int]
+        The range_[0] of every node
+    range_ends : Sequence[int]
+        The range_[1] of every node
+    start_lines : Sequence[int]
+        The line where every node starts, -1 for nodes without a loc_
+    start_indexes : Sequence[int]
+        The index in the line where every node starts, -1 for nodes without a loc_
+    end_lines : Sequence[int]
+        The line where every node ends, -1 for nodes without a loc_
+    end_indexes : Sequence[int]
+        The index in the line where every node ends, -1 for nodes without a loc_
+    constants : List[Any]
+        The names of identifiers and the values and raw values of literals
+
+    Notes
+    -----
+    A FlatProgram created by flat_program_from_program contains arrays. A FlatProgram loaded by flat_program_load
+    contains memoryviews of the buffer it was loaded from, so the arrays are not copied. Only a big endian machine
+    copies the arrays, to swap the little endian bytes of the file
+    """
+    kinds           : Sequence[int] = field(default_factory=lambda: array('b'))
+    operators       : Sequence[int] = field(default_factory=lambda: array('b'))
+    first_child     : Sequence[int] = field(default_factory=lambda: array('q'))
+    child_count     : Sequence[int] = field(default_factory=lambda: array('q'))
+    values          : Sequence[int] = field(default_factory=lambda: array('q'))
+    range_starts    : Sequence[int] = field(default_factory=lambda: array('q'))
+    range_ends      : Sequence[int] = field(default_factory=lambda: array('q'))
+    start_lines     : Sequence[int] = field(default_factory=lambda: array('q'))
+    start_indexes   : Sequence[int] = field(default_factory=lambda: array('q'))
+    end_lines       : Sequence[int] = field(default_factory=lambda: array('q'))
+    end_indexes     : Sequence[int] = field(default_factory=lambda: array('q'))
+    constants       : List[Any]     = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+
+def flat_program_from_program(program: Program) -> FlatProgram:
+    """Function stores a program in a FlatProgram. The nodes are numbered breadth first, so the children of every
+    node get consecutive indexes
+
+    Args:
+        program             : The program that needs to be stored. Lazy function bodies must have been parsed
+
+    Returns:
+        A FlatProgram containing all nodes of the program
+    """
+    flat_program, nodes, index = FlatProgram(), [program], 0
+    flat_program_append(flat_program, program)
+    while index < len(nodes):
+        children = node_children(nodes[index])
+        flat_program.first_child.append(len(nodes))
+        flat_program.child_count.append(len(children))
+        for child in children:
+            flat_program_append(flat_program, child)
+        nodes += children
+        index += 1
+    return flat_program
+
+def node_children(node: Node) -> List[Node]:
+    """Function returns the child nodes of a node in the order of its schema. A lazy function body is replaced by 
+    the BlockStatement it has been parsed into"""
+    children = []
+    for name, shape in node_schemas[type(node)]:
+        value = getattr(node, name)
+        if shape == NODE or (shape == OPTIONAL and value != []):
+            children.append(value)
+        elif shape == NODES:
+            children += value
+    for index, child in enumerate(children):
+        if type(child) is LazyBlockStatement:
+            if not child.parsed_:
+                raise ValueError("A FlatProgram can not contain a function body that has not been parsed")
+            children[index] = child.parsed_[0]
+    return children
+
+def flat_program_append(flat_program: FlatProgram, node: Node) -> None:
+    """Function appends the kind, operator, constants and location of a node to a FlatProgram. The children of the
+    node are appended later"""
+    schema = node_schemas[type(node)]
+    flat_program.kinds.append(node_kind_indexes[type(node)])
+    flat_program.operators.append(next((getattr(node, name).value for name, shape in schema if shape == OPERATOR), -1))
+    constants = [getattr(node, name) for name, shape in schema if shape == VALUE]
+    flat_program.values.append(len(flat_program.constants) if constants else -1)
+    flat_program.constants.extend(constants)
+    flat_program.range_starts.append(node.range_start)
+    flat_program.range_ends.append(node.range_end)
+    released = node.start_line is None
+    flat_program.start_lines.append(-1 if released else node.start_line)
+    flat_program.start_indexes.append(-1 if released else node.start_index)
+    flat_program.end_lines.append(-1 if released else node.end_line)
+    flat_program.end_indexes.append(-1 if released else node.end_index)
+
+
+def program_from_flat_program(flat_program: FlatProgram) -> Program:
+    """Function creates the nodes of a FlatProgram again. Because children have higher indexes than their parent,
+    the nodes are created from the last index to the first
+
+    Args:
+        flat_program        : The FlatProgram that needs to be converted
+
+    Returns:
+        A Program which is equal to the program the FlatProgram was created from
+    """
+    nodes = [None] * len(flat_program)
+    for index in reversed(range(len(flat_program))):
+        node_type   = node_kinds[flat_program.kinds[index]]
+        schema      = node_schemas[node_type]
+        first, count= flat_program.first_child[index], flat_program.child_count[index]
+        children    = iter(nodes[first:first+count])
+        variable    = count - sum(1 for _, shape in schema if shape == NODE)
+        constant    = flat_program.values[index]
+        values      = {}
+        for name, shape in schema:
+            if shape == NODE:
+                values[name] = next(children)
+            elif shape == NODES:
+                values[name] = [next(children) for _ in range(variable)]
+            elif shape == OPTIONAL:
+                values[name] = next(children) if variable else []
+            elif shape == VALUE:
+                values[name] = flat_program.constants[constant]
+                constant += 1
+            else:
+                values[name] = TokenTypes(flat_program.operators[index])
+
+        if flat_program.start_lines[index] == -1:
+            nodes[index] = node_type(loc_=None, range_=(flat_program.range_starts[index], flat_program.range_ends[index]), **values)
+        else:
+            nodes[index] = node_located(node_type, flat_program.start_lines[index], flat_program.start_indexes[index], flat_program.end_lines[index], 
+                                        flat_program.end_indexes[index], flat_program.range_starts[index], flat_program.range_ends[index], **values)
+    return nodes[0]
+
+
+def flat_program_dump(flat_program: FlatProgram, f: BinaryIO) -> None:
+    """Function writes a FlatProgram to a binary file. The file starts with flat_program_magic and the length of
+    every array, followed by the little endian bytes of every array and the constants as json. Every array starts 
+    at a multiple of 8 bytes, so flat_program_load can use the arrays without copying them
+
+    Args:
+        flat_program        : The FlatProgram that needs to be written
+        f                   : A binary file which is opened for writing
+    """
+    constants = json.dumps(flat_program.constants).encode("utf-8")
+    f.write(flat_program_magic + struct.pack(f"<{len(flat_program_arrays) + 1}q", *[len(getattr(flat_program, name)) for name, _ in flat_program_arrays], len(constants)))
+    for name, typecode in flat_program_arrays:
+        data = array(typecode, getattr(flat_program, name))
+        if sys.byteorder == "big":
+            data.byteswap()
+        data = data.tobytes()
+        f.write(data + bytes(-len(data) % 8))
+    f.write(constants)
+
+def flat_program_load(buffer: Union[bytes, memoryview]) -> FlatProgram:
+    """Function loads a FlatProgram from the bytes written by flat_program_dump, like a memory mapped file. The
+    arrays of the FlatProgram are memoryviews of buffer, only the constants are decoded
+
+    Args:
+        buffer              : The bytes of a file written by flat_program_dump
+
+    Returns:
+        If buffer contains a FlatProgram:
+            The FlatProgram
+        Otherwise:
+            Raises a ValueError
+    """
+    buffer = memoryview(buffer)
+    header = struct.calcsize(f"<{len(flat_program_arrays) + 1}q")
+    if bytes(buffer[:len(flat_program_magic)]) != flat_program_magic or len(buffer) < len(flat_program_magic) + header:
+        raise ValueError("The buffer does not contain a FlatProgram")
+    *lengths, constants_length = struct.unpack_from(f"<{len(flat_program_arrays) + 1}q", buffer, len(flat_program_magic))
+
+    offset, arrays = len(flat_program_magic) + header, {}
+    for (name, typecode), length in zip(flat_program_arrays, lengths):
+        size            = length * array(typecode).itemsize
+        arrays[name]    = buffer[offset:offset+size].cast(typecode)
+        if sys.byteorder == "big":
+            arrays[name] = array(typecode, arrays[name])
+            arrays[name].byteswap()
+        offset         += size + (-size % 8)
+    if offset + constants_length != len(buffer):
+        raise ValueError("The buffer does not contain a FlatProgram")
+    return FlatProgram(**arrays, constants=json.loads(bytes(buffer[offset:])))
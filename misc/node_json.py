@@ -0,0 +1,251 @@
+"""
+@file node_json.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains functions to write parsed programs to json files and load them again
+@version 0.1
+@date 18-10-2026
+"""
+
+import re
+import gc
+import json
+
+from typing import Any, List, Tuple, TextIO
+try : from token_types import *
+except : from misc.token_types import *
+try : from node_types import *
+except : from misc.node_types import *
+
+
+# The shapes of the fields of a node in json. STRING and OPERATOR fields are written as strings, NUMBER fields as
+# numbers, NODE fields as an object containing one node and NODES fields as an object containing every node of a list.
+# SPACED_NODE fields are NODE fields with a space after their key. TOKENS fields hold the tokens of a lazy function body
+STRING, OPERATOR, NUMBER, NODE, SPACED_NODE, NODES, TOKENS = range(7)
+
+# The fields of every node type in the order they are written by jsonify
+node_json_schemas = {
+    Program             : [("body_", NODES)],
+    Identifier          : [("name_", STRING)],
+    BlockStatement      : [("body_", NODES)],
+    LazyBlockStatement  : [("tokens_", TOKENS)],
+    FunctionDeclaration : [("id_", STRING), ("params_", NODES), ("body_", NODE)],
+    Literal             : [("value_", NUMBER), ("raw_", NUMBER)],
+    IfStatement         : [("test_", NODE), ("consequent_", NODE), ("alternate_", NODE)],
+    ReturnStatement     : [("argument_", NODE)],
+    ExpressionStatement : [("expression_", NODE)],
+    CallExpression      : [("arguments_", NODES), ("callee_", NODE)],
+    UnaryExpression     : [("operator_", OPERATOR), ("argument_", SPACED_NODE)],
+    VariableDeclaration : [("id_", STRING), ("init_", SPACED_NODE)],
+    BinaryExpression    : [("operator_", OPERATOR), ("left_", NODE), ("right_", NODE)]
+}
+node_json_types = {node_type.__name__: node_type for node_type in node_json_schemas}
+
+json_number_expression = re.compile(r'-?(0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?')
+json_token_expression  = re.compile(r'\s*([{}\[\],"]|-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null|$)')
+json_colon_expression  = re.compile(r'\s*:')
+
+
+def program_json_dump(program: Program, f: TextIO) -> None:
+    """Function writes a program to a text file in the format of Program.jsonify. The json is written piece by piece
+    while the nodes are visited, so the time it takes grows linearly with the size of the json and the whole json
+    is never kept in memory. The output is the same as the output of jsonify, except where jsonify does not create
+    valid json: strings are escaped, and values which are no json numbers are written as strings
+
+    Args:
+        program             : The program that needs to be written
+        f                   : A text file which is opened for writing, or another object with a write method
+    """
+    f.write("{")
+    node_json_dump(program, f, 0)
+    f.write("}\n")
+
+def node_json_dump(node: Node, f: TextIO, spaces: int=0) -> None:
+    """Function writes a node and all nodes it contains to a text file, in the format of the jsonify method of the node.
+    The nodes are visited with a stack instead of recursion, so deeply nested nodes like a long chain of binary 
+    expressions can be written as well
+
+    Args:
+        node                : The node that needs to be written
+        f                   : A text file which is opened for writing
+        spaces              : The amount of spaces the lines of the node are indented, default=0
+    """
+    # The stack contains the strings that still need to be written and the (node, spaces) pairs that still need to
+    # be visited, in reversed order
+    write, stack = f.write, [(node, spaces)]
+    while stack:
+        item = stack.pop()
+        if type(item) is str:
+            write(item)
+            continue
+
+        node, spaces    = item
+        indent          = (spaces+4)*" "
+        schema          = node_json_schemas[type(node)]
+        parts           = ["\"" + type(node).__name__ + "\":{\n" + indent + "\"loc_\":" + json.dumps(node.loc_) + ",\n" + indent + "\"range_\":" + json.dumps(node.range_) + ",\n"]
+        for index, (name, shape) in enumerate(schema):
+            end = ",\n" if index != len(schema)-1 else "\n"
+            if shape == TOKENS:
+                parts.append(indent + "\"tokens_\":" + json.dumps([node.start_, node.end_]) + end)
+                continue
+
+            value = getattr(node, name)
+            if shape in (STRING, OPERATOR):
+                parts.append(indent + "\"" + name + "\":" + json.dumps(str(value), ensure_ascii=False) + end)
+            elif shape == NUMBER:
+                parts.append(indent + "\"" + name + "\":" + json_number(value) + end)
+            elif shape == NODES:
+                parts.append(indent + "\"" + name + "\":{\n")
+                for item_index, item in enumerate(value):
+                    parts += [indent + "    ", (item, spaces+8), ",\n" if item_index != len(value)-1 else "\n"]
+                parts.append(indent + "}" + end)
+            else:
+                parts.append(indent + "\"" + name + ("\": {\n" if shape == SPACED_NODE else "\":{\n") + indent + "    ")
+                if value: parts.append((value, spaces+8))
+                parts.append("\n" + indent + "}" + end)
+        parts.append(spaces*" " + "}")
+        stack.extend(reversed(parts))
+
+def json_number(value: Any) -> str:
+    """Function returns a value as it is written by jsonify when it is a valid json number, otherwise as a json value"""
+    text = str(value)
+    if json_number_expression.fullmatch(text):
+        return text
+    return json.dumps(value, ensure_ascii=False)
+
+
+def program_json_load(f: TextIO) -> Program:
+    """Function loads a program from a text file written by program_json_dump or Program.jsonify
+
+    Args:
+        f                   : A text file which is opened for reading
+
+    Returns:
+        If the file contains a program:
+            A Program which is equal to the program that was written
+        If the json is not valid, or contains a lazy function body:
+            Raises a ValueError
+    """
+    # json creates a container for every object. While they are created the garbage collector runs collections which
+    # look at all of them, which makes loading a large program several times slower
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        characters = f.read()
+        try:
+            pairs = json.loads(characters, object_pairs_hook=list)
+        except RecursionError:
+            pairs = json_pairs_loads(characters)
+        if not isinstance(pairs, list) or len(pairs) != 1 or pairs[0][0] != Program.__name__:
+            raise ValueError("The json does not contain a Program")
+        return node_from_json_pair(pairs[0])
+    except (KeyError, TypeError, IndexError, AttributeError) as error:
+        raise ValueError("The json does not contain a valid Program") from error
+    finally:
+        if gc_enabled: gc.enable()
+
+def node_from_json_pair(pair: Tuple[str, List[Tuple[str, Any]]]) -> Node:
+    """Function creates a node from the name of its type and the key value pairs of its fields, as loaded by json
+    with object_pairs_hook=list. The pairs are visited with a stack instead of recursion, the nodes are created 
+    afterwards in reversed order, so every node is created after the nodes it contains"""
+    # Every frame holds the type and field values of a node, and the dictionary and key (and list index for a list of
+    # nodes) where the node is stored once it has been created
+    result          = {}
+    frames, stack   = [], [(pair, result, "node", None)]
+    while stack:
+        (type_name, members), target, target_name, target_index = stack.pop()
+        node_type = node_json_types.get(type_name)
+        if node_type is None or node_type is LazyBlockStatement:
+            raise ValueError(f"The json contains a {type_name} node which can not be loaded")
+        members = dict(members)
+        values  = {
+            "loc_"  : None if members["loc_"] is None else {key: dict(location) for key, location in members["loc_"]},
+            "range_": members["range_"]
+        }
+        for name, shape in node_json_schemas[node_type]:
+            value = members[name]
+            if shape == OPERATOR:
+                value = TokenTypes[value.split(".")[-1]]
+            elif shape == NUMBER and name == "raw_":
+                value = value if isinstance(value, str) else json_number(value)
+            elif shape == NODES:
+                stack.extend((item, values, name, index) for index, item in enumerate(value))
+                value = [None] * len(value)
+            elif shape in (NODE, SPACED_NODE) and value:
+                stack.append((value[0], values, name, None))
+            elif shape in (NODE, SPACED_NODE):
+                value = []
+            values[name] = value
+        frames.append((node_type, values, target, target_name, target_index))
+
+    for node_type, values, target, target_name, target_index in reversed(frames):
+        if target_index is None:
+            target[target_name] = node_type(**values)
+        else:
+            target[target_name][target_index] = node_type(**values)
+    return result["node"]
+
+
+def json_pairs_loads(characters: str) -> Any:
+    """Function loads json like json.loads with object_pairs_hook=list, but keeps the objects and arrays that are 
+    being loaded on a stack instead of using recursion. It is used for json which is nested too deep for json.loads
+
+    Args:
+        characters          : The json that needs to be loaded
+
+    Returns:
+        If the json is valid:
+            The loaded value, where every object is a list of (key, value) pairs
+        If the json is not valid:
+            Raises a ValueError
+    """
+    # Every container on the stack is a list of pairs (an object) or a list of values (an array), together with whether
+    # it is an object. keys contains the key of the value that is being loaded for every container on the stack
+    stack, keys, index, result  = [], [], 0, []
+    expect_key, after_key, after_value = False, False, False
+    while True:
+        match = json_token_expression.match(characters, index)
+        if match is None:
+            raise ValueError(f"Invalid json at index {index}")
+        token, index = match.group(1), match.end()
+        if token == "":
+            if stack or not result:
+                raise ValueError("Unexpected end of json")
+            return result[0]
+
+        closes_empty = stack and not stack[-1][0] and not after_key and (token == "}" if stack[-1][1] else token == "]")
+        if after_value or closes_empty:
+            if token == "," and stack and not closes_empty:
+                expect_key, after_value = stack[-1][1], False
+                continue
+            if not stack or token != ("}" if stack[-1][1] else "]"):
+                raise ValueError(f"Unexpected '{token}' at index {match.start(1)}")
+            value, _ = stack.pop()
+            keys.pop()
+        elif expect_key:
+            if token != "\"":
+                raise ValueError(f"Expected a key at index {match.start(1)}")
+            key, index  = json.decoder.scanstring(characters, index)
+            match       = json_colon_expression.match(characters, index)
+            if match is None:
+                raise ValueError(f"Expected ':' at index {index}")
+            keys[-1], index, expect_key, after_key = key, match.end(), False, True
+            continue
+        elif token == "\"":
+            value, index = json.decoder.scanstring(characters, index)
+        elif token in "{[":
+            stack.append(([], token == "{"))
+            keys.append(None)
+            expect_key, after_key = token == "{", False
+            continue
+        elif token in "}],":
+            raise ValueError(f"Unexpected '{token}' at index {match.start(1)}")
+        else:
+            value = json.loads(token)
+
+        after_key, after_value = False, True
+        if not stack:
+            result.append(value)
+        elif stack[-1][1]:
+            stack[-1][0].append((keys[-1], value))
+        else:
+            stack[-1][0].append(value)
@@ -6,12 +6,12 @@
 @date 11-05-2021
 """
 
-from typing import Optional, Dict, List, Union
+from typing import Optional, Dict, List, Sequence, Union, Callable
 from misc.token_types import *
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields, InitVar
 import json
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class Node:
     """
     Base Node class
@@ -23,19 +23,52 @@ class Node:
     loc_ : Dict[str, Dict[str,int]]
         A dictionary containing two keys: start, end. Which in their turn contain
         another dictionary which also holds two keys: line, index. Their values are 
-        the line and indexes where the node starts and ends.
+        the line and indexes where the node starts and ends. None for a released node
     range_ : List[int]
         a list containing two items. The 0'th index contains the start index of the 
         node. The 1'st index contains the end index of the node. This index is document
         wide.
 
+    Notes
+    -----
+    Nodes use __slots__ and store their location as plain integers instead of a dictionary and a list. 
+    loc_ and range_ are passed to the constructor, and are created again from the integers when they are 
+    read. A released node (see node_release) only keeps the range_ integers. Its line and index can still be
+    found with the range_ and the line starts of the source file, which is what error messages use.
+    Internal code reads the integers directly, loc_ and range_ are meant for jsonify and for printing nodes
+
     Methods
     -------
     jsonify(spaces=4)
         returns a json like string to print out the node into a json format.
     """
-    loc_: Dict[str, Dict[str,int]]
-    range_: List[int]
+    loc_: InitVar[Optional[Dict[str, Dict[str,int]]]]
+    range_: InitVar[List[int]]
+    range_start : int = field(init=False, repr=False)
+    range_end   : int = field(init=False, repr=False)
+    start_line  : Optional[int] = field(init=False, repr=False)
+    start_index : Optional[int] = field(init=False, repr=False)
+    end_line    : Optional[int] = field(init=False, repr=False)
+    end_index   : Optional[int] = field(init=False, repr=False)
+
+    def __post_init__(self, loc_: Optional[Dict[str, Dict[str,int]]], range_: List[int]):
+        set_attribute = object.__setattr__
+        set_attribute(self, "range_start", range_[0])
+        set_attribute(self, "range_end", range_[1])
+        if loc_ is None:
+            start_line = start_index = end_line = end_index = None
+        else:
+            start, end = loc_["start"], loc_["end"]
+            start_line, start_index, end_line, end_index = start["line"], start["index"], end["line"], end["index"]
+        set_attribute(self, "start_line", start_line)
+        set_attribute(self, "start_index", start_index)
+        set_attribute(self, "end_line", end_line)
+        set_attribute(self, "end_index", end_index)
+
+    def __repr__(self):
+        values = [f"loc_={self.loc_!r}", f"range_={self.range_!r}"]
+        values += [f"{node_field.name}={getattr(self, node_field.name)!r}" for node_field in fields(self) if node_field.init and node_field.repr]
+        return f"{self.__class__.__qualname__}({', '.join(values)})"
     
     def jsonify(self, spaces=4):
         returnstring = ""
@@ -43,8 +76,16 @@ class Node:
         returnstring += spaces*" " + "\"range_\":" + json.dumps(self.range_) + ",\n" 
         return returnstring
 
+# loc_ and range_ are InitVars of the constructor, the properties are added after the dataclass has been created
+# so the dataclass does not mistake them for default values
+Node.loc_ = property(lambda self: None if self.start_line is None else {
+    "start" : {"line": self.start_line, "index": self.start_index}, 
+    "end"   : {"line": self.end_line, "index": self.end_index}
+})
+Node.range_ = property(lambda self: [self.range_start, self.range_end])
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class Program(Node):
     """
     Program Node class
@@ -65,7 +106,7 @@ class Program(Node):
     
     def jsonify(self, spaces=0):
         returnstring = "{\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
+        returnstring += Node.jsonify(self, spaces=spaces+4)
         returnstring += (spaces+4)*" " + "\"body_\":{"+"\n"
         for i in range(len(self.body_)):
             returnstring += (spaces+8)*" " 
@@ -78,7 +119,7 @@ class Program(Node):
         return returnstring
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class Identifier(Node):
     """
     Identifier Node class
@@ -99,13 +140,13 @@ class Identifier(Node):
     
     def jsonify(self, spaces=0):
         returnstring = "\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
+        returnstring += Node.jsonify(self, spaces=spaces+4)
         returnstring += (spaces+4)*" " + "\"name_\":\"" + str(self.name_) + "\"\n"
         returnstring += spaces*" " + "}"
         return returnstring
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class BlockStatement(Node):
     """
     Blockstatement Node class
@@ -126,7 +167,7 @@ class BlockStatement(Node):
     
     def jsonify(self, spaces=0):
         returnstring = "\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
+        returnstring += Node.jsonify(self, spaces=spaces+4)
         returnstring += (spaces+4)*" " + "\"body_\":{" + "\n"
         for i in range(len(self.body_)):
             returnstring += (spaces+8)*" " 
@@ -139,7 +180,73 @@ class BlockStatement(Node):
         return returnstring
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
+class LazyBlockStatement(Node):
+    """
+    LazyBlockStatement Node class
+        Inherits from Node class. Takes the place of the BlockStatement of a function body that has not been parsed
+        yet. The body is parsed the first time the function is called
+    ...
+
+    Attributes
+    ----------
+    tokens_ : Sequence[Token]
+        The tokens the function body is parsed from. These are the tokens of the whole program, like the TokenStream
+        the program was parsed from, so skipping a function body does not create a Token for every token of the body
+    start_ : int
+        The index in the tokens of the program of the first token of the function body
+    end_ : int
+        The index in the tokens of the program of the function declaration end token after the function body
+    parsed_ : List[BlockStatement]
+        Contains the BlockStatement of the function body once it has been parsed
+    tokens_start : Optional[int]
+        The index in tokens_ of the first token of the function body. None when tokens_ are the tokens of the whole 
+        program, then the body starts at start_
+
+    Notes
+    -----
+    A pickled LazyBlockStatement only keeps the tokens of the function body, followed by the function declaration 
+    end token, so a cached program does not contain the tokens of the whole program for every lazy function body
+
+    Methods
+    -------
+    jsonify(spaces=4)
+        returns a json like string to print out the node into a json format.
+    """
+    tokens_: Sequence[Token] = field(repr=False, compare=False)
+    start_: int
+    end_: int
+    parsed_: List[BlockStatement] = field(default_factory=list, repr=False, compare=False)
+    tokens_start: Optional[int] = field(default=None, repr=False, compare=False)
+
+    # The return symbols of a call are deepcopied together with the function declarations they contain. A copy
+    # would lose the parsed body in parsed_, and would copy the tokens of the body through __reduce__
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        index = self.start_ if self.tokens_start is None else self.tokens_start
+        return lazy_block_statement_load, (
+            self.loc_, self.range_, list(self.tokens_[index:index + self.end_ - self.start_ + 1]), self.start_, self.end_, self.parsed_
+        )
+    
+    def jsonify(self, spaces=0):
+        returnstring = "\"" + self.__class__.__name__ + "\":{\n"
+        returnstring += Node.jsonify(self, spaces=spaces+4)
+        returnstring += (spaces+4)*" " + "\"tokens_\":" + json.dumps([self.start_, self.end_]) + "\n"
+        returnstring += spaces*" " + "}"
+        return returnstring
+
+
+def lazy_block_statement_load(
+    loc_: Optional[Dict[str, Dict[str,int]]], range_: List[int], tokens: List[Token], start_: int, end_: int, parsed_: List[BlockStatement]
+) -> LazyBlockStatement:
+    """Function creates a LazyBlockStatement of which tokens_ only contains the tokens of the function body, 
+    used to load a pickled LazyBlockStatement"""
+    return LazyBlockStatement(loc_=loc_, range_=range_, tokens_=tokens, start_=start_, end_=end_, parsed_=parsed_, tokens_start=0)
+
+
+@dataclass(frozen=True, slots=True, repr=False)
 class FunctionDeclaration(Node):
     """
     FunctionDeclaration Node class
@@ -153,7 +260,8 @@ class FunctionDeclaration(Node):
     params_: List[Identifier]
         A list of identifiers that make up the function parameters
     body_ : Blockstatement
-        A Blockstatement node which contains the body of the function
+        A Blockstatement node which contains the body of the function. Is a LazyBlockStatement when
+        the body of the function has not been parsed yet
 
     Methods
     -------
@@ -167,7 +275,7 @@ class FunctionDeclaration(Node):
     
     def jsonify(self, spaces=0):
         returnstring = "\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
+        returnstring += Node.jsonify(self, spaces=spaces+4)
         returnstring += (spaces+4)*" " + "\"id_\":\"" + str(self.id_) + "\",\n"
         returnstring += (spaces+4)*" " + "\"params_\":{" + "\n"
         for i in range(len(self.params_)):
@@ -184,7 +292,7 @@ class FunctionDeclaration(Node):
         return returnstring    
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class Literal(Node):
     """
     Literal Node class
@@ -208,14 +316,14 @@ class Literal(Node):
     
     def jsonify(self, spaces=0):
         returnstring = "\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
-        returnstring += (spaces+4)*" " + "\"value_\":" + str(self.value_) + ",\n"
+        returnstring += Node.jsonify(self, spaces=spaces+4)
+        returnstring += (spaces+4)*" " + "\"value_\":" + (json.dumps(self.value_) if type(self.value_) is bool else str(self.value_)) + ",\n"
         returnstring += (spaces+4)*" " + "\"raw_\":" + str(self.raw_) + "\n"
         returnstring += spaces*" " + "}"
         return returnstring
     
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class IfStatement(Node):
     """
     IfStatement Node class
@@ -242,7 +350,7 @@ class IfStatement(Node):
 
     def jsonify(self, spaces=0):
         returnstring = "\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
+        returnstring += Node.jsonify(self, spaces=spaces+4)
         returnstring += (spaces+4)*" " + "\"test_\":{\n"
         returnstring += (spaces+8)*" " + self.test_.jsonify(spaces=spaces+8) + "\n"
         returnstring += (spaces+4)*" " + "},\n"
@@ -256,7 +364,7 @@ class IfStatement(Node):
         return returnstring
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class ReturnStatement(Node):
     """
     ReturnStatement Node class
@@ -277,7 +385,7 @@ class ReturnStatement(Node):
 
     def jsonify(self, spaces=0):
         returnstring = "\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
+        returnstring += Node.jsonify(self, spaces=spaces+4)
         returnstring += (spaces+4)*" " + "\"argument_\":{\n" 
         returnstring += (spaces+8)*" " + self.argument_.jsonify(spaces=spaces+8) + "\n"
         returnstring += (spaces+4)*" " + "}\n" 
@@ -285,7 +393,7 @@ class ReturnStatement(Node):
         return returnstring
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class ExpressionStatement(Node):
     """
     ExpressionStatement Node class
@@ -306,13 +414,13 @@ class ExpressionStatement(Node):
     
     def jsonify(self, spaces=0):
         returnstring = "\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
+        returnstring += Node.jsonify(self, spaces=spaces+4)
         returnstring += (spaces+4)*" " + "\"expression_\":" + self.expression_.jsonify(spaces=spaces+4) + "\n"
         returnstring += spaces*" " + "}"
         return returnstring
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class CallExpression(Node):
     """
     CallExpression Node class
@@ -336,7 +444,7 @@ class CallExpression(Node):
     
     def jsonify(self, spaces=0):
         returnstring = "\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
+        returnstring += Node.jsonify(self, spaces=spaces+4)
         returnstring += (spaces+4)*" " + "\"arguments_\":{" + "\n"
         for i in range(len(self.arguments_)):
             returnstring += (spaces+8)*" " 
@@ -352,7 +460,7 @@ class CallExpression(Node):
         return returnstring
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class UnaryExpression(Node):
     """
     UnaryExpression Node class
@@ -376,7 +484,7 @@ class UnaryExpression(Node):
 
     def jsonify(self, spaces=0):
         returnstring = "\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
+        returnstring += Node.jsonify(self, spaces=spaces+4)
         returnstring += (spaces+4)*" " + "\"operator_\":\"" + str(self.operator_) + "\",\n"
         returnstring += (spaces+4)*" " + "\"argument_\": {\n"
         returnstring += (spaces+8)*" " + self.argument_.jsonify(spaces=spaces+8) + "\n"
@@ -385,7 +493,7 @@ class UnaryExpression(Node):
         return returnstring
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class VariableDeclaration(Node):
     """
     VariableDeclaration Node class
@@ -409,7 +517,7 @@ class VariableDeclaration(Node):
     
     def jsonify(self, spaces=0):
         returnstring = "\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
+        returnstring += Node.jsonify(self, spaces=spaces+4)
         returnstring += (spaces+4)*" " + "\"id_\":\"" + str(self.id_) + "\",\n"
         returnstring += (spaces+4)*" " + "\"init_\": {\n"
         returnstring += (spaces+8)*" " + self.init_.jsonify(spaces=spaces+8) + "\n"
@@ -418,7 +526,7 @@ class VariableDeclaration(Node):
         return returnstring
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, repr=False)
 class BinaryExpression(Node):
     """
     BinaryExpression Node class
@@ -445,7 +553,7 @@ class BinaryExpression(Node):
     
     def jsonify(self, spaces=0):
         returnstring = "\"" + self.__class__.__name__ + "\":{\n"
-        returnstring += super().jsonify(spaces=spaces+4)
+        returnstring += Node.jsonify(self, spaces=spaces+4)
         returnstring += (spaces+4)*" " + "\"operator_\":\"" + str(self.operator_) + "\",\n"
         returnstring += (spaces+4)*" " + "\"left_\":{\n"
         returnstring += (spaces+8)*" " + self.left_.jsonify(spaces=spaces+8) + "\n"
@@ -454,4 +562,112 @@ class BinaryExpression(Node):
         returnstring += (spaces+8)*" " + self.right_.jsonify(spaces=spaces+8) + "\n"
         returnstring += (spaces+4)*" " +"}\n"
         returnstring += spaces*" " + "}"
-        return returnstring
\ No newline at end of file
+        return returnstring
+
+def node_located(node_type: type, start_line: Optional[int], start_index: Optional[int], end_line: Optional[int], end_index: Optional[int],
+                 range_start: int, range_end: int, **values) -> Node:
+    """Function creates a node from the integers of its location, without creating a loc_ dictionary for it
+
+    Args:
+        node_type           : The type of the node that needs to be created
+        start_line          : The line where the node starts, None for a released node
+        start_index         : The index in the line where the node starts, None for a released node
+        end_line            : The line where the node ends, None for a released node
+        end_index           : The index in the line where the node ends, None for a released node
+        range_start         : The index in the characters of the source file where the node starts
+        range_end           : The index in the characters of the source file where the node ends
+        values              : The other fields of the node
+
+    Returns:
+        A node which is equal to node_type(loc_=..., range_=[range_start, range_end], **values)
+    """
+    node            = node_type(loc_=None, range_=(range_start, range_end), **values)
+    set_attribute   = object.__setattr__
+    set_attribute(node, "start_line", start_line)
+    set_attribute(node, "start_index", start_index)
+    set_attribute(node, "end_line", end_line)
+    set_attribute(node, "end_index", end_index)
+    return node
+
+
+def node_span(node_type: type, first: Union[Node, Token], last: Union[Node, Token], **values) -> Node:
+    """Function creates a node which starts where first starts and ends where last ends. The location of a node
+    is read from its integers, the location of a token from its loc_ and range_
+
+    Args:
+        node_type           : The type of the node that needs to be created
+        first               : The node or token the node starts with
+        last                : The node or token the node ends with
+        values              : The other fields of the node
+
+    Returns:
+        A node of node_type which spans first and last
+    """
+    if isinstance(first, Node):
+        start_line, start_index, range_start = first.start_line, first.start_index, first.range_start
+    else:
+        start = first.loc_["start"]
+        start_line, start_index, range_start = start["line"], start["index"], first.range_[0]
+    if isinstance(last, Node):
+        end_line, end_index, range_end = last.end_line, last.end_index, last.range_end
+    else:
+        end = last.loc_["end"]
+        end_line, end_index, range_end = end["line"], end["index"], last.range_[1]
+    return node_located(node_type, start_line, start_index, end_line, end_index, range_start, range_end, **values)
+
+
+def node_release(node: Node) -> Node:
+    """Function creates a copy of a node, and all nodes it contains, without its line and index. Only the range_
+    of the nodes is kept, which is enough to find the line and index of an error in the source file. The bodies of 
+    lazy function bodies are released when they have been parsed already
+
+    Args:
+        node                : The node that needs to be released
+
+    Returns:
+        A node which is equal to node, except that its loc_ is None
+    """
+    values = {"loc_": None, "range_": (node.range_start, node.range_end)}
+    for name in node_child_names(type(node)):
+        value = getattr(node, name)
+        if isinstance(value, Node):
+            value = node_release(value)
+        elif isinstance(value, list):
+            value = [node_release(item) if isinstance(item, Node) else item for item in value]
+        values[name] = value
+    return type(node)(**values)
+
+
+def node_map_children(node: Node, function: Callable[[Node], Node]) -> Node:
+    """Function creates a copy of a node in which every node it contains directly has been replaced by the result of 
+    function. The node itself is returned when function returns the same node for all of them
+
+    Args:
+        node                : The node of which the children are replaced
+        function            : A function which returns the node that replaces a child node
+
+    Returns:
+        A node which contains the nodes returned by function
+    """
+    values, changed = {}, False
+    for name in node_child_names(type(node)):
+        value = getattr(node, name)
+        if isinstance(value, Node):
+            mapped  = function(value)
+            changed = changed or mapped is not value
+        elif isinstance(value, list):
+            mapped  = [function(item) if isinstance(item, Node) else item for item in value]
+            changed = changed or any(new is not old for new, old in zip(mapped, value))
+        else:
+            mapped  = value
+        values[name] = mapped
+    return node_span(type(node), node, node, **values) if changed else node
+
+
+node_child_names_cache = {}
+
+def node_child_names(node_type: type) -> List[str]:
+    """Function returns the names of the fields of a node type which are passed to its constructor, except for loc_ and range_"""
+    if node_type not in node_child_names_cache:
+        node_child_names_cache[node_type] = [node_field.name for node_field in fields(node_type) if node_field.init]
+    return node_child_names_cache[node_type]
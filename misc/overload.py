@@ -6,18 +6,25 @@
 @date 11-05-2021
 """
 from collections import defaultdict
+from itertools import product
 
 def determine_types(args, kwargs):
     """Function is used to determine the signature of the function called based on the parameters given"""
     return tuple([type(a) for a in args]), \
            tuple([(k, type(v)) for k,v in kwargs.items()])
 
+def expand_types(arg_types):
+    """Function expands a signature in which a parameter is given a tuple of types into every possible signature"""
+    return product(*[t if isinstance(t, tuple) else (t,) for t in arg_types])
+
 function_table = defaultdict(dict)
 def overload(arg_types=(), kwarg_types=()):
-    """Overload wrapper. Used to overload a function with the same name, but with different parameter types"""
+    """Overload wrapper. Used to overload a function with the same name, but with different parameter types.
+    A parameter can be given a tuple of types, the function is then registered for every one of those types"""
     def wrap(func):
         named_func = function_table[func.__name__]
-        named_func[arg_types, kwarg_types] = func
+        for signature in expand_types(arg_types):
+            named_func[signature, kwarg_types] = func
         def call_function_by_signature(*args, **kwargs):
             return named_func[determine_types(args, kwargs)](*args, **kwargs)
         return call_function_by_signature
@@ -0,0 +1,124 @@
+"""
+@file program_cache.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains functions to store parsed programs in a cache directory and load them again
+@version 0.1
+@date 18-10-2026
+"""
+
+import os
+import sys
+import pickle
+import hashlib
+import tempfile
+
+from typing import Any, Optional, Union
+
+# The version of the lexer, parser and interpreter. Change it when the nodes that are created by the parser change,
+# cache entries of other versions are then never loaded again
+interpreter_version = "1.2"
+
+cache_directory_name    = "__altucache__"
+cache_file_extension    = ".altuc"
+max_cache_size          = 64 * 1024 * 1024
+
+
+def program_cache_directory(source_path: str) -> str:
+    """Function returns the cache directory of a source file. Like __pycache__, it is placed next to the source file"""
+    return os.path.join(os.path.dirname(os.path.abspath(source_path)), cache_directory_name)
+
+def program_cache_key(source: Union[bytes, memoryview], variant: str="") -> str:
+    """Function creates the key of a cache entry. The key is the hash of the source together with the interpreter
+    version, the python version and a variant which tells how the program was created (like the command line flags)
+
+    Args:
+        source              : The bytes of the source file
+        variant             : A string which differs between different ways of creating a program from the same source, default=""
+
+    Returns:
+        A string which can be used as file name of the cache entry
+    """
+    source_hash = hashlib.sha256(source).hexdigest()
+    version     = f"{interpreter_version}-py{sys.version_info.major}{sys.version_info.minor}" + (f"-{variant}" if variant else "")
+    return f"{source_hash}.{version}"
+
+def program_cache_load(cache_directory: str, key: str) -> Optional[Any]:
+    """Function loads the program of a cache entry. An entry that can not be read, or was written for another key,
+    is removed from the cache. The modification time of a loaded entry is updated, which marks it as recently used
+
+    Args:
+        cache_directory     : The directory containing the cache entries
+        key                 : The key of the cache entry, created by program_cache_key
+
+    Returns:
+        If the cache contains a valid entry for the key:
+            The cached program
+        Otherwise:
+            None
+    """
+    path = os.path.join(cache_directory, key + cache_file_extension)
+    try:
+        with open(path, 'rb') as f:
+            stored_key, program = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        stored_key = None
+
+    if stored_key != key:
+        program_cache_remove(path)
+        return None
+
+    try: os.utime(path)
+    except OSError: pass
+    return program
+
+def program_cache_store(cache_directory: str, key: str, program: Any, max_size: int=max_cache_size) -> bool:
+    """Function stores a program in the cache. The entry is written to a temporary file first and then moved to its
+    place, so another process never loads a half written entry. After storing, the least recently used entries are
+    removed until the cache is no larger than max_size
+
+    Args:
+        cache_directory     : The directory containing the cache entries
+        key                 : The key of the cache entry, created by program_cache_key
+        program             : The program that needs to be stored
+        max_size            : The maximum amount of bytes all cache entries can use together, default=max_cache_size
+
+    Returns:
+        True if the program was stored, False if the cache directory could not be written
+    """
+    temporary_path = None
+    try:
+        os.makedirs(cache_directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=cache_directory, suffix=".tmp")
+        with os.fdopen(file_descriptor, 'wb') as f:
+            pickle.dump((key, program), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, os.path.join(cache_directory, key + cache_file_extension))
+    except (OSError, pickle.PicklingError, RecursionError):
+        if temporary_path: program_cache_remove(temporary_path)
+        return False
+
+    program_cache_evict(cache_directory, max_size, keep=key)
+    return True
+
+def program_cache_evict(cache_directory: str, max_size: int=max_cache_size, keep: Optional[str]=None) -> None:
+    """Function removes the least recently used cache entries until the size of all entries is no more than max_size.
+    The entry of the key given by keep is never removed"""
+    entries = []
+    for name in os.listdir(cache_directory):
+        if name.endswith(cache_file_extension):
+            try: stat = os.stat(os.path.join(cache_directory, name))
+            except OSError: continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    size = sum(entry_size for _, entry_size, _ in entries)
+    for _, entry_size, name in sorted(entries):
+        if size <= max_size:
+            break
+        if name != f"{keep}{cache_file_extension}":
+            program_cache_remove(os.path.join(cache_directory, name))
+            size -= entry_size
+
+def program_cache_remove(path: str) -> None:
+    try: os.remove(path)
+    except OSError: pass
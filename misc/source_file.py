@@ -0,0 +1,132 @@
+"""
+@file source_file.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains the SourceFile object and functions to find locations in a SourceFile
+@version 0.1
+@date 18-10-2026
+"""
+
+from array import array
+from dataclasses import dataclass
+from mmap import mmap
+from typing import Tuple, Union
+try : from chunked_sequence import ChunkedSequence, chunked_sequence, chunked_sequence_replace, sequence_bisect_right
+except : from misc.chunked_sequence import ChunkedSequence, chunked_sequence, chunked_sequence_replace, sequence_bisect_right
+
+
+@dataclass(frozen=True)
+class SourceFile:
+    """
+    SourceFile class
+    ...
+
+    Attributes
+    ----------
+    characters : str, bytes, mmap or ChunkedSequence
+        The characters of the source file. When the source file is given as (memory mapped) bytes, all 
+        indices are byte offsets and the bytes are only decoded when a value or location is requested. An edited
+        source file stores its characters as a ChunkedSequence of strings
+    line_starts : array or ChunkedSequence
+        The index in characters of the first character of every line. Index 0 holds the start of line 1
+    """
+    characters  : Union[str, bytes, mmap, ChunkedSequence]
+    line_starts : Union[array, ChunkedSequence]
+
+    def __repr__(self) -> str:
+        return f"SourceFile(lines={len(self.line_starts)}, characters={len(self.characters)})"
+
+
+def source_file_from_characters(characters: Union[str, bytes, mmap]) -> SourceFile:
+    """Function creates a SourceFile by finding the start of every line in the provided characters
+
+    Args:
+        characters          : The characters of the source file. Bytes and mmaps are searched for b"\\n" without decoding them
+
+    Returns:
+        A SourceFile containing the characters and the index of the first character of every line
+    """
+    new_line    = "\n" if isinstance(characters, str) else b"\n"
+    line_starts = array('q', [0])
+    index       = characters.find(new_line)
+    while index != -1:
+        line_starts.append(index + 1)
+        index = characters.find(new_line, index + 1)
+    return SourceFile(characters=characters, line_starts=line_starts)
+
+def source_file_chunked(source_file: SourceFile) -> SourceFile:
+    """Function returns a SourceFile of which the characters and line starts are stored as ChunkedSequences. A
+    SourceFile that is already chunked is returned as it is"""
+    if isinstance(source_file.line_starts, ChunkedSequence):
+        return source_file
+    return SourceFile(
+        characters=chunked_sequence(source_file.characters, 4096),
+        line_starts=chunked_sequence(source_file.line_starts, moves=True)
+    )
+
+def source_file_replace(source_file: SourceFile, start: int, end: int, replacement: str) -> SourceFile:
+    """Function creates a SourceFile in which the characters between start and end are replaced. Only the line starts 
+    of the replaced characters are searched again, the line starts after the replacement are moved. The characters
+    and line starts are stored as ChunkedSequences, so only the chunks around the edit are copied
+
+    Args:
+        source_file         : The SourceFile in which characters are replaced
+        start               : The index of the first character that is replaced
+        end                 : The index after the last character that is replaced
+        replacement         : The characters that are placed between start and end
+
+    Returns:
+        A new SourceFile containing the replaced characters
+    """
+    source_file = source_file_chunked(source_file)
+    line_starts = source_file.line_starts
+    new_starts  = array('q')
+    index       = replacement.find("\n")
+    while index != -1:
+        new_starts.append(start + index + 1)
+        index = replacement.find("\n", index + 1)
+    line_starts = chunked_sequence_replace(
+        line_starts, sequence_bisect_right(line_starts, start), sequence_bisect_right(line_starts, end), 
+        new_starts, len(replacement) - (end - start)
+    )
+    characters  = chunked_sequence_replace(source_file.characters, start, end, replacement)
+    return SourceFile(characters=characters, line_starts=line_starts)
+
+def source_file_text(source_file: SourceFile, start: int, end: int) -> str:
+    """Function returns the characters between start and end as a string. Byte sources are decoded as utf-8"""
+    characters = source_file.characters[start:end]
+    return characters if isinstance(characters, str) else characters.decode("utf-8", "replace")
+
+def source_file_width(source_file: SourceFile, start: int, end: int) -> int:
+    """Function returns the amount of characters between start and end. Indices past the end of the source 
+    file (like the range_ of an EOF token) count as one character each"""
+    characters = source_file.characters
+    if isinstance(characters, str) or isinstance(characters, ChunkedSequence) and isinstance(characters.chunks[0], str):
+        return end - start
+    overflow = max(0, end - max(start, len(source_file.characters)))
+    return len(source_file_text(source_file, start, end)) + overflow
+
+def source_file_location(source_file: SourceFile, index: int) -> Tuple[int, int]:
+    """Function converts an index in the characters of a source file (like range_[0]) into a (line, line index) pair"""
+    line_no = sequence_bisect_right(source_file.line_starts, index)
+    return line_no, source_file_width(source_file, source_file.line_starts[line_no-1], index)
+
+def source_file_line(source_file: SourceFile, line_no: int) -> str:
+    """Function returns the characters of the given line without the newline character"""
+    start = source_file.line_starts[line_no-1]
+    end   = source_file.line_starts[line_no]-1 if line_no < len(source_file.line_starts) else len(source_file.characters)
+    return source_file_text(source_file, start, end)
+
+
+last_source_file, last_source_length = None, 0
+
+def get_source_file(characters: Union[str, bytes, SourceFile]) -> SourceFile:
+    """Function returns a SourceFile for the provided characters. The SourceFile of the last characters that
+    were used is kept, so the line table of a file is only built once no matter how many locations are requested.
+    The kept SourceFile is only used for the same characters object with the same length, a mmap which has been 
+    resized gets a new line table"""
+    global last_source_file, last_source_length
+    if isinstance(characters, SourceFile):
+        return characters
+    if last_source_file is None or last_source_file.characters is not characters or last_source_length != len(characters):
+        last_source_file, last_source_length = source_file_from_characters(characters), len(characters)
+    return last_source_file
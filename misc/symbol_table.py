@@ -37,6 +37,25 @@ class SymbolTable:
     return_symbols      : List[Any]
     return_stop         : bool
 
+@dataclass(frozen=True)
+class TailCall:
+    """
+    TailCall class
+        The return symbol of a function whose return statement returns the result of a call. The call is
+        interpreted by the caller of the function after the function has returned, so it does not need a
+        deeper Python stack
+    ...
+
+    Attributes
+    ----------
+    function : Node
+        The FunctionDeclaration that needs to be called
+    arguments : List[Any]
+        The values of the arguments of the call
+    """
+    function    : Node
+    arguments   : List[Any]
+
 def symbol_table_symbol_exists(symbol_table: SymbolTable, name: str):
     return True if symbol_table.symbols.get(name) else False
 
@@ -0,0 +1,85 @@
+"""
+@file token_buffer.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains the TokenBuffer object, which reads tokens from an iterator when the parser needs them
+@version 0.1
+@date 18-10-2026
+"""
+
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Union
+try : from token_types import *
+except : from misc.token_types import *
+
+
+@dataclass(frozen=False)
+class TokenBuffer:
+    """
+    TokenBuffer class
+        A sequence of tokens which are read from an iterator, like the output of lex_iter, when they are indexed.
+        The tokens that have been parsed can be released, so only the tokens of the statement that is being parsed
+        are kept in memory
+    ...
+
+    Attributes
+    ----------
+    tokens : Iterator[Token]
+        The iterator the tokens are read from
+    buffer : List[Token]
+        The tokens that have been read and have not been released
+    offset : int
+        The index of the first token in buffer. All tokens before offset have been released
+    exhausted : bool
+        True when all tokens of the iterator have been read
+
+    Notes
+    -----
+    The length of a TokenBuffer is the amount of tokens that have been read, plus one when the iterator may contain
+    more tokens. A TokenCursor is therefore only at the end of a TokenBuffer when all tokens have been read.
+    A slice reads the tokens before its stop, and all tokens when it has no stop or a negative start or stop. It 
+    raises an IndexError when it contains released tokens
+    """
+    tokens      : Iterator[Token]
+    buffer      : List[Token] = field(default_factory=list)
+    offset      : int = 0
+    exhausted   : bool = False
+
+    def __len__(self) -> int:
+        return self.offset + len(self.buffer) + (0 if self.exhausted else 1)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Token, List[Token]]:
+        if isinstance(index, slice):
+            start, stop = index.start or 0, index.stop
+            token_buffer_read(self, None if stop is None or stop < 0 or start < 0 else stop)
+            indexes = range(*index.indices(self.offset + len(self.buffer)))
+            if indexes and min(indexes[0], indexes[-1]) < self.offset:
+                raise IndexError(f"token {min(indexes[0], indexes[-1])} has been released")
+            return [self.buffer[token_index - self.offset] for token_index in indexes]
+        if index < self.offset:
+            raise IndexError(f"token {index} has been released")
+        while index - self.offset >= len(self.buffer):
+            token = next(self.tokens, None)
+            if token is None:
+                self.exhausted = True
+                raise IndexError(f"token {index} does not exist")
+            self.buffer.append(token)
+        return self.buffer[index - self.offset]
+
+
+def token_buffer_read(token_buffer: TokenBuffer, stop: Optional[int]) -> TokenBuffer:
+    """Function reads tokens from the iterator until the tokens before stop have been read, or until all tokens have 
+    been read when stop is None"""
+    while not token_buffer.exhausted and (stop is None or token_buffer.offset + len(token_buffer.buffer) < stop):
+        token = next(token_buffer.tokens, None)
+        if token is None:
+            token_buffer.exhausted = True
+        else:
+            token_buffer.buffer.append(token)
+    return token_buffer
+
+
+def token_buffer_release(token_buffer: TokenBuffer, index: int) -> TokenBuffer:
+    """Function releases all tokens before index, they can not be indexed anymore"""
+    del token_buffer.buffer[:index - token_buffer.offset]
+    token_buffer.offset = index
+    return token_buffer
@@ -0,0 +1,57 @@
+"""
+@file token_cursor.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains the TokenCursor object and functions to move a TokenCursor through its tokens
+@version 0.1
+@date 18-10-2026
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, List, Sequence
+try : from token_types import *
+except : from misc.token_types import *
+
+
+@dataclass(frozen=False)
+class TokenCursor:
+    """
+    TokenCursor class
+        A position in a sequence of tokens. One TokenCursor is shared by all parser functions, every
+        parser function moves the cursor past the tokens it has parsed instead of returning the leftover tokens
+    ...
+
+    Attributes
+    ----------
+    tokens : Sequence[Token]
+        The tokens that are being parsed
+    index : int
+        The index in tokens of the next token that needs to be parsed
+    lazy_function_bodies : bool
+        When True, function bodies are not parsed but skipped until the function is called
+    """
+    tokens  : Sequence[Token]
+    index   : int = 0
+    lazy_function_bodies : bool = False
+
+def token_sequence(tokens: Iterable[Token]) -> Sequence[Token]:
+    """Function returns tokens as a sequence that a TokenCursor can index. Lists and other sequences, like a TokenStream, 
+    are used as they are. Only iterators, like the output of tokenize or lex_iter, are read into a list"""
+    return tokens if hasattr(tokens, "__getitem__") and hasattr(tokens, "__len__") else list(tokens)
+
+def cursor_at_end(cursor: TokenCursor) -> bool:
+    return cursor.index >= len(cursor.tokens)
+
+# The last token of the tokens is the EOF token. A cursor that has been moved past it keeps returning the EOF token,
+# so a parser function that expects more tokens at the end of a file raises a syntax error instead of an IndexError
+def cursor_peek(cursor: TokenCursor) -> Token:
+    try     : return cursor.tokens[cursor.index]
+    except IndexError: return cursor.tokens[len(cursor.tokens) - 1]
+
+def cursor_next(cursor: TokenCursor) -> Token:
+    try     : token = cursor.tokens[cursor.index]
+    except IndexError: return cursor.tokens[len(cursor.tokens) - 1]
+    cursor.index += 1
+    return token
+
+def cursor_remaining(cursor: TokenCursor) -> List[Token]:
+    return cursor.tokens[cursor.index:]
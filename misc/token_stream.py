@@ -0,0 +1,106 @@
+"""
+@file token_stream.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains the TokenStream object, a compact representation of a list of tokens
+@version 0.1
+@date 18-10-2026
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterator, Union
+try : from token_types import *
+except : from misc.token_types import *
+try : from source_file import SourceFile, source_file_location, source_file_text, source_file_chunked
+except : from misc.source_file import SourceFile, source_file_location, source_file_text, source_file_chunked
+try : from chunked_sequence import ChunkedSequence, chunked_sequence, sequence_bisect_left
+except : from misc.chunked_sequence import ChunkedSequence, chunked_sequence, sequence_bisect_left
+
+
+token_types_by_value = {tokentype.value: tokentype for tokentype in TokenTypes}
+
+
+@dataclass(frozen=False)
+class TokenStream:
+    """
+    TokenStream class
+        A list of tokens stored as columns of plain integers instead of Token objects
+    ...
+
+    Attributes
+    ----------
+    source_file : SourceFile
+        The source file that has been lexed. Token values are sliced from its characters and token
+        locations are looked up in its line table when they are needed
+    tokentypes : array or ChunkedSequence
+        The value of the TokenTypes of every token
+    starts : array or ChunkedSequence
+        The index in characters where every token starts (range_[0])
+    ends : array or ChunkedSequence
+        The index in characters where every token ends (range_[1])
+
+    Notes
+    -----
+    Indexing a TokenStream returns a Token which is created from the columns when it is requested. Slicing a
+    TokenStream returns a TokenStream which shares the columns with the original stream.
+    The line and line index of a token are not stored in columns. They are looked up in the line starts of the 
+    source_file with the start of the token, so a token costs three integers and one byte.
+    lex_stream stores the columns as arrays. relex stores them as ChunkedSequences, so an edit only copies the 
+    chunks around the edit and moves the tokens after the edit without copying them
+    """
+    source_file : SourceFile
+    tokentypes  : Union[array, memoryview, ChunkedSequence] = field(default_factory=lambda: array('B'))
+    starts      : Union[array, memoryview, ChunkedSequence] = field(default_factory=lambda: array('q'))
+    ends        : Union[array, memoryview, ChunkedSequence] = field(default_factory=lambda: array('q'))
+
+    def __len__(self) -> int:
+        return len(self.tokentypes)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Token, 'TokenStream']:
+        if isinstance(index, slice):
+            return TokenStream(
+                self.source_file,
+                *[column[index] if isinstance(column, ChunkedSequence) else memoryview(column)[index] 
+                  for column in (self.tokentypes, self.starts, self.ends)]
+            )
+        return token_stream_get(self, index)
+
+    def __iter__(self) -> Iterator[Token]:
+        return map(self.__getitem__, range(len(self)))
+
+
+def token_stream_append(token_stream: TokenStream, tokentype: TokenTypes, start: int, end: int) -> TokenStream:
+    token_stream.tokentypes.append(tokentype.value)
+    token_stream.starts.append(start)
+    token_stream.ends.append(end)
+    return token_stream
+
+def token_stream_chunked(token_stream: TokenStream) -> TokenStream:
+    """Function returns a TokenStream of which the columns and source file are stored as ChunkedSequences. A
+    TokenStream that is already chunked is returned as it is"""
+    if isinstance(token_stream.starts, ChunkedSequence):
+        return token_stream
+    return TokenStream(
+        source_file_chunked(token_stream.source_file),
+        chunked_sequence(token_stream.tokentypes),
+        chunked_sequence(token_stream.starts, moves=True),
+        chunked_sequence(token_stream.ends, moves=True)
+    )
+
+def token_stream_find(token_stream: TokenStream, start: int, low: int=0) -> int:
+    """Function returns the index of the first token from low onwards which starts at or after start, like bisect_left
+    on the starts of the tokens. Returns the length of the TokenStream when there is no such token"""
+    return sequence_bisect_left(token_stream.starts, start, low)
+
+def token_stream_get(token_stream: TokenStream, index: int) -> Token:
+    tokentype   = token_types_by_value[token_stream.tokentypes[index]]
+    start, end  = token_stream.starts[index], token_stream.ends[index]
+    line, column= source_file_location(token_stream.source_file, start)
+    value       = "\00" if tokentype == TokenTypes.EOF else source_file_text(token_stream.source_file, start, end)
+    width       = end - start if tokentype == TokenTypes.EOF else len(value)
+    return Token(
+        loc_={"start":{"line": line, "index": column}, "end":{"line": line, "index": column + width}},
+        range_=[start, end],
+        value_=value,
+        tokentype_=tokentype
+    )
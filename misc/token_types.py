@@ -47,6 +47,10 @@ class TokenTypes(Enum):
     IF_STATEMENT_END = 34
     FUNCTION_DECLARATION_END = 35
 
+    # Members of an Enum are only equal to themselves, so they can be hashed by identity. This is a lot 
+    # faster than the default Enum hash, which hashes the name of the member in python code
+    __hash__ = object.__hash__
+
 TokenExpressions = [
     (r"[\r]?[\n]",                  TokenTypes.NEW_LINE),
     (r"([ ][ ][ ][ ])",             TokenTypes.TAB),
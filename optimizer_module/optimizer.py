@@ -0,0 +1,237 @@
+"""
+@file optimizer.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains optimisation passes which simplify a parsed program before it is interpreted
+@version 0.1
+@date 18-10-2026
+"""
+
+import sys
+import os
+import math
+import operator
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+from misc.token_types import *
+from misc.node_types import *
+from misc.node_json import json_number
+
+
+# The operations of binary expressions, which do the same as interpret_BinaryExpression
+binary_operations: Dict[TokenTypes, Callable[[Any, Any], Any]] = {
+    TokenTypes.PLUS         : operator.add,
+    TokenTypes.MINUS        : operator.sub,
+    TokenTypes.DIVIDE       : operator.truediv,
+    TokenTypes.MULTIPLY     : operator.mul,
+    TokenTypes.POWER        : operator.pow,
+    TokenTypes.IS_EQUAL     : operator.eq,
+    TokenTypes.GREATER_THAN : operator.gt,
+    TokenTypes.SMALLER_THAN : operator.lt,
+    TokenTypes.AND          : lambda left, right: left and right,
+    TokenTypes.OR           : lambda left, right: left or right
+}
+
+# Powers of integers are not folded when the result has more bits than this, so a program like 9 ^ 9 ^ 9 does not
+# spend its time and memory on the optimisation of an expression that might never be interpreted
+max_folded_power_bits = 4096
+
+
+def fold_constants(node: Node) -> Node:
+    """Function folds the binary and unary expressions of which all operands are literals into a single literal.
+    The literal has the location and range of the expression it replaces. Expressions which raise an error, like a
+    division by zero, are not folded, so the error is raised when the expression is interpreted. Lazy function
+    bodies are not folded
+
+    Args:
+        node                : The node that needs to be folded, usually a Program
+
+    Returns:
+        A node in which all constant expressions have been folded. Nodes which do not contain constant expressions
+        are returned as they are
+    """
+    # The nodes are folded from the leaves up with a stack instead of recursion, so a long chain of expressions
+    # like 1 + 1 + ... + 1 does not raise a RecursionError
+    folded, pending = {}, [(node, False)]
+    while pending:
+        current, children_folded = pending.pop()
+        if type(current) is LazyBlockStatement:
+            folded[id(current)] = current
+        elif children_folded:
+            folded[id(current)] = fold_constant_expression(node_map_children(current, lambda child: folded[id(child)]))
+        else:
+            pending.append((current, True))
+            for name in node_child_names(type(current)):
+                value = getattr(current, name)
+                if isinstance(value, Node):
+                    pending.append((value, False))
+                elif isinstance(value, list):
+                    pending += [(item, False) for item in value if isinstance(item, Node)]
+    return folded[id(node)]
+
+def fold_constant_expression(node: Node) -> Node:
+    """Function folds a binary or unary expression of which all operands are literals into a single literal. The
+    raw_ of the literal is written like a json number, like the raw_ of a parsed literal. Other nodes, and results
+    which can not be written as a json number or bool, are returned as they are"""
+    if type(node) is BinaryExpression and type(node.left_) is Literal and type(node.right_) is Literal:
+        operation   = binary_operations.get(node.operator_)
+        operands    = (node.left_.value_, node.right_.value_)
+    elif type(node) is UnaryExpression and type(node.argument_) is Literal:
+        operation   = (lambda number: number * -1) if node.operator_ == TokenTypes.MINUS else (lambda number: number)
+        operands    = (node.argument_.value_,)
+    else:
+        return node
+
+    if operation is None or (operation is operator.pow and not power_is_small(*operands)):
+        return node
+    try:
+        value = operation(*operands)
+    except ArithmeticError:
+        return node
+    if type(value) not in (int, float, bool) or (type(value) is float and not math.isfinite(value)):
+        return node
+    return node_span(Literal, node, node, value_=value, raw_=json_number(value))
+
+def power_is_small(base: Any, exponent: Any) -> bool:
+    """Function returns whether the result of base to the power of exponent has at most max_folded_power_bits bits"""
+    if type(base) is not int or type(exponent) is not int or exponent <= 0:
+        return True
+    return abs(base).bit_length() * exponent <= max_folded_power_bits
+
+
+def eliminate_dead_code(program: Program) -> Program:
+    """Function removes the code of a program that is never interpreted. These are the branches of if statements of
+    which the test is a literal that chooses another branch, the statements after a return statement, and function
+    declarations that can not be called. Constant tests are found best when the program has been folded by 
+    fold_constants first
+
+    Args:
+        program             : The program from which dead code needs to be removed
+
+    Returns:
+        A program without dead code. When a function that can be called has a body which has not been parsed by a
+        lazy parser, it is unknown which functions it calls and no function declarations are removed
+    """
+    program         = remove_dead_statements(program)
+    function_names  = reachable_function_names(program)
+    if function_names is None:
+        return program
+    return remove_unused_functions(program, function_names | names_declared_more_than_once(program))
+
+
+def remove_dead_statements(node: Node) -> Node:
+    """Function removes the branches of if statements with a constant test which are never interpreted, and the 
+    statements after a return statement. A branch that is always interpreted replaces the if statement
+
+    Args:
+        node                : The node from which dead statements need to be removed
+
+    Returns:
+        A node without dead statements. Nodes which do not contain dead statements are returned as they are
+    """
+    if type(node) is LazyBlockStatement:
+        return node
+    node = node_map_children(node, remove_dead_statements)
+
+    if type(node) is IfStatement and type(node.alternate_) is IfStatement and type(node.alternate_.test_) is Literal:
+        alternate = node.alternate_
+        while type(alternate) is IfStatement and type(alternate.test_) is Literal:
+            alternate = constant_branch(alternate)
+        return node_span(IfStatement, node, node, test_=node.test_, consequent_=node.consequent_, alternate_=alternate)
+    if type(node) in (Program, BlockStatement):
+        body = live_statements(node.body_)
+        if len(body) != len(node.body_) or any(new is not old for new, old in zip(body, node.body_)):
+            return node_span(type(node), node, node, body_=body)
+    return node
+
+def live_statements(statements: List[Node]) -> List[Node]:
+    """Function returns the statements of a body that are interpreted. If statements with a constant test are replaced 
+    by the statements of the branch they choose, and the statements after a return statement are left out"""
+    live, pending = [], list(reversed(statements))
+    while pending:
+        statement = pending.pop()
+        if type(statement) is IfStatement and type(statement.test_) is Literal:
+            branch   = constant_branch(statement)
+            pending += reversed(branch.body_) if type(branch) is BlockStatement else [branch] if branch else []
+            continue
+        live.append(statement)
+        if type(statement) is ReturnStatement:
+            break
+    return live
+
+def constant_branch(if_statement: IfStatement) -> Union[BlockStatement, IfStatement, List]:
+    """Function returns the branch an if statement with a literal test always interprets. This is a block statement,
+    the if statement of an elif branch, or an empty list when there is no else branch"""
+    return if_statement.consequent_ if if_statement.test_.value_ else if_statement.alternate_
+
+
+def reachable_function_names(program: Program) -> Optional[Set[str]]:
+    """Function returns the names that can be used by a program. These are the names used by the statements outside
+    of function declarations, together with the names used by the declarations of functions with those names
+
+    Args:
+        program             : The program of which the names are collected
+
+    Returns:
+        The set of reachable names, or None when a reachable function has a body which has not been parsed
+    """
+    names, declarations, pending = set(), {}, list(program.body_)
+    while pending:
+        node = pending.pop()
+        if type(node) is Identifier:
+            if node.name_ not in names:
+                names.add(node.name_)
+                pending += [declaration.body_ for declaration in declarations.get(node.name_, [])]
+        elif type(node) is FunctionDeclaration:
+            declarations.setdefault(node.id_, []).append(node)
+            if node.id_ in names:
+                pending.append(node.body_)
+        elif type(node) is LazyBlockStatement:
+            if not node.parsed_:
+                return None
+            pending.append(node.parsed_[0])
+        else:
+            pending += node_children(node)
+    return names
+
+def names_declared_more_than_once(program: Program) -> Set[str]:
+    """Function returns the names which are declared more than once by function declarations, variable declarations 
+    or parameters. The declarations of these names are kept, so the duplicate function identifier error is still
+    raised when the program is interpreted"""
+    declared, duplicates, pending = set(), set(), [program]
+    while pending:
+        node = pending.pop()
+        if type(node) in (FunctionDeclaration, VariableDeclaration):
+            duplicates.update({node.id_} & declared)
+            declared.add(node.id_)
+        if type(node) is FunctionDeclaration:
+            duplicates.update({parameter.name_ for parameter in node.params_} & declared)
+            declared.update(parameter.name_ for parameter in node.params_)
+        if type(node) is LazyBlockStatement:
+            pending += node.parsed_
+        else:
+            pending += node_children(node)
+    return duplicates
+
+def remove_unused_functions(node: Node, function_names: Set[str]) -> Node:
+    """Function removes the function declarations of which the name is not in function_names from a node"""
+    if type(node) is LazyBlockStatement or type(node) is FunctionDeclaration and node.id_ not in function_names:
+        return node
+    node = node_map_children(node, lambda child: remove_unused_functions(child, function_names))
+    if type(node) in (Program, BlockStatement):
+        body = [statement for statement in node.body_ if type(statement) is not FunctionDeclaration or statement.id_ in function_names]
+        if len(body) != len(node.body_):
+            return node_span(type(node), node, node, body_=body)
+    return node
+
+def node_children(node: Node) -> List[Node]:
+    """Function returns the nodes a node contains directly"""
+    children = []
+    for name in node_child_names(type(node)):
+        value = getattr(node, name)
+        if isinstance(value, Node):
+            children.append(value)
+        elif isinstance(value, list):
+            children += [item for item in value if isinstance(item, Node)]
+    return children
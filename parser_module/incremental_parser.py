@@ -0,0 +1,262 @@
+"""
+@file incremental_parser.py
+@author Nathan Houwaart (nathan.houwaart@student.hu.nl)
+@brief This file contains functions to parse an edited source file again by only parsing the edited top level statements
+@version 0.1
+@date 18-10-2026
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from array import array
+from dataclasses import dataclass
+from typing import Tuple, Optional, List, Callable
+from misc.token_types import *
+from misc.node_types import *
+from misc.error_message import generate_error_message
+from misc.token_stream import TokenStream, token_stream_find, token_stream_chunked
+from misc.chunked_sequence import ChunkedSequence, chunked_sequence, chunked_sequence_replace, sequence_bisect_left, sequence_bisect_right
+from misc.token_cursor import TokenCursor, cursor_peek, cursor_next
+from lexer_module.lexer import relex
+from parser_module.parser import statement_parsers
+
+
+@dataclass(frozen=False)
+class IncrementalProgram:
+    """
+    IncrementalProgram class
+        The top level statements of a parsed program together with the tokens they were parsed from and the tokens 
+        of every top level statement
+    ...
+
+    Attributes
+    ----------
+    statements : ChunkedSequence
+        The top level statements of the program. A statement that has been moved by an edit is the same node object 
+        as before the edit, its locations are moved by the offsets of the statement. incremental_program_resolve 
+        creates a program in which every statement is at its place in the edited source file
+    token_stream : TokenStream
+        The tokens of the program, created by lex_stream or relex
+    statement_starts : ChunkedSequence
+        The index in token_stream of the first token of every statement
+    statement_ends : ChunkedSequence
+        The index in token_stream after the last token of every statement
+    statement_offsets : ChunkedSequence
+        The amount of characters every statement has been moved since it was parsed
+    statement_line_offsets : ChunkedSequence
+        The amount of lines every statement has been moved since it was parsed
+    statement_token_offsets : ChunkedSequence
+        The amount of tokens every statement has been moved since it was parsed
+    lazy_function_bodies : bool
+        Whether the bodies of function declarations are parsed when the function is called
+
+    Notes
+    -----
+    The statements, token indices and offsets are stored as ChunkedSequences, so reparse only copies the chunks
+    around the edit. The statements after the edit are moved by adding to the offsets in the fenwick trees of the 
+    ChunkedSequences instead of copying every offset. program creates a Program node of the statements when it is read
+    """
+    statements              : ChunkedSequence
+    token_stream            : TokenStream
+    statement_starts        : ChunkedSequence
+    statement_ends          : ChunkedSequence
+    statement_offsets       : ChunkedSequence
+    statement_line_offsets  : ChunkedSequence
+    statement_token_offsets : ChunkedSequence
+    lazy_function_bodies    : bool = False
+
+    @property
+    def program(self) -> Program:
+        return program_from_statements(self.token_stream, list(self.statements))
+
+
+def parse_top_level_statements(
+    characters: str,
+    cursor: TokenCursor,
+    resume: Callable[[int], Optional[int]]=lambda index: None
+) -> Tuple[List[Node], array, array, Optional[int]]:
+    """Function parses top level statements until it encounters an EOF token, or until resume finds a statement
+    of the previous program that can be reused from the position of the cursor
+
+    Args:
+        characters          : Characters that are being lexed, parsed and interpreted
+        cursor              : TokenCursor pointing at the tokens that need to be parsed
+        resume              : A function which returns the index of a reusable statement of the previous program
+                              that starts at the given token index, or None. By default no statements are reused
+
+    Returns:
+        If no errors occured:
+            The parsed statements, the token index where every statement starts and ends, and the index of the
+            statement returned by resume (None when parsing stopped at the EOF token)
+        If a grammar error occured:
+            Raises a Syntax Error with a message of where the error occured
+    """
+    nodes, starts, ends = [], array('q'), array('q')
+    while True:
+        head = cursor_peek(cursor)
+        if head.tokentype_ == TokenTypes.EOF:
+            return nodes, starts, ends, None
+        if head.tokentype_ in (TokenTypes.NEW_LINE, TokenTypes.TAB):
+            cursor_next(cursor)
+            continue
+
+        reused = resume(cursor.index)
+        if reused is not None:
+            return nodes, starts, ends, reused
+
+        parse_statement = statement_parsers.get(head.tokentype_)
+        if parse_statement is None:
+            return generate_error_message(head, characters, "Invalid Syntax", True)
+        starts.append(cursor.index)
+        nodes.append(parse_statement(characters, cursor))
+        ends.append(cursor.index)
+
+
+def program_from_statements(token_stream: TokenStream, body: List[Node]) -> Program:
+    """Function creates a Program node of the provided statements, which ends at the EOF token of token_stream"""
+    eof_token = token_stream[len(token_stream)-1]
+    return Program(loc_={'start': {'line': 1, 'index': 0}, "end":{"line":eof_token.loc_["start"]["line"], "index":eof_token.loc_["start"]["index"]}}, range_=[0, eof_token.range_[0]], body_=body)
+
+
+def parse_incremental(token_stream: TokenStream, lazy_function_bodies: bool=False) -> IncrementalProgram:
+    """Function parses all tokens of a TokenStream and remembers which tokens belong to every top level statement,
+    so the program can be parsed again after an edit with reparse
+
+    Args:
+        token_stream        : The tokens of the program, created by lex_stream
+        lazy_function_bodies: Skip the bodies of function declarations and parse them when the function is called, default=False
+
+    Returns:
+        If no errors occured:
+            An IncrementalProgram containing the parsed program, which is the same as the program parse_program creates
+        If a grammar error occured:
+            Raises a Syntax Error with a message of where the error occured
+    """
+    cursor  = TokenCursor(token_stream, lazy_function_bodies=lazy_function_bodies)
+    body, starts, ends, _ = parse_top_level_statements(token_stream.source_file, cursor)
+    offsets = chunked_sequence(array('q', [0]) * len(body), moves=True)
+    return IncrementalProgram(
+        chunked_sequence(body), token_stream_chunked(token_stream), chunked_sequence(starts, moves=True), 
+        chunked_sequence(ends, moves=True), offsets, offsets, offsets, lazy_function_bodies
+    )
+
+
+def reparse(incremental_program: IncrementalProgram, start: int, end: int, replacement: str) -> IncrementalProgram:
+    """Function parses an edited source file by only parsing the top level statements around the edit again.
+    The tokens are relexed first. The statements which end before the edited line are reused. Parsing starts at
+    the first statement after them and stops as soon as the parser reaches the start of a statement of the previous
+    program on a line after the edit. From there on the statements of the previous program are reused as they are.
+    The amount of characters, lines and tokens that were added or removed is added to their offsets instead of 
+    copying every node they contain, so an edit does not copy the rest of the program
+
+    Args:
+        incremental_program : The IncrementalProgram of the source file before the edit
+        start               : The index of the first character that is replaced
+        end                 : The index after the last character that is replaced
+        replacement         : The characters that are placed between start and end
+
+    Returns:
+        If no errors occured:
+            An IncrementalProgram of the edited source file. The statements before and after the edit are the same 
+            node objects as in the previous program. incremental_program_resolve of it is the same as the program 
+            parse_program creates
+        If a lex or grammar error occured:
+            Raises a Syntax Error with a message of where the error occured. The previous IncrementalProgram is not changed
+    """
+    old_stream      = incremental_program.token_stream
+    token_stream    = relex(old_stream, start, end, replacement)
+    old_line_starts = old_stream.source_file.line_starts
+    old_starts      = incremental_program.statement_starts
+    old_ends        = incremental_program.statement_ends
+
+    delta       = len(replacement) - (end - start)
+    token_delta = len(token_stream) - len(old_stream)
+    line_delta  = len(token_stream.source_file.line_starts) - len(old_line_starts)
+
+    # A statement can be reused as it is when every token it has parsed, and the token after it which the parser
+    # looked at, comes before the first token that has been lexed again
+    first_token = token_stream_find(old_stream, old_line_starts[sequence_bisect_right(old_line_starts, start)-1])
+    kept        = sequence_bisect_left(old_ends, first_token)
+    resume_at   = old_ends[kept-1] if kept else 0
+
+    # A statement after the edit can be reused when it starts on a later line than the edit and its first token
+    # has been copied from the previous TokenStream, so its columns did not change
+    next_line   = sequence_bisect_right(old_line_starts, end)
+    reuse_after = old_line_starts[next_line] if next_line < len(old_line_starts) else len(old_stream.source_file.characters) + 1
+
+    def resume(index: int) -> Optional[int]:
+        old_index = index - token_delta
+        statement = sequence_bisect_left(old_starts, old_index, kept)
+        if statement < len(old_starts) and old_starts[statement] == old_index and old_stream.starts[old_index] >= reuse_after \
+        and token_stream.starts[index] == old_stream.starts[old_index] + delta:
+            return statement
+        return None
+
+    cursor = TokenCursor(token_stream, resume_at, lazy_function_bodies=incremental_program.lazy_function_bodies)
+    body, starts, ends, reused = parse_top_level_statements(token_stream.source_file, cursor, resume)
+
+    # The statements between kept and reused are replaced by the parsed statements, the statements after them move
+    stop    = len(old_starts) if reused is None else reused
+    parsed  = array('q', [0]) * len(body)
+    return IncrementalProgram(
+        chunked_sequence_replace(incremental_program.statements, kept, stop, body),
+        token_stream,
+        chunked_sequence_replace(old_starts, kept, stop, starts, token_delta),
+        chunked_sequence_replace(old_ends, kept, stop, ends, token_delta),
+        chunked_sequence_replace(incremental_program.statement_offsets, kept, stop, parsed, delta),
+        chunked_sequence_replace(incremental_program.statement_line_offsets, kept, stop, parsed, line_delta),
+        chunked_sequence_replace(incremental_program.statement_token_offsets, kept, stop, parsed, token_delta),
+        incremental_program.lazy_function_bodies
+    )
+
+
+def incremental_program_resolve(incremental_program: IncrementalProgram) -> Program:
+    """Function creates the program of an IncrementalProgram in which every statement is at its place in the edited
+    source file. Only the statements which have been moved since they were parsed are copied
+
+    Args:
+        incremental_program : The IncrementalProgram of which the program is needed
+
+    Returns:
+        A Program node which is the same as the program parse_program creates of the tokens of incremental_program
+    """
+    body = [
+        shift_node(node, offset, line_offset, incremental_program.token_stream, token_offset) if offset or line_offset or token_offset else node
+        for node, offset, line_offset, token_offset in zip(incremental_program.statements, incremental_program.statement_offsets, 
+                                                           incremental_program.statement_line_offsets, incremental_program.statement_token_offsets)
+    ]
+    return program_from_statements(incremental_program.token_stream, body)
+
+
+def shift_node(node: Node, delta: int, line_delta: int, token_stream: TokenStream, token_delta: int) -> Node:
+    """Function creates a copy of a node, and all nodes it contains, which has been moved by a number of characters
+    and lines. The node must start on a line after the edit, so the columns of its location do not change
+
+    Args:
+        node                : The node that needs to be moved
+        delta               : The amount of characters the node moves
+        line_delta          : The amount of lines the node moves
+        token_stream        : The TokenStream lazy function bodies are parsed from
+        token_delta         : The amount of tokens lazy function bodies move in token_stream
+
+    Returns:
+        A node which is equal to the node parse_program would create at its new place
+    """
+    location    = (node.start_line + line_delta, node.start_index, node.end_line + line_delta, node.end_index, node.range_start + delta, node.range_end + delta)
+    if type(node) is LazyBlockStatement:
+        return node_located(LazyBlockStatement, *location, tokens_=token_stream, start_=node.start_ + token_delta, end_=node.end_ + token_delta, 
+                            parsed_=[shift_node(parsed, delta, line_delta, token_stream, token_delta) for parsed in node.parsed_])
+
+    values = {}
+    for name in node_child_names(type(node)):
+        value = getattr(node, name)
+        if isinstance(value, Node):
+            value = shift_node(value, delta, line_delta, token_stream, token_delta)
+        elif isinstance(value, list):
+            value = [shift_node(item, delta, line_delta, token_stream, token_delta) if isinstance(item, Node) else item for item in value]
+        values[name] = value
+    return node_located(type(node), *location, **values)
+
@@ -12,29 +12,43 @@ sys.path.append(os.path.abspath(__file__))
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Tuple, Callable, Optional, Dict, List
+# When this file is run as a script, the parser submodules must import this module instead of loading it a second time,
+# which would look up the parse functions of statement_parsers before the submodules have been loaded
+if __name__ == "__main__": sys.modules.setdefault("parser_module.parser", sys.modules[__name__])
+
+from typing import Tuple, Callable, Optional, Dict, List, Iterable, Iterator
 from misc.token_types import *
 from misc.node_types import *
-from lexer_module.lexer import lex, search_match
+from misc.node_json import program_json_dump
+from lexer_module.lexer import tokenize
 from misc.error_message import generate_error_message
+from misc.token_cursor import TokenCursor, token_sequence, cursor_at_end, cursor_peek, cursor_next, cursor_remaining
+from misc.token_buffer import TokenBuffer, token_buffer_release
+from misc.source_file import get_source_file, source_file_location
 
 import parser_submodules.parse_variable_declaration as parse_var_decl
 import parser_submodules.parse_function_declaration as parse_func_decl
 import parser_submodules.parse_if_statement         as parse_if_stmt
 import parser_submodules.parse_function_call        as parse_func_call
 
+from parser_submodules.parse_function_declaration import parse_lazy_block_statement
+
 def parse(
     characters: str, 
-    tokens: List['Token'], 
+    tokens: Iterable['Token'], 
     termination_tokens: List['TokenTypes']=[], 
+    lazy_function_bodies: bool=False
 ) -> List['Node']:
     """Function creates an AST from the provided tokens. It raises error 
     messages when it encounters illegal grammar
     
     Args:
         characters          : Characters that are being lexed, parsed and interpreted
-        tokens              : List of tokens to create an AST from
+        tokens              : Tokens to create an AST from. Sequences like a list or a TokenStream are indexed directly, other 
+                              iterables of tokens, like the output of lex_iter, are read into a list first
         termination_tokens  : A List of termination tokens. If the parser encounters one of these tokens OR an EOF token, stop parsing
+        lazy_function_bodies: Skip the bodies of function declarations and parse them when the function is called, default=False. 
+                              Syntax errors in a function body are then only raised when the function is called
 
     Returns:
         If no errors occured:
@@ -43,21 +57,120 @@ def parse(
         If a grammar error occured:
             Raises a Syntax Error with a message of where the error occured
     """
-    if len(tokens) == 0: return [], []
+    tokens  = token_sequence(tokens)
+    cursor  = TokenCursor(tokens, lazy_function_bodies=lazy_function_bodies)
+    nodes   = parse_statements(characters, cursor, termination_tokens)
+    return nodes, cursor_remaining(cursor)
+
+
+def parse_statements(
+    characters: str, 
+    cursor: TokenCursor, 
+    termination_tokens: List['TokenTypes']=[], 
+) -> List['Node']:
+    """Function parses statements until it encounters a termination token or an EOF token. The parse function
+    of a statement is looked up in statement_parsers using the type of the first token of the statement
     
-    head, *tail = tokens
-    if head.tokentype_ == TokenTypes.IF: 
-        breakpoint
-    if   head.tokentype_ in (TokenTypes.EOF, *termination_tokens) : return [], tokens
-    elif head.tokentype_ in (TokenTypes.NEW_LINE, TokenTypes.TAB) : return parse(characters, tail, termination_tokens)
-    elif head.tokentype_ == TokenTypes.VARIABLE_DECLARATION       : node, tokens = parse_var_decl.parse_variable_declaration(characters, tokens)
-    elif head.tokentype_ == TokenTypes.FUNCTION_DECLARATION       : node, tokens = parse_func_decl.parse_function_declaration(characters, tokens)
-    elif head.tokentype_ == TokenTypes.IF                         : node, tokens = parse_if_stmt.parse_if_statement(characters, tokens)
-    elif head.tokentype_ == TokenTypes.RETURN                     : node, tokens = parse_func_decl.parse_return_statement(characters, tokens)
-    elif head.tokentype_ == TokenTypes.CALL                       : node, tokens = parse_func_call.parse_function_call(characters, tokens)
-    else                                                          : return generate_error_message(head, characters, "Invalid Syntax", True)
-    nodes, tokens = parse(characters, tokens, termination_tokens)
-    return [node] + nodes, tokens
+    Args:
+        characters          : Characters that are being lexed, parsed and interpreted
+        cursor              : TokenCursor pointing at the tokens that need to be parsed
+        termination_tokens  : A List of termination tokens. If the parser encounters one of these tokens OR an EOF token, stop parsing
+
+    Returns:
+        If no errors occured:
+            A list of the parsed statements. The cursor is left at the termination token
+        If a grammar error occured:
+            Raises a Syntax Error with a message of where the error occured
+    """
+    nodes = []
+    while not cursor_at_end(cursor):
+        head = cursor_peek(cursor)
+        if head.tokentype_ in (TokenTypes.EOF, *termination_tokens):
+            break
+        if head.tokentype_ in (TokenTypes.NEW_LINE, TokenTypes.TAB):
+            cursor_next(cursor)
+            continue
+        
+        parse_statement = statement_parsers.get(head.tokentype_)
+        if parse_statement is None:
+            return generate_error_message(head, characters, "Invalid Syntax", True)
+        nodes.append(parse_statement(characters, cursor))
+    return nodes
+
+
+def parse_program(
+    characters: str, 
+    tokens: Iterable['Token'],
+    lazy_function_bodies: bool=False
+) -> Program:
+    """Function parses all provided tokens into a Program node
+
+    Args:
+        characters          : Characters that are being lexed, parsed and interpreted
+        tokens              : Tokens to create an AST from, ending with an EOF token
+        lazy_function_bodies: Skip the bodies of function declarations and parse them when the function is called, default=False
+
+    Returns:
+        If no errors occured:
+            A Program node containing the parsed statements, which ends at the start of the last token (the EOF token).
+            Without tokens, the Program node ends at the end of the characters
+        If a grammar error occured:
+            Raises a Syntax Error with a message of where the error occured
+    """
+    tokens  = token_sequence(tokens)
+    cursor  = TokenCursor(tokens, lazy_function_bodies=lazy_function_bodies)
+    parsed  = parse_statements(characters, cursor)
+    if len(tokens) > 0:
+        end_loc, end_index  = tokens[-1].loc_["start"], tokens[-1].range_[0]
+    else:
+        end_index           = len(characters)
+        line, index         = source_file_location(get_source_file(characters), end_index)
+        end_loc             = {"line": line, "index": index}
+    return Program(loc_={'start': {'line': 1, 'index': 0}, "end":{"line":end_loc["line"], "index":end_loc["index"]}}, range_=[0, end_index], body_=parsed)
+
+
+def parse_iter(
+    characters: str, 
+    tokens: Iterable['Token']
+) -> Iterator['Node']:
+    """Function parses the top level statements of a program one by one. Tokens are read from tokens while the 
+    statements are parsed, so a statement can be used before the tokens after it have been lexed. The tokens of a 
+    statement are released once the next statement is parsed
+
+    Args:
+        characters          : Characters that are being lexed, parsed and interpreted
+        tokens              : Tokens to create an AST from, ending with an EOF token. Can be an iterator, like the output of lex_iter
+
+    Yields:
+        If no errors occured:
+            The parsed top level statements
+        If a grammar error occured:
+            Raises a Syntax Error with a message of where the error occured. The statements before the error have been yielded
+    """
+    token_buffer    = TokenBuffer(iter(tokens))
+    cursor          = TokenCursor(token_buffer)
+    while True:
+        head = cursor_peek(cursor)
+        if head.tokentype_ == TokenTypes.EOF:
+            return
+        if head.tokentype_ in (TokenTypes.NEW_LINE, TokenTypes.TAB):
+            cursor_next(cursor)
+            continue
+
+        parse_statement = statement_parsers.get(head.tokentype_)
+        if parse_statement is None:
+            return generate_error_message(head, characters, "Invalid Syntax", True)
+        token_buffer_release(token_buffer, cursor.index)
+        yield parse_statement(characters, cursor)
+
+
+statement_parsers = {
+    TokenTypes.VARIABLE_DECLARATION : parse_var_decl.parse_variable_declaration,
+    TokenTypes.FUNCTION_DECLARATION : parse_func_decl.parse_function_declaration,
+    TokenTypes.IF                   : parse_if_stmt.parse_if_statement,
+    TokenTypes.RETURN               : parse_func_decl.parse_return_statement,
+    TokenTypes.CALL                 : parse_func_call.parse_function_call,
+}
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -68,14 +181,12 @@ if __name__ == "__main__":
     with open(sys.argv[1], 'rb') as f:
         code = f.read().decode("utf-8")
     
-    lexed = lex(code, search_match, TokenExpressions)
-    tokens = list(filter(lambda token: token.tokentype_ != TokenTypes.NONE, lexed))
+    tokens = tokenize(code)
     # list(map(print, lexed)) 
 
-    parsed, eof_token = parse(code, tokens)
-    program = Program(loc_={'start': {'line': 1, 'index': 0}, "end":{"line":tokens[-1].loc_["start"]["line"], "index":tokens[-1].loc_["start"]["index"]}}, range_=[0, len(code)], body_=parsed)
+    program = parse_program(code, tokens)
     
     
     # print(str(program))
-    with open("C:\\Users\\Nathan\\Documents\\ATP\\pretty_printed.json", "wb") as f:
-        f.write(program.jsonify().encode("utf-8"))
\ No newline at end of file
+    with open("pretty_printed.json", "w", encoding="utf-8", newline="") as f:
+        program_json_dump(program, f)
\ No newline at end of file
@@ -8,14 +8,15 @@
 from misc.node_types import *
 from misc.token_types import TokenTypes, Token
 from misc.error_message import generate_error_message
+from misc.token_cursor import TokenCursor, cursor_peek, cursor_next
 from typing import Optional, List, Tuple
 
 import parser_submodules.parse_function_call as pass_func
 
 def parse_operand(
     characters : str,
-    tokens : List['Token']
-) -> Optional[Tuple['Node', List['Token']]]:
+    cursor : TokenCursor
+) -> Optional['Node']:
     """
     Function parses an operand for an expression
     
@@ -28,168 +29,88 @@ def parse_operand(
             - After the creation of a new BinaryExpression node, a TokenTypes.RIGHT_PARENTHESIES is required 
     
     Args: 
-        tokens: The tokens that need to be parsed
+        cursor: TokenCursor pointing at the tokens that need to be parsed
         
     Returns:
         If no error occurs:
-            - A Node containing the found operand 
-            - The leftover tokens that stil need to be parsed
+            A Node containing the found operand. The cursor is moved past the operand
         If no operand was found:
             returns None
     """
-    head, *tail = tokens
+    if cursor_peek(cursor).tokentype_ == TokenTypes.CALL:
+        return pass_func.parse_function_call(characters, cursor)
     
+    head = cursor_next(cursor)
     if head.tokentype_ in (TokenTypes.PLUS, TokenTypes.MINUS):
-        node, tail = parse_operand(characters, tail)
-        loc_ = {"start": head.loc_["start"], "end": node.loc_["end"]}
-        range_   = [head.range_[0], node.range_[1]]
-        return UnaryExpression(loc_=loc_, range_=range_, operator_=head.tokentype_, argument_=node), tail
+        node = parse_operand(characters, cursor)
+        return node_span(UnaryExpression, head, node, operator_=head.tokentype_, argument_=node)
     if head.tokentype_ in (TokenTypes.INT, TokenTypes.FLOAT):
-        return Literal(loc_=head.loc_, range_=head.range_, value_=int(head.value_), raw_=head.value_), tail
-    if head.tokentype_ == TokenTypes.CALL:
-        result, tokens = pass_func.parse_function_call(characters, tokens) #TODO: characters meegeven
-        return result, tokens
+        return Literal(loc_=head.loc_, range_=head.range_, value_=int(head.value_), raw_=head.value_)
     if head.tokentype_ == TokenTypes.IDENTIFIER: 
-        return Identifier(loc_=head.loc_, range_=head.range_, name_=head.value_), tail
+        return Identifier(loc_=head.loc_, range_=head.range_, name_=head.value_)
     if head.tokentype_ == TokenTypes.LEFT_PARENTHESIES:
-        node, tokens = parse_expression(characters, tail)
-        head, *tail = tokens
+        node = parse_expression(characters, cursor)
+        head = cursor_next(cursor)
         if head.tokentype_ != TokenTypes.RIGHT_PARENTHESIES:
             generate_error_message(head, characters, "Missing right parenthesies", True)
-        return node, tail
+        return node
     generate_error_message(head, characters, "Expected expression, literal, or function call", True)
 
 
-def loop(
-    characters: str,
-    left: 'Node', 
-    tokens: str, 
-    token_types: List['TokenTypes'],
-    function
-) -> Tuple['Node', List['Token']]:
-    """Function tries to recursively parse a binary expression.
-    Function recurses as long as the found 'operator' is in the provided token_types.
-    
-    Note:
-        - Function does nothing when the 'operator' token is not present in the token_type list
-        - In the expression 1+2, the 'operator' token is '+'
-        - In the expression 1, the 'operator' token can by anything line "eof, new_line, space, etc"
-        
-    Args:
-        characters          : Characters that are being lexed, parsed and interpreted
-        left                : Left node for the binary expression 
-        tokens              : Tokens that need to be parsed
-        token_types         : Recurse the binary expression as long as the provided operands are is in this list
-
-    Returns:
-        If no errors occured:
-            - A node containing the parsed expression
-            - The leftover tokens that stil need to be parsed
-        If a grammar error occured:
-            Raises a Syntax Error with a message of where the error occured
-    """
-    head, *tail = tokens
-    if head.tokentype_ in token_types:
-        right, tokens = function(characters, tail)
-        loc_ = {"start": left.loc_["start"], "end": right.loc_["end"]}
-        range_   = [left.range_[0], right.range_[1]]
-        node = BinaryExpression(loc_=loc_, range_=range_, operator_=head.tokentype_, left_=left, right_=right)
-        return loop(characters, node, tokens, token_types, function)
-    return left, tokens
-
-
-def parse_expression_mul_divide(
-    characters: str,
-    tokens: List['Token']
-) -> Tuple['Node', List['Token']]:
-    """Function is used to parse an operand node and then looks recursively 
-    for multiply and divide tokens to create a binary expression
-    
-    Args:
-        characters          : Characters that are being lexed, parsed and interpreted
-        tokens              : Tokens that need to be parsed
-
-    Returns:
-        If no errors occured:
-            - A node containing the parsed expression
-            - The leftover tokens that stil need to be parsed
-        If a grammar error occured:
-            Raises a Syntax Error with a message of where the error occured
-    """
-    node, tokens = parse_operand(characters, tokens)
-    node, tokens = loop(characters, node, tokens, (TokenTypes.MULTIPLY, TokenTypes.DIVIDE), parse_operand)
-    return node, tokens
-
-def parse_expression_plus_minus(
-    characters: str,
-    tokens: List['Token']
-) -> Tuple['Node', List['Token']]:
-    """Function tries parse a multiply and divide expression node and then looks recursively 
-    for plus and minus tokens to create a binary expression
-           
-    Args:
-        characters          : Characters that are being lexed, parsed and interpreted
-        tokens              : Tokens that need to be parsed
-
-    Returns:
-        If no errors occured:
-            - A node containing the parsed expression
-            - The leftover tokens that stil need to be parsed
-        If a grammar error occured:
-            Raises a Syntax Error with a message of where the error occured
-    """
-    expression, tokens = parse_expression_mul_divide(characters, tokens)
-    expression, tokens = loop(characters, expression, tokens, (TokenTypes.MINUS, TokenTypes.PLUS), parse_expression_mul_divide)
-    return expression, tokens
-
-def parse_expression_or_and(
-    characters: str,
-    tokens: List['Token'],
-) -> Tuple['None', List['Token']]:
-    """Function tries parse a plus and minus expression node and then looks recursively 
-    for greater than, is equal and smaller than tokens to create a binary expression
-           
-    Args:
-        characters          : Characters that are being lexed, parsed and interpreted
-        tokens              : Tokens that need to be parsed
-
-    Returns:
-        If no errors occured:
-            - A node containing the parsed expression
-            - The leftover tokens that stil need to be parsed
-        If a grammar error occured:
-            Raises a Syntax Error with a message of where the error occured
-    """
-    expression, tokens = parse_expression_plus_minus(characters, tokens)
-    expression, tokens = loop(characters, expression, tokens, (TokenTypes.GREATER_THAN, TokenTypes.IS_EQUAL, TokenTypes.SMALLER_THAN), parse_expression_plus_minus)
-    return expression, tokens
+# Binding powers of the binary operators as (left binding power, right binding power). An operator binds
+# stronger than the operators with a lower binding power. An operator with a right binding power above its left 
+# binding power is left associative (1-2-3 is (1-2)-3), an operator with a lower right binding power is right 
+# associative (2⚡3⚡2 is 2⚡(3⚡2))
+binding_powers = {
+    TokenTypes.OR           : (10, 11),
+    TokenTypes.AND          : (10, 11),
+    TokenTypes.GREATER_THAN : (20, 21),
+    TokenTypes.IS_EQUAL     : (20, 21),
+    TokenTypes.SMALLER_THAN : (20, 21),
+    TokenTypes.PLUS         : (30, 31),
+    TokenTypes.MINUS        : (30, 31),
+    TokenTypes.MULTIPLY     : (40, 41),
+    TokenTypes.DIVIDE       : (40, 41),
+    TokenTypes.POWER        : (51, 50),
+}
 
 
 def parse_expression(
     characters: str,
-    tokens: List['Token'],
-) -> Tuple['Node', List['Token']]:
-    """Function is used to parse an expression statement
+    cursor: TokenCursor,
+    min_binding_power: int=0
+) -> 'Node':
+    """Function is used to parse an expression statement. The expression is parsed with a Pratt parser: after an 
+    operand, binary expressions are created as long as the next operator binds at least as strong as min_binding_power. 
+    The right side of a binary expression is parsed with the right binding power of its operator
     
     Note:
-        Expression follows basic math rules:
+        Expression follows basic math rules, the binding powers are taken from the binding_powers table:
             1. Parentesies, call expressions, literals and unary operators take most priority
-            2. Multiply and Divide take second most priority
-            3. Add and Subtract take third most priority
-            4. Greater than, is equal or smaller than take fourth most priiority
-            5. Or and And take least most priority
+            2. Power takes second most priority
+            3. Multiply and Divide take third most priority
+            4. Add and Subtract take fourth most priority
+            5. Greater than, is equal or smaller than take fifth most priiority
+            6. Or and And take least most priority
         
     Args:
         characters          : Characters that are being lexed, parsed and interpreted
-        tokens              : Tokens that need to be parsed
+        cursor              : TokenCursor pointing at the tokens that need to be parsed
+        min_binding_power   : Only parse operators with a left binding power of at least this value, default=0
 
     Returns:
         If no errors occured:
-            - A node containing the parsed expression
-            - The leftover tokens that stil need to be parsed
+            A node containing the parsed expression. The cursor is moved past the expression
         If a grammar error occured:
             Raises a Syntax Error with a message of where the error occured
     """
-    expression, tokens = parse_expression_or_and(characters, tokens)
-    expression, tokens = loop(characters, expression, tokens, (TokenTypes.OR, TokenTypes.AND), parse_expression_or_and)
-    return expression, tokens
\ No newline at end of file
+    left = parse_operand(characters, cursor)
+    while True:
+        operator = cursor_peek(cursor)
+        binding_power = binding_powers.get(operator.tokentype_)
+        if binding_power is None or binding_power[0] < min_binding_power:
+            return left
+        
+        cursor_next(cursor)
+        right   = parse_expression(characters, cursor, binding_power[1])
+        left    = node_span(BinaryExpression, left, right, operator_=operator.tokentype_, left_=left, right_=right)
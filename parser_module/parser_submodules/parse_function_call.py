@@ -9,13 +9,14 @@ from misc.node_types import *
 from misc.token_types import TokenTypes, Token
 from typing import Optional, List, Tuple
 from misc.error_message import generate_error_message
+from misc.token_cursor import TokenCursor, cursor_peek, cursor_next
 
 import parser_submodules.parse_expression as parse_expr
 
 def parse_function_call_parameters_loop(
     characters: str,
-    tokens : List[Token]
-) -> Tuple[List['Node'], List['Token']]:
+    cursor : TokenCursor
+) -> List['Node']:
     """Function is used to parse the parameters when parsing a function call
     
     Note: 
@@ -26,29 +27,28 @@ def parse_function_call_parameters_loop(
     
     Args:
         characters  : The characters that are being lexed, parsed, interpreted
-        tokens      : List of tokens that need to be parsed
+        cursor      : TokenCursor pointing at the tokens that need to be parsed
     
     Returns:
         If no errors occured:
-            - A list of nodes representing the parameters 
-            - A list of tokens that still need to be parsed
+            A list of nodes representing the parameters. The cursor is left at the closing TokenType.CALL
         If a grammar error occured:
             - Raises a Syntax Error with a message of where the error occured
     """
-    node, tokens = parse_expr.parse_expression(characters, tokens)
-    head, *tail = tokens
-    if head.tokentype_ == TokenTypes.CALL: 
-        return [node], tokens
-    if head.tokentype_ != TokenTypes.SEPARATOR:
-        generate_error_message(head, characters, "Missing '|' between multiple parameters", True)
-
-    nodes, tokens = parse_function_call_parameters_loop(characters, tail)
-    return [node] + nodes, tokens
+    nodes = []
+    while True:
+        nodes.append(parse_expr.parse_expression(characters, cursor))
+        head = cursor_peek(cursor)
+        if head.tokentype_ == TokenTypes.CALL: 
+            return nodes
+        if head.tokentype_ != TokenTypes.SEPARATOR:
+            generate_error_message(head, characters, "Missing '|' between multiple parameters", True)
+        cursor_next(cursor)
 
 def parse_function_call_parameters(
     characters: str, 
-    tokens : List['Token']
-) -> Tuple[List['Node'], List['Token']]:
+    cursor : TokenCursor
+) -> List['Node']:
     """Function tries to parse a function call parameters
     
     Note: 
@@ -59,25 +59,23 @@ def parse_function_call_parameters(
     
     Args:
         characters  : The characters that are being lexed, parsed, interpreted
-        tokens      : List of tokens that need to be parsed
+        cursor      : TokenCursor pointing at the tokens that need to be parsed
     
     Returns:
         If no errors occured:
-            - A list of nodes representing the parameters 
-            - A list of tokens that still need to be parsed
+            A list of nodes representing the parameters. The cursor is left at the closing TokenType.CALL
         If a grammar error occured:
             - Raises a Syntax Error with a message of where the error occured
     """
-    head, *tail = tokens
-    if head.tokentype_ == TokenTypes.CALL:
-        return [], tokens
-    return parse_function_call_parameters_loop(characters, tokens)
+    if cursor_peek(cursor).tokentype_ == TokenTypes.CALL:
+        return []
+    return parse_function_call_parameters_loop(characters, cursor)
     
 
 def parse_function_call(
     characters: str, 
-    tokens: List['Token']
-) -> Tuple['CallExpression', List['Token']]:
+    cursor: TokenCursor
+) -> 'CallExpression':
     """Function tries to parse a function call statement
     
     Note: 
@@ -88,25 +86,20 @@ def parse_function_call(
     
     Args:
         characters  : The characters that are being lexed, parsed, interpreted
-        tokens      : List of tokens that need to be parsed
+        cursor      : TokenCursor pointing at the tokens that need to be parsed
     
     Returns:
         If no errors occured:
-            - A CallExpression node representing the function call
-            - A list of tokens that still need to be parsed
+            A CallExpression node representing the function call. The cursor is moved past the function call
         If a grammar error occured:
             - Raises a Syntax Error with a message of where the error occured
     """
-    call_start, identifier, *tail = tokens
+    call_start, identifier = cursor_next(cursor), cursor_next(cursor)
     if identifier.tokentype_ not in (TokenTypes.PRINT, TokenTypes.IDENTIFIER):
         generate_error_message(identifier, characters, "Expected identifier after call statement", True)
     
     callee              = Identifier(loc_=identifier.loc_, range_=identifier.range_, name_=identifier.value_)
-    arguments, tokens   = parse_function_call_parameters(characters, tail)
-    
-    call_end, *tail = tokens
+    arguments           = parse_function_call_parameters(characters, cursor)
+    call_end            = cursor_next(cursor)
     
-    loc_ = {"start": call_start.loc_["start"], "end": call_end.loc_["end"]}
-    range_   = [call_start.range_[0], call_end.range_[1]]
-    node                = CallExpression(loc_=loc_, range_=range_, arguments_=arguments, callee_=callee)
-    return node, tail
\ No newline at end of file
+    return node_span(CallExpression, call_start, call_end, arguments_=arguments, callee_=callee)
\ No newline at end of file
@@ -6,10 +6,14 @@
 @date 11-05-2021
 """
 
-from typing import Optional, List, Tuple
+import itertools
+
+from typing import Optional, List, Tuple, Sequence, Iterator
 from misc.node_types import *
 from misc.token_types import TokenTypes, Token
+from misc.token_stream import TokenStream
 from misc.error_message import generate_error_message
+from misc.token_cursor import TokenCursor, cursor_next
 import parser_submodules.parse_expression as parse_expr
 try     : import parser_module.parser as parser
 except  : import parser as parser
@@ -17,8 +21,8 @@ except  : import parser as parser
 
 def parse_function_declaration(
     characters:str, 
-    tokens: List['Token']
-) -> Tuple['FunctionDeclaration', List['Token']]:
+    cursor: TokenCursor
+) -> 'FunctionDeclaration':
     """ Function tries to parse a function declaration
     
     Note: 
@@ -27,43 +31,150 @@ def parse_function_declaration(
             2. After the identifier, get function parameters (if there are any)
             3. Finally, parse the function body just like a normal piece of code, look for a 
                 TokenType.FUNCTION_DECLARATION_END token to stop parsing at the end of the function
+            4. A function body that reaches the EOF token raises an exception
     
     Args:
         characters  : The characters that are being lexed, parsed, interpreted
-        tokens      : List of tokens that need to be parsed
+        cursor      : TokenCursor pointing at the tokens that need to be parsed
     
     Returns:
         If no errors occured:
-            - A FunctionDeclaration node 
-            - A list of tokens that still need to be parsed
+            A FunctionDeclaration node. The cursor is moved past the function declaration
         If a grammar error occured:
             - Raises a Syntax Error with a message of where the error occured
     """
-    function_declaration_start, identifier, *tail = tokens
+    function_declaration_start, identifier = cursor_next(cursor), cursor_next(cursor)
     if identifier.tokentype_ != TokenTypes.IDENTIFIER:
         generate_error_message(identifier, characters, "Expected identifier after function declaration", True)
     
-    function_parameters, tokens = parse_function_params(characters, tail)
-    function_body, tokens       = parser.parse(characters, tokens, termination_tokens=[TokenTypes.FUNCTION_DECLARATION_END])
-    function_declaration_end, *tail = tokens
+    function_parameters         = parse_function_params(characters, cursor)
+    if cursor.lazy_function_bodies:
+        function_body           = skip_function_body(characters, cursor, identifier)
+    else:
+        function_body           = parse_function_body(characters, cursor, identifier)
+    function_declaration_end    = cursor_next(cursor)
+    if function_declaration_end.tokentype_ != TokenTypes.FUNCTION_DECLARATION_END:
+        generate_error_message(function_declaration_end, characters, "Expected '––' after function body", True)
+    
+    return node_span(FunctionDeclaration, function_declaration_start, function_declaration_end, id_=identifier.value_, params_=function_parameters, body_=function_body)
+
+
+def parse_function_body(
+    characters: str, 
+    cursor: TokenCursor,
+    identifier: Token
+) -> BlockStatement:
+    """ Function parses the body of a function until the TokenType.FUNCTION_DECLARATION_END token
+    
+    Args:
+        characters  : The characters that are being lexed, parsed, interpreted
+        cursor      : TokenCursor pointing at the first token of the function body
+        identifier  : The identifier token of the function, used for error messages
+    
+    Returns:
+        If no errors occured:
+            A BlockStatement node. The cursor points at the TokenType.FUNCTION_DECLARATION_END token
+        If a grammar error occured:
+            - Raises a Syntax Error with a message of where the error occured
+    """
+    function_body = parser.parse_statements(characters, cursor, termination_tokens=[TokenTypes.FUNCTION_DECLARATION_END])
     
     if len(function_body) == 0:
         generate_error_message(identifier, characters, "Function body cannot be empty", True)
 
-    loc_ = {"start": function_body[0].loc_["start"], "end": function_body[-1].loc_["end"]}
-    range_   = [function_body[0].range_[0], function_body[-1].range_[1]]
-    function_body               = BlockStatement(loc_=loc_, range_=range_, body_=function_body)                               # Convert the function body to a blockstatement
+    return node_span(BlockStatement, function_body[0], function_body[-1], body_=function_body)                                                      # Convert the function body to a blockstatement
+
+
+def skip_function_body(
+    characters: str, 
+    cursor: TokenCursor,
+    identifier: Token
+) -> LazyBlockStatement:
+    """ Function skips the body of a function without parsing it. The end of the body is found by counting
+        nested function declarations, the body ends at the TokenType.FUNCTION_DECLARATION_END token of this function
     
-    loc_ = {"start": function_declaration_start.loc_["start"], "end": function_declaration_end.loc_["end"]}
-    range_   = [function_declaration_start.range_[0], function_declaration_end.range_[1]]
-    node                        = FunctionDeclaration(loc_=loc_, range_=range_, id_=identifier.value_, params_=function_parameters, body_=function_body)
-    return node, tail
+    Args:
+        characters  : The characters that are being lexed, parsed, interpreted
+        cursor      : TokenCursor pointing at the first token of the function body
+        identifier  : The identifier token of the function, used for error messages
+    
+    Returns:
+        If no errors occured:
+            A LazyBlockStatement node. The cursor points at the TokenType.FUNCTION_DECLARATION_END token
+        If the function body is empty:
+            - Raises a Syntax Error with a message of where the error occured
+    """
+    tokens, start, end  = cursor.tokens, cursor.index, cursor.index
+    depth, first, last  = 0, None, None
+    for end, tokentype in enumerate(token_type_values(tokens, start), start):
+        if tokentype == TokenTypes.EOF.value:
+            break
+        if tokentype == TokenTypes.FUNCTION_DECLARATION.value:
+            depth += 1
+        elif tokentype == TokenTypes.FUNCTION_DECLARATION_END.value:
+            if depth == 0: break
+            depth -= 1
+        if tokentype != TokenTypes.NEW_LINE.value and tokentype != TokenTypes.TAB.value:
+            first, last = first if first is not None else end, end
+
+    if first is None:
+        generate_error_message(identifier, characters, "Function body cannot be empty", True)
+    
+    cursor.index = end
+    first_token, last_token = tokens[first], tokens[last]
+    return node_span(LazyBlockStatement, first_token, last_token, tokens_=tokens, start_=start, end_=end)
+
+
+def token_type_values(
+    tokens: Sequence[Token], 
+    start: int
+) -> Iterator[int]:
+    """ Function yields the value of the TokenTypes of the tokens from start onwards. The tokentypes column of a
+        TokenStream is read directly, a chunk at a time, so no Token is created for the tokens that are skipped
+    
+    Args:
+        tokens      : The tokens of which the TokenTypes are needed, ending with an EOF token
+        start       : The index of the first token
+    
+    Yields:
+        The value of the TokenTypes of every token from start onwards
+    """
+    if isinstance(tokens, TokenStream):
+        for index in range(start, len(tokens), 512):
+            yield from tokens.tokentypes[index:index + 512]
+        return
+    for index in itertools.count(start):
+        yield tokens[index].tokentype_.value
+
+
+def parse_lazy_block_statement(
+    characters: str, 
+    node: LazyBlockStatement
+) -> BlockStatement:
+    """ Function parses the function body of a LazyBlockStatement. The parsed body is stored in the node,
+        so the body of a function is parsed only once, no matter how often the function is called
+    
+    Args:
+        characters  : The characters that are being lexed, parsed, interpreted
+        node        : The LazyBlockStatement that needs to be parsed
+    
+    Returns:
+        If no errors occured:
+            A BlockStatement node containing the function body
+        If a grammar error occured:
+            - Raises a Syntax Error with a message of where the error occured
+    """
+    if not node.parsed_:
+        cursor          = TokenCursor(node.tokens_, node.start_ if node.tokens_start is None else node.tokens_start, lazy_function_bodies=True)
+        function_body   = parser.parse_statements(characters, cursor, termination_tokens=[TokenTypes.FUNCTION_DECLARATION_END])
+        node.parsed_.append(node_span(BlockStatement, node, node, body_=function_body))
+    return node.parsed_[0]
 
 
 def parse_function_params(
     characters: str, 
-    tokens: List['Token']
-) -> Tuple[List['Node'], List['Token']]:
+    cursor: TokenCursor
+) -> List['Node']:
     """ Function tries to parse function parameters
     
     Note: 
@@ -74,46 +185,45 @@ def parse_function_params(
             3. Check for a TokenType.SEPARATOR, raise an exception if not found
             4. Check for a TokenType.PARAMETER, raise an exception if not found
             5. Check for an identifier, raise an exception if not found
-            6. Gerenare Identifier Node and recurse
+            6. Gerenare Identifier Node and continue with the next parameter
     
     Args:
         characters  : The characters that are being lexed, parsed, interpreted
-        tokens      : List of tokens that need to be parsed
+        cursor      : TokenCursor pointing at the tokens that need to be parsed
     
     Returns:
         If no errors occured:
-            - A List of identifier nodes which make up the function parameters 
-            - A list of tokens that still need to be parsed
+            A List of identifier nodes which make up the function parameters. The cursor is moved past the new line that starts the function body
         If a grammar error occured:
             - Raises a Syntax Error with a message of where the error occured
     """
-    head, *tail = tokens
-    if head.tokentype_ == TokenTypes.INDENTATION :
-        head, *tail = tail
-        if head.tokentype_ != TokenTypes.NEW_LINE:
-            generate_error_message(head, characters, "Expected newline '––>' after function declaration", True)
-        return [], tail
-    if head.tokentype_ == TokenTypes.NEW_LINE:
-        generate_error_message(head, characters, "Expected '––>' after function declaration", True)
-    if head.tokentype_ != TokenTypes.SEPARATOR:
-        generate_error_message(head, characters, "Expected '|' or '––>' after function parameter declaration", True)
-    
-    head, *tail = tail
-    if head.tokentype_ != TokenTypes.PARAMETER:
-        generate_error_message(head, characters, "Expected 'parameter declaration' after function separator", True)
-    head, *tail = tail
-    if head.tokentype_ != TokenTypes.IDENTIFIER:
-        generate_error_message(head, characters, "Expected 'identifier' after function parameter declaration", True)
-    
-    param =  Identifier(loc_=head.loc_, range_=head.range_, name_=head.value_)
-    params, tokens = parse_function_params(characters, tail)
-    return [param] + params, tokens
+    params = []
+    while True:
+        head = cursor_next(cursor)
+        if head.tokentype_ == TokenTypes.INDENTATION :
+            head = cursor_next(cursor)
+            if head.tokentype_ != TokenTypes.NEW_LINE:
+                generate_error_message(head, characters, "Expected newline '––>' after function declaration", True)
+            return params
+        if head.tokentype_ == TokenTypes.NEW_LINE:
+            generate_error_message(head, characters, "Expected '––>' after function declaration", True)
+        if head.tokentype_ != TokenTypes.SEPARATOR:
+            generate_error_message(head, characters, "Expected '|' or '––>' after function parameter declaration", True)
+        
+        head = cursor_next(cursor)
+        if head.tokentype_ != TokenTypes.PARAMETER:
+            generate_error_message(head, characters, "Expected 'parameter declaration' after function separator", True)
+        head = cursor_next(cursor)
+        if head.tokentype_ != TokenTypes.IDENTIFIER:
+            generate_error_message(head, characters, "Expected 'identifier' after function parameter declaration", True)
+        
+        params.append(Identifier(loc_=head.loc_, range_=head.range_, name_=head.value_))
 
 
 def parse_return_statement(
     characters: str, 
-    tokens: List['Token']
-) -> Tuple['ReturnStatement', List['Token']]:
+    cursor: TokenCursor
+) -> 'ReturnStatement':
     """Function tries to parse a return statement 
     
     Note: 
@@ -122,26 +232,22 @@ def parse_return_statement(
     
     Args:
         characters  : The characters that are being lexed, parsed, interpreted
-        tokens      : List of tokens that need to be parsed
+        cursor      : TokenCursor pointing at the tokens that need to be parsed
     
     Returns:
         If no errors occured:
-            - A ReturnStatement node 
-            - A list of tokens that still need to be parsed
+            A ReturnStatement node. The cursor is moved past the return statement
         If a grammar error occured:
             - Raises a Syntax Error with a message of where the error occured
     """
-    return_statement_start, head, *tail = tokens
+    return_statement_start = cursor_next(cursor)
     
-    node, tokens = parse_expr.parse_expression(characters, [head]+tail)
+    node = parse_expr.parse_expression(characters, cursor)
     
-    return_statement_end, *tail = tokens
+    return_statement_end = cursor_next(cursor)
     if return_statement_end.tokentype_ != TokenTypes.RETURN:
         generate_error_message(return_statement_end, characters, "Expected closing '⮐' after return statement", True)
     
-    loc_ = {"start": return_statement_start.loc_["start"], "end": return_statement_end.loc_["end"]}
-    range_   = [return_statement_start.range_[0], return_statement_end.range_[1]]
-    node = ReturnStatement(loc_=loc_,range_=range_, argument_=node)
-    return node, tail
+    return node_span(ReturnStatement, return_statement_start, return_statement_end, argument_=node)
 
 
@@ -14,12 +14,13 @@ from misc.token_types import *
 from typing import Optional, TypeVar, Callable, List, Tuple
 from misc.error_message import generate_error_message
 from misc.node_types import *
+from misc.token_cursor import TokenCursor, cursor_next
 
 
 def parse_variable_declaration(
     characters : str,
-    tokens: List['Token']
-) -> Tuple['VariableDeclaration', List['Token']]:
+    cursor: TokenCursor
+) -> 'VariableDeclaration':
     """Function parses a variable declaration
     
     Rules:
@@ -38,26 +39,22 @@ def parse_variable_declaration(
     
     Args:
         characters  : The characters that are being lexed, parsed, interpreted
-        tokens      : List of tokens that need to be parsed
+        cursor      : TokenCursor pointing at the tokens that need to be parsed
     
     Returns:
         If no errors occured:
-            Returns a tuple with a variable declaration and a list of tokens that still need to be parsed
+            Returns a variable declaration. The cursor is moved past the variable declaration
         If a grammar error occured:
             Raises a Syntax Error with a message of where the error occured
     """
-    variable_declaration, identifier, *tail = tokens
+    variable_declaration, identifier = cursor_next(cursor), cursor_next(cursor)
     if identifier.tokentype_ != TokenTypes.IDENTIFIER:
         return generate_error_message(identifier, characters, "Expected identifier after variable declaration", True)
     
-    head, *tail = tail
+    head = cursor_next(cursor)
     if head.tokentype_ != TokenTypes.IS:
         return generate_error_message(head, characters, "Expected '='", True)
 
-    head, *tail = tail
-    node, tokens = parse_expr.parse_expression(characters, [head] + tail)
+    node = parse_expr.parse_expression(characters, cursor)
 
-    loc_ = {"start": variable_declaration.loc_["start"], "end": node.loc_["end"]}
-    range_   = [variable_declaration.range_[0], node.range_[1]]
-    node = VariableDeclaration(loc_=loc_, range_=range_,id_=identifier.value_, init_=node)
-    return node, tokens
\ No newline at end of file
+    return node_span(VariableDeclaration, variable_declaration, node, id_=identifier.value_, init_=node)
\ No newline at end of file
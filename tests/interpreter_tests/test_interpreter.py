@@ -7,16 +7,26 @@
 """
 
 import unittest
+from copy import deepcopy
 import sys
 import os
+import io
+import json
+import contextlib
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from lexer_module.lexer import lex, search_match
-from parser_module.parser import parse
-from interpreter_module.interpreter import interpret
+from lexer_module.lexer import tokenize
+from parser_module.parser import parse, parse_program, parse_iter
+from interpreter_module.interpreter import interpret, interpret_statements
+from interpreter_module.compiler import interpret_compiled
+from interpreter_module.transpiler import transpile_program, interpret_transpiled, transpiled_program_dumps, transpiled_program_loads
 from misc.token_types import *
-from misc.node_types import Program
+from misc.node_types import Program, FunctionDeclaration, Literal, BinaryExpression, BlockStatement, VariableDeclaration, ReturnStatement, node_release
+from misc.symbol_table import symbol_table_get
+from misc.error_message import DiagnosticError
+from optimizer_module.optimizer import fold_constants, eliminate_dead_code
+from misc.node_json import program_json_dump, program_json_load
 
 root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 code_samples_dir = root_dir + "/tests/code_samples/valid/"
@@ -28,8 +38,7 @@ class TestInterpreter(unittest.TestCase):
         with open(file_path, 'rb') as f:
             code = f.read().decode("utf-8")
 
-        tokens = lex(code, search_match, TokenExpressions)
-        tokens = list(filter(lambda token: token.tokentype_ != TokenTypes.NONE, tokens))
+        tokens = list(tokenize(code))
         
         parsed, leftover_token = parse(code, tokens)
         program = Program(loc_={'start': {'line': 1, 'index': 0}, "end":{"line":tokens[-1].loc_["start"]["line"], "index":tokens[-1].loc_["start"]["index"]}}, range_=[0, len(code)], body_=parsed)
@@ -102,5 +111,219 @@ class TestInterpreter(unittest.TestCase):
         self.open_lex_parse_interpret_compare(code_samples_dir + "program/fibonachi.txt")
 
 
+    def test_power_expression(self):
+        code        = "📁 var1 = 2 ⚡ 3 ⚡ 2 * 4 - 1"
+        parsed, _   = parse(code, list(tokenize(code)))
+        program     = Program(loc_={'start': {'line': 1, 'index': 0}, "end":{"line": 1, "index": len(code)}}, range_=[0, len(code)], body_=parsed)
+        self.assertEqual(symbol_table_get(interpret(code, program), "var1"), 2**9 * 4 - 1)
+
+
+    def test_lazy_function_bodies(self):
+        for file_path in ["program/double_recursive.txt", "program/simple_add.txt", "unary_expression/unary_expression_call_statement.txt"]:
+            with open(code_samples_dir + file_path, 'rb') as f:
+                code = f.read().decode("utf-8")
+            strict  = interpret(code, parse_program(code, list(tokenize(code))))
+            lazy    = interpret(code, parse_program(code, list(tokenize(code)), lazy_function_bodies=True))
+            self.assertEqual(symbol_table_get(strict, "test"), symbol_table_get(lazy, "test"))
+
+        code    = "ƒ count | α n ––>\n    ? n ▼ 1 ––>\n        ⮐ 0 ⮐ ¿\n    ⮐ ✆ count n-1 ✆ ⮐\n––\n\n📁 test = ✆ count 3 ✆"
+        program = parse_program(code, list(tokenize(code)), lazy_function_bodies=True)
+        body    = program.body_[0].body_
+        interpret(code, program)
+        self.assertIs(deepcopy(body), body)
+        self.assertIsNot(deepcopy(program.body_[0]), program.body_[0])
+        self.assertIs(deepcopy(program.body_[0]).body_, body)
+        self.assertEqual(len(body.parsed_), 1)
+
+        code = "ƒ broken ––>\n    ⮐ 1 + ⮐\n––\n\nƒ nested ––>\n    ƒ inner ––>\n        ⮐ 2 ⮐\n    ––\n    ⮐ ✆ inner ✆ ⮐\n––\n\n📁 test = ✆ nested ✆"
+        with self.assertRaises(DiagnosticError):
+            parse_program(code, list(tokenize(code)))
+        self.assertEqual(symbol_table_get(interpret(code, parse_program(code, list(tokenize(code)), lazy_function_bodies=True)), "test"), 2)
+
+        code += "\n📁 broken_result = ✆ broken ✆"
+        with self.assertRaises(DiagnosticError):
+            interpret(code, parse_program(code, list(tokenize(code)), lazy_function_bodies=True))
+
+
+    def test_interpret_statements(self):
+        with open(code_samples_dir + "program/double_recursive.txt", 'rb') as f:
+            code = f.read().decode("utf-8")
+        result = interpret_statements(code, parse_iter(code, tokenize(code)))
+        self.assertEqual(symbol_table_get(result, "test"), symbol_table_get(interpret(code, parse_program(code, tokenize(code))), "test"))
+
+        code    = "✆ 🖨 1 ✆\n📁 var1 = 2\n✆ 🖨 var1 ✆\n📁 var2 = +\n" + "📁 var1 = 3\n" * 1000
+        tokens  = tokenize(code)
+        output  = io.StringIO()
+        with contextlib.redirect_stdout(output), self.assertRaises(DiagnosticError):
+            interpret_statements(code, parse_iter(code, tokens))
+        self.assertEqual(output.getvalue(), "1\n2\n")
+        self.assertEqual(next(tokens).tokentype_, TokenTypes.VARIABLE_DECLARATION)
+
+
+    def test_release_program(self):
+        with open(code_samples_dir + "program/double_recursive.txt", 'rb') as f:
+            code = f.read().decode("utf-8")
+        program = parse_program(code, tokenize(code))
+        release = node_release(program)
+        self.assertIsNone(release.loc_)
+        self.assertEqual(release.range_, program.range_)
+        self.assertEqual(symbol_table_get(interpret(code, release), "test"), symbol_table_get(interpret(code, program), "test"))
+
+        code    = "📁 var1 = 2\n📁 var2 = var1 + var3"
+        errors  = []
+        for program in [parse_program(code, tokenize(code)), node_release(parse_program(code, tokenize(code)))]:
+            with self.assertRaises(DiagnosticError) as context:
+                interpret(code, program)
+            errors.append(str(context.exception))
+        self.assertEqual(errors[0], errors[1])
+        self.assertIn("line 2", errors[1])
+
+
+    def test_fold_constants(self):
+        for file_path in ["program/unary.txt", "program/simple_add.txt", "chained_expression/plus_minus_divide_multiply_call_expression.txt"]:
+            with open(code_samples_dir + file_path, 'rb') as f:
+                code = f.read().decode("utf-8")
+            program = parse_program(code, tokenize(code))
+            folded  = fold_constants(program)
+            self.assertEqual(symbol_table_get(interpret(code, folded), "test"), symbol_table_get(interpret(code, program), "test"))
+
+        code    = "📁 var1 = -10 * <20 + 5> ⚡ 2\n📁 var2 = var1 + 2 * 3\n📁 var3 = 1 / 0"
+        program = parse_program(code, tokenize(code))
+        folded  = fold_constants(program)
+        self.assertEqual(folded.body_[0].init_, Literal(loc_=program.body_[0].init_.loc_, range_=program.body_[0].init_.range_, value_=-6250, raw_="-6250"))
+        self.assertIs(type(folded.body_[1].init_), BinaryExpression)
+        self.assertEqual(folded.body_[1].init_.right_.value_, 6)
+        self.assertIs(folded.body_[2], program.body_[2])
+        self.assertIs(fold_constants(folded), folded)
+
+        code    = "📁 var1 = 1 == 1\n📁 var2 = 1 / 4\n📁 var3 = " + " + ".join(["1"] * 5000)
+        program = parse_program(code, tokenize(code))
+        folded  = fold_constants(program)
+        self.assertEqual([statement.init_.raw_ for statement in folded.body_], ["true", "0.25", "5000"])
+        self.assertEqual(json.loads(folded.jsonify())["Program"]["body_"]["VariableDeclaration"]["init_"]["Literal"]["raw_"], 5000)
+        with io.StringIO() as f:
+            program_json_dump(folded, f)
+            f.seek(0)
+            self.assertEqual(program_json_load(f), folded)
+
+
+    def test_eliminate_dead_code(self):
+        code = "ƒ unused | α n ––>\n    ⮐ n ⮐\n––\n\n" \
+               "ƒ pick | α n ––>\n    ? n == 1 ––>\n        ⮐ 1 ⮐\n    ⁈ 1 == 2 ––>\n        ⮐ 2 ⮐\n    ⁈ 2 == 2 ––>\n        ⮐ 3 ⮐\n    ⁇ ––>\n        ⮐ 4 ⮐ ¿\n––\n\n" \
+               "ƒ first ––>\n    ? 1 == 1 ––>\n        📁 x = 5 ¿\n    ⮐ x ⮐\n    📁 y = ✆ unused 2 ✆\n––\n\n" \
+               "📁 test = ✆ pick 2 ✆ + ✆ first ✆ * 10"
+        program     = parse_program(code, tokenize(code))
+        eliminated  = eliminate_dead_code(fold_constants(program))
+        self.assertEqual(symbol_table_get(interpret(code, eliminated), "test"), symbol_table_get(interpret(code, program), "test"))
+        self.assertEqual([getattr(statement, "id_", None) for statement in eliminated.body_], ["pick", "first", "test"])
+        self.assertIs(type(eliminated.body_[0].body_.body_[0].alternate_), BlockStatement)
+        self.assertEqual([type(statement) for statement in eliminated.body_[1].body_.body_], [VariableDeclaration, ReturnStatement])
+
+        code = "📁 x = 1\nƒ x ––>\n    ⮐ 1 ⮐\n––\nƒ y ––>\n    ⮐ 1 ⮐\n––"
+        self.assertEqual([statement.id_ for statement in eliminate_dead_code(parse_program(code, tokenize(code))).body_], ["x", "x"])
+
+        for file_path in ["program/double_recursive.txt", "if_statements/if_elif_elif_else_statement.txt", "if_statements/if_statement_function_call.txt"]:
+            with open(code_samples_dir + file_path, 'rb') as f:
+                code = f.read().decode("utf-8")
+            program = parse_program(code, tokenize(code))
+            self.assertEqual(symbol_table_get(interpret(code, eliminate_dead_code(program)), "test"), symbol_table_get(interpret(code, program), "test"))
+
+
+    def test_tail_calls(self):
+        with open(code_samples_dir + "program/double_recursive.txt", 'rb') as f:
+            code = f.read().decode("utf-8").replace("odd 10", "odd 5001")
+        self.assertEqual(symbol_table_get(interpret(code, parse_program(code, tokenize(code))), "test"), 1)
+
+        code = "ƒ g ––>\n    ⮐ x + y ⮐\n––\n\nƒ h | α z ––>\n    📁 x = 10\n    ⮐ ✆ g ✆ ⮐\n––\n\n" \
+               "ƒ f | α x ––>\n    📁 y = 2\n    ⮐ ✆ h x ✆ ⮐\n––\n\n📁 test = ✆ f 1 ✆ + 1"
+        self.assertEqual(symbol_table_get(interpret(code, parse_program(code, tokenize(code))), "test"), 13)
+
+
+    def test_interpret_long_program(self):
+        code = "📁 var1 = 3\n" * 3000 + "📁 var1 = var1 + 1\n✆ 🖨 var1 ✆"
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            result = interpret(code, parse_program(code, tokenize(code)))
+        self.assertEqual(symbol_table_get(result, "var1"), 4)
+        self.assertEqual(output.getvalue(), "4\n")
+
+
+    def test_interpret_compiled(self):
+        directories = [code_samples_dir + directory for directory in os.listdir(code_samples_dir) if os.path.isdir(code_samples_dir + directory)]
+        file_paths  = [directory + "/" + file_name for directory in directories for file_name in os.listdir(directory) if file_name.endswith(".txt")]
+        for file_path in sorted(file_paths):
+            with open(file_path, 'rb') as f:
+                code = f.read().decode("utf-8")
+            for lazy_function_bodies in [False, True]:
+                results = []
+                for engine in [interpret, interpret_compiled]:
+                    with contextlib.redirect_stdout(io.StringIO()) as output:
+                        try:
+                            result = repr(engine(code, parse_program(code, tokenize(code), lazy_function_bodies=lazy_function_bodies)))
+                        except DiagnosticError as error:
+                            result = str(error)
+                    results.append((result, output.getvalue()))
+                self.assertEqual(results[0], results[1], file_path)
+
+        code = "📁 test = 1\n⮐ test + 1 ⮐\n📁 test = 3"
+        result = interpret_compiled(code, parse_program(code, tokenize(code)))
+        self.assertEqual((symbol_table_get(result, "test"), result.return_symbols, result.return_stop), (1, [2], True))
+
+        code = "📁 test = 1 + undefined"
+        with self.assertRaises(DiagnosticError) as context:
+            interpret_compiled(code, parse_program(code, tokenize(code)))
+        self.assertIn("undefined is not defined", str(context.exception))
+
+
+    def test_interpret_transpiled(self):
+        def run(engine, code):
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                try:
+                    result = engine(code)
+                except DiagnosticError as error:
+                    return str(error), output.getvalue()
+            symbols = {name: value for name, value in result.symbols.items() if not callable(value) and type(value) is not FunctionDeclaration}
+            return (symbols, result.return_symbols, result.return_stop), output.getvalue()
+
+        for file_path in ["program/double_recursive.txt", "program/fibonachi.txt", "program/simple_print_loop.txt", "program/unary.txt",
+                          "if_statements/if_elif_elif_else_statement.txt", "if_statements/if_statement_function_call.txt",
+                          "simple_expression/call_expression_no_param.txt", "chained_expression/plus_minus_divide_multiply_call_expression.txt"]:
+            with open(code_samples_dir + file_path, 'rb') as f:
+                code = f.read().decode("utf-8")
+            program     = parse_program(code, tokenize(code))
+            transpiled  = transpiled_program_loads(transpiled_program_dumps(transpile_program(program)))
+            self.assertEqual(run(lambda code: interpret_transpiled(code, transpiled), code), run(lambda code: interpret(code, program), code), file_path)
+
+        with open(code_samples_dir + "program/double_recursive.txt", 'rb') as f:
+            code = f.read().decode("utf-8").replace("odd 10", "odd 5001")
+        self.assertEqual(symbol_table_get(interpret_transpiled(code, transpile_program(parse_program(code, tokenize(code)))), "test"), 1)
+
+        code = "ƒ f | α n ––>\n    ⮐ n + undefined ⮐\n––\n📁 test = ✆ f 1 ✆"
+        program = parse_program(code, tokenize(code))
+        self.assertEqual(run(lambda code: interpret_transpiled(code, transpile_program(program)), code), run(lambda code: interpret(code, program), code))
+        with self.assertRaises(DiagnosticError) as context:
+            interpret_transpiled(code, transpile_program(program))
+        self.assertIsNone(context.exception.__cause__)
+        self.assertTrue(context.exception.__suppress_context__)
+
+        code = "ƒ g | α n ––>\n    ⮐ n ⮐\n––\nƒ f | α n ––>\n    ⮐ ✆ g n | 5 ✆ ⮐\n––\n📁 test = ✆ f 3 | 4 ✆"
+        program = parse_program(code, tokenize(code))
+        self.assertEqual(run(lambda code: interpret_transpiled(code, transpile_program(program)), code), run(lambda code: interpret(code, program), code))
+
+        code = "ƒ f | α n ––>\n    ⮐ 1 / n ⮐\n––\n📁 test = ✆ f 0 ✆"
+        with self.assertRaises(ZeroDivisionError) as context:
+            interpret_transpiled(code, transpile_program(parse_program(code, tokenize(code))))
+        if sys.version_info >= (3, 11):
+            self.assertEqual(context.exception.__notes__, ["File <placeholder>, line 2\n\t    ⮐ 1 / n ⮐"])
+
+        code = "ƒ g ––>\n    ⮐ x ⮐\n––\nƒ f | α x ––>\n    ⮐ ✆ g ✆ ⮐\n––\n📁 test = ✆ f 1 ✆"
+        with self.assertRaises(ValueError):
+            transpile_program(parse_program(code, tokenize(code)))
+        code = "ƒ f | α n | α m ––>\n    ⮐ n + m ⮐\n––\n📁 m = 10\n📁 test = ✆ f 3 ✆"
+        with self.assertRaises(ValueError):
+            transpile_program(parse_program(code, tokenize(code)))
+        with self.assertRaises(ValueError):
+            transpiled_program_loads(b"not marshalled")
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -10,11 +10,17 @@ import unittest
 import sys
 import os
 
+from bisect import bisect_left
+
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from lexer_module.lexer import lex, search_match
+from lexer_module.lexer import lex, lex_iter, lex_stream, lex_mmap, lex_parallel, relex, tokenize, search_match, search_match_compiled, compiled_token_expressions, BytesTokenExpressions
+from lexer_module.scanner import search_match_dispatch
 from misc.token_types import *
+from misc.source_file import source_file_from_characters, source_file_location, source_file_line, get_source_file
+from misc.error_message import DiagnosticError
+from misc.chunked_sequence import chunked_sequence, chunked_sequence_replace, sequence_bisect_left
 
 code_samples = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -24,8 +30,7 @@ class TestLexer(unittest.TestCase):
         with open(file_path, 'rb') as f:
             code = f.read().decode("utf-8")
 
-        tokens = lex(code, search_match, TokenExpressions)
-        tokens = list(filter(lambda token: token.tokentype_ != TokenTypes.NONE, tokens))
+        tokens = list(tokenize(code))
         
         for i in range(len(required_token_order)):
             self.assertEqual(tokens[i].tokentype_, required_token_order[i], msg=file_path)
@@ -144,5 +149,219 @@ class TestLexer(unittest.TestCase):
         self.fail()
 
 
+    def lex_or_error(self, code, search_match_f):
+        try:
+            return lex(code, search_match_f, TokenExpressions)
+        except DiagnosticError as e:
+            return str(e)
+
+
+    def test_compiled_search_match(self):
+        for directory, _, filenames in os.walk(code_samples + "/code_samples"):
+            for filename in filter(lambda filename: filename.endswith(".txt"), filenames):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    code = f.read().decode("utf-8")
+                self.assertEqual(
+                    self.lex_or_error(code, search_match), 
+                    self.lex_or_error(code, search_match_compiled), 
+                    msg=filename
+                )
+
+    def test_compiled_token_expressions_cache(self):
+        compiled_token_expressions.cache_clear()
+        for _ in range(3):
+            match, tokentype = search_match_compiled("📁 var1", list(TokenExpressions))
+            self.assertEqual((match.group(0), tokentype), ("📁", TokenTypes.VARIABLE_DECLARATION))
+        self.assertEqual(compiled_token_expressions.cache_info().misses, 1)
+        self.assertEqual(compiled_token_expressions.cache_info().hits, 2)
+
+    def test_dispatch_search_match(self):
+        for directory, _, filenames in os.walk(code_samples + "/code_samples"):
+            for filename in filter(lambda filename: filename.endswith(".txt"), filenames):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    code = f.read().decode("utf-8")
+                self.assertEqual(
+                    self.lex_or_error(code, search_match), 
+                    self.lex_or_error(code, search_match_dispatch), 
+                    msg=filename
+                )
+        self.assertEqual(
+            self.lex_or_error("––>-- ab_1 12a", search_match),
+            self.lex_or_error("––>-- ab_1 12a", search_match_dispatch)
+        )
+
+
+
+    def test_lex_iter(self):
+        for directory, _, filenames in os.walk(code_samples + "/code_samples/valid"):
+            for filename in filter(lambda filename: filename.endswith(".txt"), filenames):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    code = f.read().decode("utf-8")
+                self.assertEqual(lex(code, search_match, TokenExpressions), list(lex_iter(code, search_match_compiled, TokenExpressions)), msg=filename)
+
+
+    def test_tokenize(self):
+        for directory, _, filenames in os.walk(code_samples + "/code_samples/valid"):
+            for filename in filter(lambda filename: filename.endswith(".txt"), filenames):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    code = f.read().decode("utf-8")
+                tokens = lex(code, search_match, TokenExpressions)
+                tokens = list(filter(lambda token: token.tokentype_ != TokenTypes.NONE, tokens))
+                self.assertEqual(tokens, list(tokenize(code)), msg=filename)
+
+
+    def test_lex_stream(self):
+        for directory, _, filenames in os.walk(code_samples + "/code_samples/valid"):
+            for filename in filter(lambda filename: filename.endswith(".txt"), filenames):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    code = f.read().decode("utf-8")
+                tokens          = list(tokenize(code))
+                token_stream    = lex_stream(code)
+                
+                self.assertEqual(tokens, list(token_stream), msg=filename)
+                self.assertEqual(tokens[-1], token_stream[-1], msg=filename)
+                self.assertEqual(tokens[1:3], list(token_stream[1:3]), msg=filename)
+                self.assertEqual(lex(code, search_match, TokenExpressions), list(lex_stream(code, skip_none=False)), msg=filename)
+
+
+    def test_source_file_location(self):
+        for directory, _, filenames in os.walk(code_samples + "/code_samples/valid"):
+            for filename in filter(lambda filename: filename.endswith(".txt"), filenames):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    code = f.read().decode("utf-8")
+                source_file = source_file_from_characters(code)
+                
+                for token in lex(code, search_match, TokenExpressions):
+                    location = source_file_location(source_file, token.range_[0])
+                    self.assertEqual(location, (token.loc_["start"]["line"], token.loc_["start"]["index"]), msg=filename)
+                    self.assertEqual(source_file_line(source_file, location[0]), code.split("\n")[location[0]-1], msg=filename)
+
+        characters = bytearray(b"\xf0\x9f\x93\x81 var1 = 1\n")
+        self.assertEqual(len(get_source_file(characters).line_starts), 2)
+        characters.extend(b"\xf0\x9f\x93\x81 var2 = 2\n")
+        self.assertEqual(len(get_source_file(characters).line_starts), 3)
+
+
+    def test_lex_iter_many_tokens(self):
+        code    = "📁 var1 = 1 + 2\n" * 2000
+        tokens  = list(lex_iter(code, search_match_compiled, TokenExpressions))
+        
+        self.assertEqual(len(tokens), 2000*12 + 1)
+        self.assertEqual(tokens[-2].loc_, {"start":{"line": 2000, "index": 14}, "end":{"line": 2000, "index": 15}})
+        self.assertEqual(tokens[-1].tokentype_, TokenTypes.EOF)
+
+
+    def test_lex_mmap(self):
+        for directory, _, filenames in os.walk(code_samples + "/code_samples"):
+            for filename in filter(lambda filename: filename.endswith(".txt"), filenames):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    code = f.read().decode("utf-8")
+                try:
+                    tokens = [(token.loc_, token.value_, token.tokentype_) for token in lex_stream(code)]
+                except DiagnosticError as e:
+                    tokens = str(e)
+                try:
+                    mmap_tokens = [(token.loc_, token.value_, token.tokentype_) for token in lex_mmap(os.path.join(directory, filename))]
+                except DiagnosticError as e:
+                    mmap_tokens = str(e)
+                self.assertEqual(tokens, mmap_tokens, msg=filename)
+
+
+    def test_lex_bytes_boundaries(self):
+        for code in ["ƒα", "ƒ fib α n", "––ƒ", "📁α", "ƒ––> ––", "a––>", "1α"]:
+            try:
+                tokens = [(token.loc_, token.value_, token.tokentype_) for token in lex_stream(code)]
+            except DiagnosticError as e:
+                tokens = str(e)
+            try:
+                bytes_tokens = [(token.loc_, token.value_, token.tokentype_) for token in lex_stream(code.encode("utf-8"), search_match_compiled, BytesTokenExpressions)]
+            except DiagnosticError as e:
+                bytes_tokens = str(e)
+            self.assertEqual(tokens, bytes_tokens, msg=code)
+
+
+    def test_lex_parallel(self):
+        for directory, _, filenames in os.walk(code_samples + "/code_samples"):
+            for filename in filter(lambda filename: filename.endswith(".txt"), filenames):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    code = f.read().decode("utf-8")
+                try:
+                    tokens = list(lex_stream(code))
+                except DiagnosticError as e:
+                    tokens = str(e)
+                try:
+                    parallel_tokens = list(lex_parallel(code, workers=2, chunks_per_worker=2))
+                except DiagnosticError as e:
+                    parallel_tokens = str(e)
+                self.assertEqual(tokens, parallel_tokens, msg=filename)
+        
+        code = "📁 var1 = 1 + 2\n" * 2000
+        self.assertEqual(list(lex_stream(code)), list(lex_parallel(code, workers=2)))
+
+
+    def test_relex(self):
+        edits = [(0, 0, "📁 a = 1\n"), (0, 1, ""), (3, 4, "ab"), (5, 9, "   "), (6, 6, "\n\n"), (-3, -1, "#"), (-1, -1, "1")]
+        for directory, _, filenames in os.walk(code_samples + "/code_samples/valid"):
+            for filename in filter(lambda filename: filename.endswith(".txt"), filenames):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    code = f.read().decode("utf-8")
+                token_stream = lex_stream(code)
+                for start, end, replacement in edits:
+                    start, end  = start % (len(code)+1), end % (len(code)+1)
+                    edited_code = code[:start] + replacement + code[end:]
+                    try:
+                        tokens = list(lex_stream(edited_code))
+                    except DiagnosticError as e:
+                        tokens = str(e)
+                    try:
+                        relexed_tokens = list(relex(token_stream, start, end, replacement))
+                    except DiagnosticError as e:
+                        relexed_tokens = str(e)
+                    self.assertEqual(tokens, relexed_tokens, msg=f"{filename} {start} {end} {replacement}")
+
+        with open(code_samples + "/code_samples/valid/program/fibonachi.txt", 'rb') as f:
+            code = "\n".join([f.read().decode("utf-8")] * 10)
+        token_stream = lex_stream(code)
+        edits = [(str.index, "📁 test", 0, "\n\n"), (str.rindex, "15", 2, "160"), (str.index, "15", 2, "3"), (str.rindex, "", 0, "\n"), 
+                 (str.index, "n-2", 0, "n + "), (str.rindex, "⮐ n ⮐", 1, ""), (str.index, "", 0, "📁 a = 1\n")]
+        for find, text, length, replacement in edits:
+            start, end      = find(code, text), find(code, text) + length
+            token_stream    = relex(token_stream, start, end, replacement)
+            code            = code[:start] + replacement + code[end:]
+            self.assertEqual(list(token_stream), list(lex_stream(code)), msg=f"{start} {end} {replacement}")
+            self.assertEqual(list(token_stream[3:]), list(lex_stream(code))[3:])
+
+
+    def test_relex_chunks(self):
+        code            = "📁 var1 = 1 + 2\n" * 2000
+        token_stream    = lex_stream(code)
+        edits           = [(1000, 0, "📁 a = 3 + 1\n"), (15000, 32, "\n\n"), (0, 16, ""), (20000, 9600, ""), (-1, 0, "1")]
+        for position, length, replacement in edits:
+            start           = code.index("\n", position % len(code)) + 1
+            end             = start + length
+            old_tokens      = list(token_stream)
+            relexed_stream  = relex(token_stream, start, end, replacement)
+            code            = code[:start] + replacement + code[end:]
+            self.assertEqual(list(relexed_stream), list(lex_stream(code)), msg=f"{start} {end} {replacement}")
+            self.assertEqual(list(token_stream), old_tokens)
+            token_stream    = relexed_stream
+
+
+    def test_chunked_sequence(self):
+        values      = list(range(0, 3000, 3))
+        sequence    = chunked_sequence(values, 16, moves=True)
+        edited      = chunked_sequence_replace(sequence, 100, 140, [301, 302], 7)
+        expected    = values[:100] + [301, 302] + [value + 7 for value in values[140:]]
+        self.assertEqual(list(edited), expected)
+        self.assertEqual(list(sequence), values)
+        self.assertEqual([edited[index] for index in range(len(expected))], expected)
+        self.assertEqual(list(edited[90:200]), expected[90:200])
+        self.assertEqual([sequence_bisect_left(edited, value) for value in range(3100)], [bisect_left(expected, value) for value in range(3100)])
+
+        text = chunked_sequence("abc\n" * 100, 16)
+        text = chunked_sequence_replace(chunked_sequence_replace(text, 10, 200, "xy"), 0, 1, "")
+        self.assertEqual(text[:], ("abc\n" * 100)[1:10] + "xy" + ("abc\n" * 100)[200:])
+
+
 if __name__== "__main__":
-    unittest.main(verbosity=2)
\ No newline at end of file
+    unittest.main(verbosity=2)
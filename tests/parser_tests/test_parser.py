@@ -10,13 +10,25 @@ import unittest
 import sys
 import os
 import inspect
+import tempfile
+import pickle
+import mmap
+import io
+import json
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from lexer_module.lexer import lex, search_match
-from parser_module.parser import parse
+from lexer_module.lexer import tokenize, lex_stream
+from parser_module.parser import parse, parse_program, parse_lazy_block_statement
+from parser_module.incremental_parser import parse_incremental, reparse, incremental_program_resolve
 from misc.token_types import *
-from misc.node_types import Program
+from misc.node_types import Program, FunctionDeclaration, node_release
+from misc.error_message import DiagnosticError
+from check import find_source_files, check_files, parse_diagnostics
+from misc.flat_program import flat_program_from_program, program_from_flat_program, flat_program_dump, flat_program_load
+from misc.node_json import program_json_dump, program_json_load, json_pairs_loads
+from misc.program_cache import program_cache_key, program_cache_load, program_cache_store
+from misc.token_buffer import TokenBuffer, token_buffer_release
 
 root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 code_samples_dir = root_dir + "/tests/code_samples/valid/"
@@ -28,8 +40,7 @@ class TestParser(unittest.TestCase):
         with open(file_path, 'rb') as f:
             code = f.read().decode("utf-8")
 
-        tokens = lex(code, search_match, TokenExpressions)
-        tokens = list(filter(lambda token: token.tokentype_ != TokenTypes.NONE, tokens))
+        tokens = list(tokenize(code))
         
         parsed, leftover_token = parse(code, tokens)
         program = Program(loc_={'start': {'line': 1, 'index': 0}, "end":{"line":tokens[-1].loc_["start"]["line"], "index":tokens[-1].loc_["start"]["index"]}}, range_=[0, len(code)], body_=parsed)
@@ -207,6 +218,269 @@ class TestParser(unittest.TestCase):
             return
         self.fail()
 
+
+    def test_unterminated_function_declaration(self):
+        code = "ƒ f ––>\n    📁 x = 1\n"
+        for lazy_function_bodies in [False, True]:
+            with self.assertRaises(DiagnosticError) as context:
+                parse_program(code, list(tokenize(code)), lazy_function_bodies=lazy_function_bodies)
+            self.assertIn("Expected '––' after function body\nFile <placeholder>, line 3", str(context.exception))
+
+
+
+    def test_parse_many_statements(self):
+        code            = "📁 var1 = 1 + 2 * var1\n" * 5000 + "✆ 🖨 var1 ✆"
+        tokens          = list(tokenize(code))
+        parsed, (eof_token, *_) = parse(code, tokens)
+
+        self.assertEqual(len(parsed), 5001)
+        self.assertEqual(parsed[0], parsed[1].__class__(loc_=parsed[0].loc_, range_=parsed[0].range_, id_="var1", init_=parsed[0].init_))
+        self.assertEqual(parsed[-1].loc_["start"]["line"], 5001)
+        self.assertEqual(eof_token.tokentype_, TokenTypes.EOF)
+
+
+    def test_parse_token_stream(self):
+        with open(root_dir + "/fibonachi.txt", 'rb') as f:
+            code = f.read().decode("utf-8")
+        for lazy_function_bodies in [False, True]:
+            program = parse_program(code, lex_stream(code), lazy_function_bodies=lazy_function_bodies)
+            self.assertEqual(program, parse_program(code, list(tokenize(code)), lazy_function_bodies=lazy_function_bodies))
+
+
+
+    def test_power_expression(self):
+        code        = "📁 var1 = 2 ⚡ 3 ⚡ 2 * 4 - 1"
+        parsed, _   = parse(code, list(tokenize(code)))
+        expression  = parsed[0].init_
+
+        self.assertEqual(expression.operator_, TokenTypes.MINUS)
+        self.assertEqual(expression.left_.operator_, TokenTypes.MULTIPLY)
+        self.assertEqual(expression.left_.left_.operator_, TokenTypes.POWER)
+        self.assertEqual(expression.left_.left_.left_.value_, 2)
+        self.assertEqual(expression.left_.left_.right_.operator_, TokenTypes.POWER)
+
+
+
+    def test_program_cache(self):
+        with open(root_dir + "/fibonachi.txt", 'rb') as f:
+            source = f.read()
+        code    = source.decode("utf-8")
+        program = parse_program(code, tokenize(code))
+        key     = program_cache_key(source)
+
+        with tempfile.TemporaryDirectory() as cache_directory:
+            self.assertIsNone(program_cache_load(cache_directory, key))
+            self.assertTrue(program_cache_store(cache_directory, key, program))
+            self.assertEqual(program_cache_load(cache_directory, key), program)
+            self.assertIsNone(program_cache_load(cache_directory, program_cache_key(source + b"\n")))
+            self.assertIsNone(program_cache_load(cache_directory, program_cache_key(source, "mmap")))
+
+            with open(os.path.join(cache_directory, os.listdir(cache_directory)[0]), 'wb') as f:
+                f.write(b"invalid")
+            self.assertIsNone(program_cache_load(cache_directory, key))
+            self.assertEqual(os.listdir(cache_directory), [])
+
+            entry_size = len(pickle.dumps((program_cache_key(source, "0"), program), protocol=pickle.HIGHEST_PROTOCOL))
+            for i in range(5):
+                program_cache_store(cache_directory, program_cache_key(source, str(i)), program, max_size=entry_size + entry_size // 2)
+            self.assertEqual(len(os.listdir(cache_directory)), 1)
+            self.assertEqual(program_cache_load(cache_directory, program_cache_key(source, "4")), program)
+
+        token_stream    = lex_stream(code)
+        lazy_program    = parse_program(code, token_stream, lazy_function_bodies=True)
+        lazy_body       = lazy_program.body_[0].body_
+        self.assertIs(lazy_body.tokens_, token_stream)
+        self.assertNotIn(b"TokenStream", pickle.dumps(lazy_program))
+        loaded_body     = pickle.loads(pickle.dumps(lazy_program)).body_[0].body_
+        self.assertEqual(len(loaded_body.tokens_), lazy_body.end_ - lazy_body.start_ + 1)
+        self.assertEqual(parse_lazy_block_statement(code, loaded_body), parse_lazy_block_statement(code, lazy_body))
+        with tempfile.TemporaryDirectory() as cache_directory:
+            self.assertTrue(program_cache_store(cache_directory, program_cache_key(source, "lazy"), lazy_program))
+            self.assertEqual(program_cache_load(cache_directory, program_cache_key(source, "lazy")), lazy_program)
+
+
+
+    def test_reparse(self):
+        with open(root_dir + "/fibonachi.txt", 'rb') as f:
+            code = "\n".join([f.read().decode("utf-8")] * 5)
+        incremental_program = parse_incremental(lex_stream(code))
+        self.assertEqual(incremental_program.program, parse_program(code, tokenize(code)))
+
+        edits = [
+            (len(code), len(code), "\n✆ 🖨 var1 ✆"),
+            (code.index("15"), code.index("15") + 2, "20"),
+            (code.index("––\n"), code.index("––\n") + 3, "    ⮐ 1 ⮐\n––\n"),
+            (code.index("n-2"), code.index("n-2"), "n + "),
+            (0, 0, "📁 var1 = 1\n\n"),
+        ]
+        for start, end, replacement in edits:
+            edited  = reparse(incremental_program, start, end, replacement)
+            code    = code[:start] + replacement + code[end:]
+            self.assertEqual(incremental_program_resolve(edited), parse_program(code, tokenize(code)))
+            self.assertEqual(repr(incremental_program_resolve(edited)), repr(parse_program(code, tokenize(code))))
+            incremental_program = edited
+
+        start   = code.rindex("15")
+        edited  = reparse(incremental_program, start, start + 2, "3")
+        body    = incremental_program.program.body_
+        self.assertTrue(all(new is old for new, old in zip(edited.program.body_[:-3], body[:-3])))
+        self.assertIsNot(edited.program.body_[-3], body[-3])
+        self.assertIs(edited.program.body_[-1], body[-1])
+        moved   = incremental_program_resolve(incremental_program).body_[-1]
+        self.assertEqual(incremental_program_resolve(edited).body_[-1].range_, [moved.range_[0] - 1, moved.range_[1] - 1])
+
+        start   = code.index("📁 test")
+        edited  = reparse(incremental_program, start, start, "📁 var2 = 1500\n\n")
+        code    = code[:start] + "📁 var2 = 1500\n\n" + code[start:]
+        self.assertTrue(all(new is old for new, old in zip(edited.program.body_[-10:], body[-10:])))
+        self.assertEqual(incremental_program_resolve(edited), parse_program(code, tokenize(code)))
+        
+        with self.assertRaises(DiagnosticError):
+            reparse(incremental_program, start, start + 2, "+")
+
+        lazy_program    = reparse(parse_incremental(lex_stream(code), lazy_function_bodies=True), 0, 0, "📁 var1 = 1\n\n")
+        code            = "📁 var1 = 1\n\n" + code
+        resolved        = incremental_program_resolve(lazy_program)
+        self.assertEqual(resolved, parse_program(code, tokenize(code), lazy_function_bodies=True))
+        for node, expected in zip(resolved.body_, parse_program(code, tokenize(code)).body_):
+            if type(node) is FunctionDeclaration:
+                self.assertEqual(parse_lazy_block_statement(code, node.body_).body_, expected.body_.body_)
+
+
+
+    def test_token_buffer(self):
+        with open(code_samples_dir + "program/double_recursive.txt", 'rb') as f:
+            code = f.read().decode("utf-8")
+        tokens = list(tokenize(code))
+        self.assertEqual(parse(code, TokenBuffer(iter(tokens))), parse(code, tokens))
+
+        token_buffer = TokenBuffer(iter(tokens))
+        self.assertEqual(token_buffer[2:5], tokens[2:5])
+        self.assertEqual(len(token_buffer.buffer), 5)
+        token_buffer_release(token_buffer, 3)
+        self.assertEqual(token_buffer[3:10:2], tokens[3:10:2])
+        with self.assertRaises(IndexError):
+            token_buffer[2:4]
+        self.assertEqual(token_buffer[-2:], tokens[-2:])
+        self.assertEqual(token_buffer[4:], tokens[4:])
+
+    def test_check_files(self):
+        paths   = find_source_files([code_samples_dir_invalid, root_dir + "/fibonachi.txt"])
+        results = check_files(paths, workers=2)
+
+        self.assertEqual(results, check_files(paths, workers=1))
+        self.assertEqual([result.path for result in results], paths)
+        self.assertTrue(all(result.diagnostics for result in results[:-1]))
+        self.assertEqual(results[-1].diagnostics, [])
+
+        code        = "📁 var1 = 1 +\nƒ test ––>\n    ⮐ 1 ⮐\n––\n? var1 ––>\n    📁 var2 = \n¿\n✆ 🖨 var1 ✆ ✆"
+        diagnostics = parse_diagnostics(code, list(tokenize(code)))
+        self.assertEqual([diagnostic.line for diagnostic in diagnostics], [1, 6, 8])
+        self.assertEqual(diagnostics[0].message, "Expected expression, literal, or function call")
+
+        for code in ["ƒ test | α n ––>\n", "ƒ test | α n ––>\n    ⮐ ✆ test n", "ƒ test | α n ––>\n    ⮐ ✆ test n ✆ ⮐\n", "📁 var1 = ✆ test 1 |"]:
+            self.assertEqual(len(parse_diagnostics(code, list(tokenize(code)))), 1)
+
+
+    def test_flat_program(self):
+        for file_path in ["program/double_recursive.txt", "if_statements/if_elif_elif_else_statement.txt", "unary_expression/unary_expression_call_statement.txt"]:
+            with open(code_samples_dir + file_path, 'rb') as f:
+                code = f.read().decode("utf-8")
+            program = parse_program(code, tokenize(code))
+            for expected in [program, node_release(program)]:
+                flat_program = flat_program_from_program(expected)
+                self.assertEqual(flat_program.first_child[0], 1)
+                self.assertEqual(flat_program.child_count[0], len(program.body_))
+                self.assertEqual(program_from_flat_program(flat_program), expected)
+                self.assertEqual(repr(program_from_flat_program(flat_program)), repr(expected))
+
+                with tempfile.TemporaryFile() as f:
+                    flat_program_dump(flat_program, f)
+                    f.flush()
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                        loaded = flat_program_load(buffer)
+                        self.assertEqual(program_from_flat_program(loaded), expected)
+                        del loaded
+
+        code = "ƒ test ––>\n    ⮐ 1 ⮐\n––"
+        with self.assertRaises(ValueError):
+            flat_program_from_program(parse_program(code, tokenize(code), lazy_function_bodies=True))
+        with self.assertRaises(ValueError):
+            flat_program_load(b"invalid")
+
+        # Offsets past 2**31 are kept, and the arrays are written little endian on every machine
+        program = Program(loc_=None, range_=[0, 2**40], body_=[])
+        with io.BytesIO() as f:
+            flat_program_dump(flat_program_from_program(program), f)
+            buffer = f.getvalue()
+        self.assertIn((2**40).to_bytes(8, "little"), buffer)
+        self.assertEqual(program_from_flat_program(flat_program_load(buffer)), program)
+
+
+    def test_program_json(self):
+        # The samples in the root of the directory are token lists for the lexer tests, which are no programs
+        not_programs = {"all_tokens_with_spaces.txt", "all_tokens_without_spaces.txt", "function_declaration_with_body.txt", "function_declaration_with_parameters.txt",
+                        "function_declaration_without_parameters.txt", "if_statement.txt", "program/add_subtract_multiply_or_divice.txt"}
+        for file_path in find_source_files([code_samples_dir]):
+            with open(file_path, 'rb') as f:
+                code = f.read().decode("utf-8")
+            if os.path.relpath(file_path, code_samples_dir).replace(os.sep, "/") in not_programs:
+                with self.assertRaises(DiagnosticError):
+                    parse_program(code, tokenize(code))
+                continue
+            program = parse_program(code, tokenize(code))
+            for expected in [program, node_release(program)]:
+                output = io.StringIO()
+                program_json_dump(expected, output)
+                self.assertEqual(output.getvalue(), expected.jsonify())
+                self.assertIsInstance(json.loads(output.getvalue()), dict)
+                self.assertEqual(json_pairs_loads(output.getvalue()), json.loads(output.getvalue(), object_pairs_hook=list))
+                output.seek(0)
+                self.assertEqual(program_json_load(output), expected)
+
+        # Every nested node is indented further, so the json of 5000 terms is more than a GB and is only written
+        code    = "📁 var1 = " + " + ".join(["1"] * 5000)
+        with open(os.devnull, "w", encoding="utf-8") as f:
+            program_json_dump(parse_program(code, tokenize(code)), f)
+
+        code    = "📁 var1 = " + " + ".join(["1"] * 1200)
+        output  = io.StringIO()
+        program_json_dump(parse_program(code, tokenize(code)), output)
+        output.seek(0)
+        loaded  = io.StringIO()
+        program_json_dump(program_json_load(output), loaded)
+        self.assertEqual(loaded.getvalue(), output.getvalue())
+
+        with self.assertRaises(ValueError):
+            program_json_load(io.StringIO("{\"Program\":{"))
+        with self.assertRaises(ValueError):
+            json_pairs_loads("{\"Program\":{\"body_\":}}")
+        with self.assertRaises(ValueError):
+            program_json_load(io.StringIO("{\"Identifier\":{}}"))
+
+    def test_json_pairs_loads(self):
+        valid = ["{}", "[]", "\"s\"", "-2.5e3", "[[], {}]", " {\"a\" : [1, -2.5e3, true, false, null, \"x\\\"y\"]} ",
+                 "{\"a\":1,\"b\":{\"c\":[]}}", "{\"a\":1,\"a\":2}"]
+        for characters in valid:
+            with self.subTest(characters=characters[:40]):
+                self.assertEqual(json_pairs_loads(characters), json.loads(characters, object_pairs_hook=list))
+
+        # json.loads and comparing the result both recurse on this nesting, so the arrays are walked here
+        value, depth = json_pairs_loads("[" * 2000 + "]" * 2000), 1
+        while value:
+            self.assertEqual(len(value), 1)
+            value, depth = value[0], depth + 1
+        self.assertEqual((value, depth), ([], 2000))
+
+        # NaN and Infinity are not written by program_json_dump, so they are rejected like any other invalid json
+        invalid = ["", "   ", "[", "{", "{\"a\":1,}", "[1,]", "{\"a\"}", "[1 2]", "[1]]", "{}}", "{\"a\":1}}", "{\"a\":1 \"b\":2}",
+                   "[,1]", "{,}", "{\"a\":}", "1 2", "[1,,2]", "{1:2}", "[}", "{]", ":", "[1:2]", "{\"a\"::1}", "tru", "[01]",
+                   "NaN", "[Infinity]", "[" * 2000 + "]" * 1999]
+        for characters in invalid:
+            with self.subTest(characters=characters[:40]):
+                with self.assertRaises(ValueError):
+                    json_pairs_loads(characters)
+
     
 if __name__== "__main__":
     unittest.main(verbosity=2)
\ No newline at end of file